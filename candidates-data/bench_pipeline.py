@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""End-to-end throughput benchmark: FEC fetch → combine with SOS → validate.
+
+Each size runs against `fake_fec_server.py` (in-process, on a free port) and a
+synthetic SOS CSV in which a quarter of the rows are also FEC House candidates, so
+duplicate resolution has real work to do. Every stage runs as its own subprocess,
+exactly as a user would run it, and reports:
+
+- wall time
+- requests issued to the FEC stand-in (and how many were answered with 429)
+- peak RSS of the stage process
+
+    python candidates-data/bench_pipeline.py --sizes 1000,10000,100000 --latency 0.02 --error-rate 0.01
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from fake_fec_server import start_server, synthetic_candidates
+from fec_client import STATE_NAMES, parse_states
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SOS_COLUMNS = ["candidate_id", "candidate_name", "state", "county", "district", "office", "party"]
+SOS_COUNTIES = ["Ector", "Midland", "Potter", "Randall", "Lubbock", "Travis", "Harris", "Bexar"]
+
+
+def write_sos_csv(path: str, size: int, states: List[str], seed: int) -> int:
+    """Write size/4 SOS rows: half FEC House duplicates (in "FIRST LAST" form), half county races."""
+    rows = size // 4
+    house = [raw for (_state, office), members in synthetic_candidates(size, states, seed=seed).items() if office == "H" for raw in members]
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=SOS_COLUMNS)
+        writer.writeheader()
+        for i in range(rows):
+            if i % 2 == 0 and house:
+                raw = house[(i // 2) % len(house)]
+                last, _, first = raw["name"].partition(",")
+                writer.writerow(
+                    {
+                        "candidate_name": f"{first.strip().title()} {last.strip().title()}",
+                        "state": STATE_NAMES[raw["state"]],
+                        "district": f"District {int(raw['district'])}",
+                        "office": "U.S. Representative",
+                        "party": raw["party_full"].title(),
+                    }
+                )
+            else:
+                county = SOS_COUNTIES[i % len(SOS_COUNTIES)]
+                writer.writerow(
+                    {
+                        "candidate_name": f"County Candidate {i}",
+                        "state": "Texas",
+                        "county": county,
+                        "district": f"Precinct {i % 4 + 1}",
+                        "office": f"Commissioner Precinct {i % 4 + 1}",
+                        "party": "Republican" if i % 3 else "Democratic",
+                    }
+                )
+    return rows
+
+
+def run_stage(name: str, args: List[str]) -> Dict:
+    """Run one script and return wall time and peak RSS (via wait4, so it is per process)."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPT_DIR, args[0])] + args[1:],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        cwd=SCRIPT_DIR,
+    )
+    output = process.stdout.read().decode("utf-8", "replace")
+    process.stdout.close()
+    _pid, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - started
+    returncode = os.waitstatus_to_exitcode(status)
+    process.returncode = returncode
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    if returncode != 0:
+        raise RuntimeError(f"{name} failed ({returncode}):\n{output}")
+    return {"stage": name, "seconds": round(seconds, 3), "peak_rss_mb": round(peak_mb, 1)}
+
+
+def bench_size(size: int, args: argparse.Namespace, states: List[str], work_dir: str) -> List[Dict]:
+    server = start_server(
+        size,
+        states=states,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    try:
+        fec_json = os.path.join(work_dir, f"fec-{size}.json")
+        sos_csv = os.path.join(work_dir, f"sos-{size}.csv")
+        combined_json = os.path.join(work_dir, f"combined-{size}.json")
+        write_sos_csv(sos_csv, size, states, args.seed)
+
+        fetch = run_stage(
+            "fetch",
+            [
+                "combine_fec_sos.py",
+                "--fec-api-key", "benchmark",
+                "--fec-endpoint", server.url,
+                "--states", ",".join(states),
+                "--fec-workers", str(args.workers),
+                "--fec-rate-limit", str(args.rate_limit),
+                "--output", fec_json,
+            ],
+        )
+        fetch.update(server.stats())
+
+        combine_args = ["combine_fec_sos.py", "--input-json", fec_json, "--sos-csv", sos_csv, "--output", combined_json]
+        if not args.no_resolve:
+            combine_args.append("--resolve-duplicates")
+        combine = run_stage("combine", combine_args)
+        validate = run_stage("validate", ["validate_candidates_json.py", "--input", combined_json, "--strict"])
+    finally:
+        server.stop()
+
+    results = [fetch, combine, validate]
+    for result in results:
+        result["size"] = size
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated FEC candidate counts")
+    parser.add_argument("--states", default="TX", help="States the fake API spreads candidates over, or `all`")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake API seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Fraction of fake API requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--workers", type=int, default=8, help="FEC harvest workers")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Client rate limit in requests/second (0 = unlimited)")
+    parser.add_argument("--no-resolve", action="store_true", help="Skip --resolve-duplicates in the combine stage")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic data and 429 injection")
+    parser.add_argument("--work-dir", help="Keep intermediate files here (default: a temp dir, removed afterwards)")
+    parser.add_argument("--output", help="Also write results as JSON")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+        states = parse_states(args.states)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="pia-bench-")
+    os.makedirs(work_dir, exist_ok=True)
+    results: List[Dict] = []
+    try:
+        print(f"{'size':>8}  {'stage':<9} {'seconds':>9} {'peak MB':>8} {'requests':>9} {'429s':>5}")
+        for size in sizes:
+            for result in bench_size(size, args, states, work_dir):
+                results.append(result)
+                print(
+                    f"{size:>8}  {result['stage']:<9} {result['seconds']:>9.2f} {result['peak_rss_mb']:>8.1f} "
+                    f"{result.get('requests', ''):>9} {result.get('throttled', ''):>5}"
+                )
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"parameters": vars(args), "results": results}, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
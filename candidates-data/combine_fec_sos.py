@@ -6,13 +6,18 @@ This script preserves all available source fields under `source` so no data is l
 
 import argparse
 import csv
-import json
+import os
 import re
-from typing import Dict, List
+import sys
+from functools import partial
+from typing import Dict, List, Optional
 
-import requests
-
-FEC_ENDPOINT = "https://api.open.fec.gov/v1/candidates/search/"
+from csv_chunks import normalize_csv_parallel
+from dataset_io import load_dataset, write_dataset
+from fec_client import FEC_ENDPOINT, STATE_NAMES, harvest, parse_states
+from metrics import add_metrics_arguments, incr, instrument, stage
+from resolve_candidates import DEFAULT_THRESHOLD, resolve_candidates
+from shard_dataset import write_shards
 
 
 def slugify(value: str) -> str:
@@ -26,29 +31,33 @@ def parse_bool(value: str) -> bool:
     return value in {"1", "true", "t", "yes", "y", "on"}
 
 
-def fetch_fec(api_key: str, cycle: int, offices: List[str], *, output_state: str) -> List[Dict]:
+def fetch_fec(
+    api_key: str,
+    cycle: int,
+    offices: List[str],
+    *,
+    output_state: Optional[str],
+    states: Optional[List[str]] = None,
+    workers: int = 8,
+    rate_limit: float = 5.0,
+    endpoint: str = FEC_ENDPOINT,
+) -> List[Dict]:
+    """Harvest states x offices concurrently; `output_state` only applies to single-state runs."""
+    states = states or ["TX"]
+    by_state = harvest(
+        api_key,
+        cycle,
+        states,
+        offices,
+        workers=workers,
+        rate_limit=rate_limit,
+        endpoint=endpoint,
+    )
     results: List[Dict] = []
-    for office in offices:
-        page = 1
-        while True:
-            params = {
-                "api_key": api_key,
-                "state": "TX",
-                "office": office,
-                "cycle": cycle,
-                "per_page": 100,
-                "page": page,
-            }
-            resp = requests.get(FEC_ENDPOINT, params=params, timeout=30)
-            resp.raise_for_status()
-            payload = resp.json()
-            candidates = payload.get("results", [])
-            for candidate in candidates:
-                results.append(normalize_fec(candidate, output_state=output_state))
-            pagination = payload.get("pagination", {})
-            if page >= pagination.get("pages", 0):
-                break
-            page += 1
+    for state, candidates in by_state.items():
+        state_value = output_state if output_state and len(states) == 1 else STATE_NAMES[state]
+        for candidate in candidates:
+            results.append(normalize_fec(candidate, output_state=state_value))
     return results
 
 
@@ -79,7 +88,22 @@ def load_sos_csv(
     *,
     default_state: str,
     external_id_prefix: str,
+    workers: int = 1,
 ) -> List[Dict]:
+    if workers != 1:
+        normalize = partial(
+            normalize_sos_row,
+            mapping=mapping,
+            default_state=default_state,
+            external_id_prefix=external_id_prefix,
+        )
+        return normalize_csv_parallel(
+            path,
+            normalize,
+            external_id_column=mapping.get("external_id", ""),
+            workers=workers or None,
+        )
+
     data: List[Dict] = []
     seen_external_ids: Dict[str, int] = {}
     with open(path, newline="", encoding="utf-8") as handle:
@@ -87,6 +111,7 @@ def load_sos_csv(
         for row in reader:
             if not row:
                 continue
+            incr("rows_read")
             normalized = normalize_sos_row(
                 row,
                 mapping,
@@ -96,6 +121,8 @@ def load_sos_csv(
             )
             if normalized["name"]:
                 data.append(normalized)
+            else:
+                incr("rows_dropped_missing_name")
     return data
 
 
@@ -176,9 +203,45 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--fec-api-key", help="FEC API key")
     parser.add_argument("--fec-cycle", type=int, default=2024, help="FEC cycle year")
     parser.add_argument("--fec-offices", default="H,S,P", help="Comma-separated offices")
+    parser.add_argument(
+        "--states",
+        default="TX",
+        help="Comma-separated state codes to harvest from FEC, or `all` (default: TX)",
+    )
+    parser.add_argument("--fec-workers", type=int, default=8, help="Concurrent FEC state/office harvests")
+    parser.add_argument(
+        "--fec-rate-limit",
+        type=float,
+        default=5.0,
+        help="Max FEC requests per second, shared by all workers (0 = unlimited)",
+    )
+    parser.add_argument("--fec-endpoint", default=FEC_ENDPOINT, help="FEC candidate search endpoint")
     parser.add_argument("--sos-csv", help="Path to Texas SOS CSV")
+    parser.add_argument(
+        "--input-json",
+        action="append",
+        help="Already normalized candidate JSON to merge in (repeatable), e.g. earlier FEC/SOS outputs",
+    )
     parser.add_argument("--output", default="tx-candidates.json", help="Output JSON file")
-    parser.add_argument("--output-state", default="Texas", help="State value to write to JSON output")
+    parser.add_argument(
+        "--output-state",
+        help="State value to write to JSON output for a single-state run (default: full state name, e.g. Texas)",
+    )
+    parser.add_argument(
+        "--resolve-duplicates",
+        action="store_true",
+        help="Merge candidates found in both FEC and SOS data into one record",
+    )
+    parser.add_argument(
+        "--resolve-threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Name similarity (0-1) required to merge FEC/SOS records (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        help="Also write per-level/county/district shards plus manifest.json into this directory",
+    )
     parser.add_argument(
         "--external-id-prefix",
         default="txsos",
@@ -206,16 +269,40 @@ def parse_args() -> argparse.Namespace:
         parser.add_argument(f"--button-{i}-label", default=f"button_{i}_label", help=f"CSV column for button {i} label")
         parser.add_argument(f"--button-{i}-url", default=f"button_{i}_url", help=f"CSV column for button {i} URL")
     parser.add_argument("--category", default="category", help="CSV column for category slugs (comma-separated)")
+    parser.add_argument(
+        "--sos-workers",
+        type=int,
+        default=1,
+        help="Normalize the SOS CSV in N processes over memory-mapped chunks (0 = CPU count)",
+    )
+    add_metrics_arguments(parser)
     return parser.parse_args()
 
 
-def main() -> int:
-    args = parse_args()
+def run(args: argparse.Namespace) -> int:
     combined: List[Dict] = []
 
+    try:
+        states = parse_states(args.states)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
     if args.fec_api_key:
         offices = [office.strip().upper() for office in args.fec_offices.split(",") if office.strip()]
-        combined.extend(fetch_fec(args.fec_api_key, args.fec_cycle, offices, output_state=args.output_state))
+        with stage("fetch_fec"):
+            combined.extend(
+                fetch_fec(
+                    args.fec_api_key,
+                    args.fec_cycle,
+                    offices,
+                    output_state=args.output_state,
+                    states=states,
+                    workers=args.fec_workers,
+                    rate_limit=args.fec_rate_limit,
+                    endpoint=args.fec_endpoint,
+                )
+            )
 
     if args.sos_csv:
         mapping = {
@@ -242,21 +329,58 @@ def main() -> int:
         for i in range(1, 4):
             mapping[f"button_{i}_label"] = getattr(args, f"button_{i}_label")
             mapping[f"button_{i}_url"] = getattr(args, f"button_{i}_url")
-        combined.extend(
-            load_sos_csv(
-                args.sos_csv,
-                mapping,
-                default_state=args.output_state,
-                external_id_prefix=args.external_id_prefix,
+        with stage("load_sos_csv"):
+            combined.extend(
+                load_sos_csv(
+                    args.sos_csv,
+                    mapping,
+                    default_state=args.output_state or "Texas",
+                    external_id_prefix=args.external_id_prefix,
+                    workers=args.sos_workers,
+                )
             )
-        )
 
-    with open(args.output, "w", encoding="utf-8") as handle:
-        json.dump(combined, handle, indent=2)
+    for path in args.input_json or []:
+        with stage("load_input_json"):
+            combined.extend(load_dataset(path))
+
+    if args.resolve_duplicates:
+        with stage("resolve_duplicates"):
+            combined, merges = resolve_candidates(combined, threshold=args.resolve_threshold)
+        incr("duplicates_merged", merges)
+        print(f"Merged {merges} candidates found in both FEC and SOS data")
+
+    with stage("write_output"):
+        write_dataset(args.output, combined)
+    incr("candidates_written", len(combined))
 
     print(f"Wrote {len(combined)} candidates to {args.output}")
+
+    if len(states) > 1:
+        root, ext = os.path.splitext(args.output)
+        state_codes = {name: code for code, name in STATE_NAMES.items()}
+        by_state: Dict[str, List[Dict]] = {}
+        for candidate in combined:
+            state = candidate.get("state") or ""
+            by_state.setdefault(state_codes.get(state, state).lower() or "unknown", []).append(candidate)
+        for state, candidates in by_state.items():
+            state_output = f"{root}-{slugify(state)}{ext or '.json'}"
+            with stage("write_output"):
+                write_dataset(state_output, candidates)
+            print(f"Wrote {len(candidates)} candidates to {state_output}")
+
+    if args.shard_dir:
+        with stage("write_shards"):
+            manifest = write_shards(combined, args.shard_dir)
+        print(f"Wrote {len(manifest['shards'])} shards to {args.shard_dir}")
     return 0
 
 
+def main() -> int:
+    args = parse_args()
+    with instrument("combine_fec_sos", args, output=args.output):
+        return run(args)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,108 @@
+"""Shared helpers for reading candidate datasets and hashing candidate records.
+
+Datasets may be a flat list of candidates or the grouped object format the plugin
+importer accepts (`{"federal": [...], "state": [...], "all": [...]}`). Binary
+snapshots written by `snapshot.py` are read transparently, and written by
+`write_dataset()` when the output path ends in `.msgpack`.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List
+
+# Keys that never reach WordPress post data/meta, so they must not trigger updates.
+HASH_EXCLUDED_KEYS = ("content_hash", "source")
+
+SNAPSHOT_MAGIC = b"PIAC"
+SNAPSHOT_SUFFIXES = (".msgpack", ".mpk")
+
+
+def flatten_dataset(data: Any, *, dedupe: bool = False) -> List[Dict]:
+    """Flatten a decoded dataset like the plugin's `normalize_dataset()` does.
+
+    Only top-level list groups are read; other values, including nested groups such as
+    `county: {potter: [...]}`, are skipped, since the importer never sees them.
+
+    With `dedupe`, candidates repeated across groups (e.g. in an `all` group) are
+    collapsed by `external_id`; the last occurrence wins, as it would in the importer.
+    Leave it off when the input is a stage output that still has to be validated: two
+    different people sharing an ID would otherwise disappear without an error.
+    """
+    if isinstance(data, dict) and any(key in data for key in ("external_id", "name", "first_name", "last_name")):
+        candidates = [data]
+    elif isinstance(data, dict):
+        candidates = [candidate for group in data.values() for candidate in _collect_candidates(group)]
+    else:
+        candidates = _collect_candidates(data)
+    if not dedupe:
+        return candidates
+
+    positions: Dict[str, int] = {}
+    unique: List[Dict] = []
+    for candidate in candidates:
+        key = record_key(candidate)
+        if key in positions:
+            unique[positions[key]] = candidate
+            continue
+        positions[key] = len(unique)
+        unique.append(candidate)
+    return unique
+
+
+def _collect_candidates(value: Any) -> List[Dict]:
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, dict)]
+    return []
+
+
+def is_snapshot_file(path: str) -> bool:
+    with open(path, "rb") as handle:
+        return handle.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+
+def load_dataset(path: str, *, dedupe: bool = False) -> List[Dict]:
+    # Imported lazily so JSON-only workflows don't need msgpack installed.
+    if is_snapshot_file(path):
+        from snapshot import read_snapshot
+
+        return read_snapshot(path)
+    with open(path, "r", encoding="utf-8") as handle:
+        return flatten_dataset(json.load(handle), dedupe=dedupe)
+
+
+def write_dataset(path: str, candidates: List[Dict]) -> None:
+    """Write a flat candidate list as importer JSON, or as a snapshot for `.msgpack`/`.mpk` paths."""
+    if path.lower().endswith(SNAPSHOT_SUFFIXES):
+        from snapshot import write_snapshot
+
+        write_snapshot(path, candidates)
+        return
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(candidates, handle, indent=2)
+
+
+def record_key(candidate: Dict) -> str:
+    """Identity used to match a record across datasets (external_id, else name like the importer)."""
+    external_id = candidate.get("external_id") or ""
+    if isinstance(external_id, str) and external_id.strip():
+        return external_id.strip()
+    name = candidate.get("name") or " ".join(
+        filter(None, [candidate.get("first_name") or "", candidate.get("last_name") or ""])
+    )
+    return f"name:{str(name).strip()}"
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def content_hash(candidate: Dict) -> str:
+    payload = {key: value for key, value in candidate.items() if key not in HASH_EXCLUDED_KEYS}
+    return hashlib.sha256(canonical_json(payload).encode("utf-8")).hexdigest()
+
+
+def dataset_hash(candidates: List[Dict]) -> str:
+    digest = hashlib.sha256()
+    for candidate in candidates:
+        digest.update(content_hash(candidate).encode("ascii"))
+    return digest.hexdigest()
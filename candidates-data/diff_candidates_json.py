@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Compare a new candidate dataset with the previously published one and emit a changeset.
+
+Records are matched by `external_id` (falling back to name, like the importer) and
+compared by a content hash of the fields the importer writes. The changeset keeps
+the plugin's grouped JSON shape, so it can be imported directly and only touches
+added/updated candidates:
+
+    {
+      "summary": {"added": 1, "updated": 2, "deleted": 0, "deleted_names": 0, "unchanged": 162},
+      "added": [ { ..., "content_hash": "..." } ],
+      "updated": [ { ..., "content_hash": "..." } ],
+      "deleted": [ "external-id", ... ],
+      "deleted_names": [ "Candidate Name", ... ]
+    }
+
+`deleted` lists the `external_id`s of previous records missing from the new dataset.
+Previous records without an `external_id` can't be looked up by ID, so they are listed
+by name in `deleted_names` for manual review instead. Both are plain string lists,
+which the importer skips because imports never delete.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from dataset_io import content_hash, load_dataset, record_key
+from metrics import add_metrics_arguments, instrument, stage
+
+
+def with_content_hash(candidate: Dict) -> Dict:
+    hashed = dict(candidate)
+    hashed["content_hash"] = content_hash(candidate)
+    return hashed
+
+
+def build_changeset(previous: List[Dict], current: List[Dict]) -> Dict:
+    previous_hashes: Dict[str, str] = {}
+    for candidate in previous:
+        previous_hashes[record_key(candidate)] = candidate.get("content_hash") or content_hash(candidate)
+
+    added: List[Dict] = []
+    updated: List[Dict] = []
+    unchanged = 0
+    current_keys = set()
+    for candidate in current:
+        key = record_key(candidate)
+        current_keys.add(key)
+        hashed = with_content_hash(candidate)
+        old_hash = previous_hashes.get(key)
+        if old_hash is None:
+            added.append(hashed)
+        elif old_hash != hashed["content_hash"]:
+            updated.append(hashed)
+        else:
+            unchanged += 1
+
+    deleted: List[str] = []
+    deleted_names: List[str] = []
+    for key in previous_hashes:
+        if key in current_keys:
+            continue
+        if key.startswith("name:"):
+            deleted_names.append(key[len("name:"):])
+        else:
+            deleted.append(key)
+
+    return {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "summary": {
+            "added": len(added),
+            "updated": len(updated),
+            "deleted": len(deleted),
+            "deleted_names": len(deleted_names),
+            "unchanged": unchanged,
+        },
+        "added": added,
+        "updated": updated,
+        "deleted": deleted,
+        "deleted_names": deleted_names,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--previous", help="Previously published dataset JSON (omit for a first publish)")
+    parser.add_argument("--current", required=True, help="New dataset JSON")
+    parser.add_argument("--output", default="changeset.json", help="Output changeset JSON file")
+    parser.add_argument(
+        "--annotated-output",
+        help="Optional path to also write the full new dataset with a `content_hash` on every candidate",
+    )
+    add_metrics_arguments(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        with stage("load_input"):
+            current = load_dataset(args.current, dedupe=True)
+            previous: List[Dict] = []
+            if args.previous and os.path.exists(args.previous):
+                previous = load_dataset(args.previous, dedupe=True)
+            elif args.previous:
+                print(f"Previous dataset not found, treating every candidate as new: {args.previous}", file=sys.stderr)
+    except FileNotFoundError as e:
+        print(f"File not found: {e.filename}", file=sys.stderr)
+        return 2
+    except json.JSONDecodeError as e:
+        print(f"Invalid JSON: {e}", file=sys.stderr)
+        return 2
+
+    with stage("diff"):
+        changeset = build_changeset(previous, current)
+    with stage("write_output"), open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(changeset, handle, indent=2)
+
+    if args.annotated_output:
+        with stage("write_output"), open(args.annotated_output, "w", encoding="utf-8") as handle:
+            json.dump([with_content_hash(candidate) for candidate in current], handle, indent=2)
+
+    summary = changeset["summary"]
+    if summary["deleted_names"]:
+        print(
+            f"Warning: {summary['deleted_names']} deleted candidates have no external_id; "
+            "they are listed by name in `deleted_names` for manual review",
+            file=sys.stderr,
+        )
+    print(
+        f"Wrote changeset to {args.output}: {summary['added']} added, {summary['updated']} updated, "
+        f"{summary['deleted']} deleted, {summary['unchanged']} unchanged"
+    )
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    with instrument("diff_candidates_json", args, output=args.output):
+        return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Build (and query) a precomputed directory index for `[pia_candidate_directory]`.
+
+The index is written next to the dataset (`<dataset>.index.json`) and contains:
+- `records`: compact rows (see `fields`) in directory order (featured first, then name)
+- `facets`: inverted indexes (normalized value -> sorted record IDs) for state,
+  county, district, office, party, category, featured and approved
+- `name_trie`: a prefix trie over lowercase name tokens (`$` holds record IDs)
+- `dataset_hash`: hash of the source records, so caches can be keyed by version
+
+Record IDs are positions in `records`. `query_index()` answers the same filters as
+the shortcode: state/county/district/office/party match like the SQL `LIKE` the
+directory uses (case-insensitive substring), category matches any of the given slugs.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+from dataset_io import dataset_hash, load_dataset
+from metrics import add_metrics_arguments, instrument, stage
+
+INDEX_FORMAT_VERSION = 1
+
+FIELDS = [
+    "external_id",
+    "name",
+    "state",
+    "county",
+    "district",
+    "office",
+    "party",
+    "website",
+    "portrait_url",
+    "featured",
+    "approved",
+    "category",
+]
+TEXT_FACETS = ["state", "county", "district", "office", "party"]
+FLAG_FACETS = ["featured", "approved"]
+
+TRIE_TERMINAL = "$"
+
+
+def normalize_value(value: Any) -> str:
+    return str(value or "").strip().casefold()
+
+
+def name_tokens(name: str) -> List[str]:
+    return [token for token in re.split(r"[^\w]+", normalize_value(name)) if token]
+
+
+def directory_sort_key(candidate: Dict):
+    # Matches the shortcode's `orderby` (featured DESC, title ASC).
+    return (not bool(candidate.get("featured")), normalize_value(candidate.get("name")))
+
+
+def category_slugs(value: Any) -> List[str]:
+    """Category slugs of a candidate: a list of slugs, or one comma-separated string."""
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return []
+    return [slug.strip() for slug in value if isinstance(slug, str) and slug.strip()]
+
+
+def compact_record(candidate: Dict) -> List:
+    row = []
+    for field in FIELDS:
+        value = candidate.get(field)
+        if field in FLAG_FACETS:
+            value = bool(value)
+        elif field == "category":
+            value = category_slugs(value)
+        else:
+            value = value if isinstance(value, str) else ("" if value is None else str(value))
+        row.append(value)
+    return row
+
+
+def build_index(candidates: List[Dict]) -> Dict:
+    ordered = sorted(candidates, key=directory_sort_key)
+    records = [compact_record(candidate) for candidate in ordered]
+
+    facets: Dict[str, Dict[str, List[int]]] = {field: {} for field in TEXT_FACETS + ["category"] + FLAG_FACETS}
+    trie: Dict[str, Any] = {}
+    for record_id, row in enumerate(records):
+        record = dict(zip(FIELDS, row))
+        for field in TEXT_FACETS:
+            key = normalize_value(record[field])
+            if key:
+                facets[field].setdefault(key, []).append(record_id)
+        for slug in dict.fromkeys(record["category"]):
+            facets["category"].setdefault(normalize_value(slug), []).append(record_id)
+        for field in FLAG_FACETS:
+            facets[field].setdefault("1" if record[field] else "0", []).append(record_id)
+        for token in dict.fromkeys(name_tokens(record["name"])):
+            node = trie
+            for char in token:
+                node = node.setdefault(char, {})
+            node.setdefault(TRIE_TERMINAL, []).append(record_id)
+
+    return {
+        "format_version": INDEX_FORMAT_VERSION,
+        "dataset_hash": dataset_hash(candidates),
+        "count": len(records),
+        "fields": FIELDS,
+        "records": records,
+        "facets": facets,
+        "name_trie": trie,
+    }
+
+
+def load_index(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as handle:
+        index = json.load(handle)
+    if index.get("format_version") != INDEX_FORMAT_VERSION:
+        raise ValueError(f"Unsupported index format version: {index.get('format_version')}")
+    return index
+
+
+def _trie_lookup(trie: Dict[str, Any], prefix: str) -> set:
+    node = trie
+    for char in prefix:
+        node = node.get(char)
+        if node is None:
+            return set()
+    found: set = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        for key, child in current.items():
+            if key == TRIE_TERMINAL:
+                found.update(child)
+            else:
+                stack.append(child)
+    return found
+
+
+def _split_slugs(category: Optional[str]) -> List[str]:
+    return [normalize_value(slug) for slug in (category or "").split(",") if normalize_value(slug)]
+
+
+def query_index(
+    index: Dict,
+    *,
+    state: Optional[str] = None,
+    county: Optional[str] = None,
+    district: Optional[str] = None,
+    office: Optional[str] = None,
+    party: Optional[str] = None,
+    category: Optional[str] = None,
+    featured: Optional[bool] = None,
+    approved: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+) -> List[int]:
+    """Return matching record IDs in directory order. Empty/None filters are ignored."""
+    matches: Optional[set] = None
+
+    def narrow(ids: Iterable[int]) -> None:
+        nonlocal matches
+        ids = set(ids)
+        matches = ids if matches is None else matches & ids
+
+    facets = index["facets"]
+    for field, value in (("state", state), ("county", county), ("district", district), ("office", office), ("party", party)):
+        needle = normalize_value(value)
+        if needle:
+            narrow(itertools.chain.from_iterable(ids for key, ids in facets[field].items() if needle in key))
+
+    slugs = _split_slugs(category)
+    if slugs:
+        narrow(itertools.chain.from_iterable(facets["category"].get(slug, []) for slug in slugs))
+
+    for field, flag in (("featured", featured), ("approved", approved)):
+        if flag is not None:
+            narrow(facets[field].get("1" if flag else "0", []))
+
+    for term in name_tokens(name_prefix or ""):
+        narrow(_trie_lookup(index["name_trie"], term))
+
+    if matches is None:
+        return list(range(index["count"]))
+    return sorted(matches)
+
+
+def get_records(index: Dict, record_ids: Iterable[int], *, page: int = 1, per_page: Optional[int] = None) -> List[Dict]:
+    record_ids = list(record_ids)
+    if per_page:
+        start = (max(page, 1) - 1) * per_page
+        record_ids = record_ids[start:start + per_page]
+    fields = index["fields"]
+    return [dict(zip(fields, index["records"][record_id])) for record_id in record_ids]
+
+
+def brute_force_filter(candidates: List[Dict], **filters: Any) -> List[int]:
+    """Reference implementation of `query_index()` that scans the source candidates.
+
+    It reads the raw candidate dicts rather than the index's compact records, so a value
+    lost or mangled while building the index shows up as a mismatch.
+    """
+    slugs = _split_slugs(filters.get("category"))
+    terms = name_tokens(filters.get("name_prefix") or "")
+    matched: List[int] = []
+    for record_id, record in enumerate(sorted(candidates, key=directory_sort_key)):
+        if any(
+            normalize_value(filters.get(field)) and normalize_value(filters.get(field)) not in normalize_value(record.get(field))
+            for field in TEXT_FACETS
+        ):
+            continue
+        if slugs and not set(slugs) & {normalize_value(slug) for slug in category_slugs(record.get("category"))}:
+            continue
+        if any(filters.get(field) is not None and filters[field] != bool(record.get(field)) for field in FLAG_FACETS):
+            continue
+        tokens = name_tokens(record.get("name"))
+        if any(not any(token.startswith(term) for token in tokens) for term in terms):
+            continue
+        matched.append(record_id)
+    return matched
+
+
+def verify_index(index: Dict, candidates: List[Dict], *, max_pairs: int = 2000) -> List[str]:
+    """Compare index answers with a brute-force scan of `candidates` for every facet value and sampled pairs."""
+    probes: List[Dict[str, Any]] = [{}]
+    for field in TEXT_FACETS + ["category"]:
+        # Values from the source as well as the index, so a value the index dropped is still probed
+        source_values = (
+            (normalize_value(slug) for candidate in candidates for slug in category_slugs(candidate.get("category")))
+            if field == "category"
+            else (normalize_value(candidate.get(field)) for candidate in candidates)
+        )
+        values = dict.fromkeys(itertools.chain(index["facets"][field], source_values))
+        probes.extend({field: value} for value in values if value)
+    for field in FLAG_FACETS:
+        probes.extend([{field: True}, {field: False}])
+
+    # Combined filters: a fixed-seed sample of facet pairs keeps this linear in index size.
+    facet_probes = probes[1:]
+    rng = random.Random(0)
+    for _ in range(min(max_pairs, len(facet_probes) ** 2)):
+        first, second = rng.choice(facet_probes), rng.choice(facet_probes)
+        if set(first) != set(second):
+            probes.append({**first, **second})
+    for token in sorted({token for row in index["records"] for token in name_tokens(row[FIELDS.index("name")])}):
+        probes.extend([{"name_prefix": token}, {"name_prefix": token[:2]}, {"name_prefix": token[:1], "featured": False}])
+
+    failures = []
+    for probe in probes:
+        if query_index(index, **probe) != brute_force_filter(candidates, **probe):
+            failures.append(json.dumps(probe, sort_keys=True))
+    return failures
+
+
+def default_output_path(input_path: str) -> str:
+    root, _ext = os.path.splitext(input_path)
+    return f"{root}.index.json"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="Candidate dataset JSON (flat list or grouped object)")
+    parser.add_argument("--output", help="Output index JSON (default: <input>.index.json)")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Check index answers against a brute-force filter over the input candidates before writing",
+    )
+    add_metrics_arguments(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        with stage("load_input"):
+            candidates = load_dataset(args.input, dedupe=True)
+    except FileNotFoundError:
+        print(f"File not found: {args.input}", file=sys.stderr)
+        return 2
+    except json.JSONDecodeError as e:
+        print(f"Invalid JSON: {e}", file=sys.stderr)
+        return 2
+
+    with stage("build_index"):
+        index = build_index(candidates)
+
+    if args.verify:
+        with stage("verify_index"):
+            failures = verify_index(index, candidates)
+        if failures:
+            print(f"Index verification FAILED for {len(failures)} queries:", file=sys.stderr)
+            for probe in failures[:20]:
+                print(f"- {probe}", file=sys.stderr)
+            return 1
+        print("Index verification passed.")
+
+    output = args.output or default_output_path(args.input)
+    with stage("write_output"), open(output, "w", encoding="utf-8") as handle:
+        json.dump(index, handle, separators=(",", ":"))
+
+    print(f"Wrote directory index for {index['count']} candidates to {output} (dataset {index['dataset_hash'][:12]})")
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    with instrument("directory_index", args, output=args.output or default_output_path(args.input)):
+        return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Local stand-in for the FEC `/v1/candidates/search/` endpoint, for tests and benchmarks.
+
+Serves a deterministic synthetic candidate set with the same pagination envelope as
+the real API (`results` + `pagination.pages/page/per_page/count`), filtered by the
+`state` and `office` query parameters. It can add per-request latency and answer a
+fraction of requests with `429 Too Many Requests` (with `Retry-After`) to exercise the
+client's retry and rate-limit handling. `GET /stats` returns request counters.
+
+    python candidates-data/fake_fec_server.py --candidates 10000 --latency 0.05 --error-rate 0.02
+    python candidates-data/fetch_fec_tx.py --api-key test --rate-limit 0 \\
+      --endpoint http://127.0.0.1:8766/v1/candidates/search/
+
+To exercise the plugin's `get_fec_candidates`, point it at the same URL with the
+`pia_candidates_fec_endpoint` filter.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fec_client import parse_states
+
+SEARCH_PATH = "/v1/candidates/search/"
+MAX_PER_PAGE = 100
+
+FIRST_NAMES = ["JOHN", "MARIA", "JAMES", "LINDA", "ROBERT", "ANA", "MICHAEL", "SARAH", "DAVID", "ROSA", "WILLIAM", "KAREN"]
+LAST_NAMES = ["SMITH", "GARCIA", "JOHNSON", "MARTINEZ", "BROWN", "LOPEZ", "DAVIS", "HERNANDEZ", "MILLER", "WILSON", "MOORE", "TAYLOR"]
+PARTIES = [("REP", "REPUBLICAN PARTY"), ("DEM", "DEMOCRATIC PARTY"), ("LIB", "LIBERTARIAN PARTY"), ("IND", "INDEPENDENT")]
+INCUMBENCY = [("C", "Challenger"), ("I", "Incumbent"), ("O", "Open seat")]
+SURNAME_SUFFIXES = ["", "SON", "MAN", "TON", "ER", "LEY", "WOOD", "FIELD"]
+OFFICES = {"H": "House", "S": "Senate", "P": "President"}
+
+
+def synthetic_candidates(total: int, states: Sequence[str], cycle: int = 2024, seed: int = 0) -> Dict[Tuple[str, str], List[Dict]]:
+    """Return {(state, office): [raw FEC candidate, ...]} with `total` candidates overall."""
+    rng = random.Random(seed)
+    # Roughly the real mix: mostly House, some Senate, few presidential filings.
+    offices = ["H"] * 7 + ["S"] * 2 + ["P"]
+    data: Dict[Tuple[str, str], List[Dict]] = {}
+    for i in range(total):
+        state = states[i % len(states)]
+        office = offices[(i // len(states)) % len(offices)]
+        # ~100 surnames keep name-matching blocks realistically small at 100k candidates.
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES) + rng.choice(SURNAME_SUFFIXES)
+        party, party_full = rng.choice(PARTIES)
+        incumbent, incumbent_full = rng.choice(INCUMBENCY)
+        data.setdefault((state, office), []).append(
+            {
+                "candidate_id": f"{office}{cycle % 10}{state}{i:05d}",
+                "name": f"{last}, {first} {chr(65 + i % 26)}.",
+                "state": state,
+                "office": office,
+                "office_full": OFFICES[office],
+                "district": f"{i % 36 + 1:02d}" if office == "H" else "00",
+                "party": party,
+                "party_full": party_full,
+                "incumbent_challenge": incumbent,
+                "incumbent_challenge_full": incumbent_full,
+                "election_years": [cycle],
+                "cycles": [cycle],
+                "candidate_status": "C",
+            }
+        )
+    return data
+
+
+class FakeFecServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        candidates: Dict[Tuple[str, str], List[Dict]],
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 0.1,
+        seed: int = 0,
+    ):
+        super().__init__(address, FakeFecHandler)
+        self.candidates = candidates
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{SEARCH_PATH}"
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"requests": self.requests, "throttled": self.throttled}
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.requests = self.throttled = 0
+
+    def start(self) -> "FakeFecServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class FakeFecHandler(BaseHTTPRequestHandler):
+    server: FakeFecServer
+
+    def log_message(self, *_args) -> None:
+        pass
+
+    def send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        parsed = urllib.parse.urlparse(self.path)
+        if parsed.path == "/stats":
+            self.send_json(200, self.server.stats())
+            return
+        if parsed.path.rstrip("/") != SEARCH_PATH.rstrip("/"):
+            self.send_json(404, {"error": "not found"})
+            return
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            throttle = server.error_rate > 0 and server.rng.random() < server.error_rate
+            if throttle:
+                server.throttled += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if throttle:
+            self.send_json(429, {"error": "rate limited"}, {"Retry-After": str(server.retry_after)})
+            return
+
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        if not query.get("api_key"):
+            self.send_json(403, {"error": {"code": "API_KEY_MISSING"}})
+            return
+
+        try:
+            page = max(int(query.get("page", 1)), 1)
+            per_page = min(max(int(query.get("per_page", 20)), 1), MAX_PER_PAGE)
+        except ValueError:
+            self.send_json(422, {"message": "page/per_page must be integers"})
+            return
+
+        state = query.get("state", "").upper()
+        office = query.get("office", "").upper()
+        results: List[Dict] = []
+        for (key_state, key_office), members in server.candidates.items():
+            if (not state or key_state == state) and (not office or key_office == office):
+                results.extend(members)
+
+        count = len(results)
+        pages = -(-count // per_page)
+        self.send_json(
+            200,
+            {
+                "api_version": "1.0",
+                "pagination": {"count": count, "page": page, "pages": pages, "per_page": per_page, "is_count_exact": True},
+                "results": results[(page - 1) * per_page:page * per_page],
+            },
+        )
+
+
+def start_server(
+    total: int,
+    *,
+    states: Sequence[str] = ("TX",),
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    retry_after: float = 0.1,
+    seed: int = 0,
+) -> FakeFecServer:
+    """Start a server in a background thread; port 0 picks a free port (see `.url`)."""
+    candidates = synthetic_candidates(total, list(states), seed=seed)
+    server = FakeFecServer(
+        (host, port),
+        candidates,
+        latency=latency,
+        error_rate=error_rate,
+        retry_after=retry_after,
+        seed=seed,
+    )
+    return server.start()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=8766, help="Port (0 = pick a free one)")
+    parser.add_argument("--candidates", type=int, default=1000, help="Total synthetic candidates")
+    parser.add_argument("--states", default="TX", help="Comma-separated state codes to populate, or `all`")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for names and 429 injection")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        states = parse_states(args.states)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    server = start_server(
+        args.candidates,
+        states=states,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"Serving {args.candidates} candidates at {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
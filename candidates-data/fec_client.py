@@ -0,0 +1,159 @@
+"""Concurrent FEC `/v1/candidates/search/` harvesting shared by the fetch scripts.
+
+Every (state, office) pair is paginated in its own worker thread, while one
+`RateLimiter` shared by all workers keeps the total request rate under the API limit,
+including when the workers all start at once.
+429 and 5xx responses are retried with backoff (honoring `Retry-After`).
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import requests
+
+from metrics import incr, stage
+
+FEC_ENDPOINT = "https://api.open.fec.gov/v1/candidates/search/"
+
+STATE_NAMES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia",
+    "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois",
+    "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana",
+    "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
+    "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
+    "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon",
+    "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina", "SD": "South Dakota",
+    "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont", "VA": "Virginia",
+    "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+    "AS": "American Samoa", "GU": "Guam", "MP": "Northern Mariana Islands",
+    "PR": "Puerto Rico", "VI": "U.S. Virgin Islands",
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Token bucket shared across threads: `rate` requests/second with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def parse_states(value: str) -> List[str]:
+    """Parse `--states` ("TX", "TX,OK,NM" or "all") into upper-case state codes."""
+    if value.strip().lower() == "all":
+        return list(STATE_NAMES)
+    states = [state.strip().upper() for state in value.split(",") if state.strip()]
+    unknown = [state for state in states if state not in STATE_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown state code(s): {', '.join(unknown)}")
+    return states
+
+
+def get_with_retries(
+    session: requests.Session,
+    url: str,
+    params: Dict,
+    *,
+    limiter: RateLimiter,
+    timeout: int = 30,
+    max_retries: int = 5,
+) -> Dict:
+    attempt = 0
+    while True:
+        with stage("fec_rate_limit_wait"):
+            limiter.acquire()
+        with stage("fec_http"):
+            resp = session.get(url, params=params, timeout=timeout)
+        incr("fec_requests")
+        if resp.status_code not in RETRY_STATUSES or attempt >= max_retries:
+            resp.raise_for_status()
+            return resp.json()
+        try:
+            delay = float(resp.headers.get("Retry-After", ""))
+        except ValueError:
+            delay = min(2 ** attempt, 30)
+        incr("fec_retries")
+        time.sleep(delay)
+        attempt += 1
+
+
+def fetch_state_office(
+    api_key: str,
+    cycle: int,
+    state: str,
+    office: str,
+    *,
+    limiter: RateLimiter,
+    endpoint: str = FEC_ENDPOINT,
+) -> List[Dict]:
+    results: List[Dict] = []
+    page = 1
+    with requests.Session() as session:
+        while True:
+            params = {
+                "api_key": api_key,
+                "state": state,
+                "office": office,
+                "cycle": cycle,
+                "per_page": 100,
+                "page": page,
+            }
+            payload = get_with_retries(session, endpoint, params, limiter=limiter)
+            incr("fec_pages")
+            results.extend(payload.get("results", []))
+            pagination = payload.get("pagination", {})
+            if page >= pagination.get("pages", 0):
+                break
+            page += 1
+    return results
+
+
+def harvest(
+    api_key: str,
+    cycle: int,
+    states: Sequence[str],
+    offices: Sequence[str],
+    *,
+    workers: int = 8,
+    rate_limit: float = 5.0,
+    endpoint: str = FEC_ENDPOINT,
+    limiter: Optional[RateLimiter] = None,
+) -> Dict[str, List[Dict]]:
+    """Fetch raw FEC candidates for every state x office; returns {state: [raw, ...]} in input order."""
+    # burst=1: the first requests are spaced like the rest, so no window goes over `rate_limit`
+    limiter = limiter or RateLimiter(rate_limit)
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = {
+            (state, office): pool.submit(
+                fetch_state_office, api_key, cycle, state, office, limiter=limiter, endpoint=endpoint
+            )
+            for state in states
+            for office in offices
+        }
+        by_state: Dict[str, List[Dict]] = {state: [] for state in states}
+        for (state, _office), future in futures.items():
+            by_state[state].extend(future.result())
+    return by_state
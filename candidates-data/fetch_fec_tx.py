@@ -1,54 +1,53 @@
 #!/usr/bin/env python3
-"""Fetch Texas federal candidates from the FEC API and output plugin-ready JSON."""
+"""Fetch federal candidates (Texas by default) from the FEC API and output plugin-ready JSON."""
 
 import argparse
 import json
+import os
 import sys
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-import requests
+from fec_client import FEC_ENDPOINT, STATE_NAMES, harvest, parse_states
+from metrics import add_metrics_arguments, incr, instrument, stage
 
-FEC_ENDPOINT = "https://api.open.fec.gov/v1/candidates/search/"
 
-
-def fetch_candidates(api_key: str, cycle: int, offices: List[str]) -> List[Dict]:
-    # NOTE: state is used for the API query (always TX),
+def fetch_candidates(
+    api_key: str,
+    cycle: int,
+    offices: List[str],
+    *,
+    states: Optional[List[str]] = None,
+    workers: int = 8,
+    rate_limit: float = 5.0,
+    endpoint: str = FEC_ENDPOINT,
+) -> Dict[str, List[Dict]]:
+    # NOTE: state is used for the API query (TX unless --states is given),
     # but the JSON output state value is controlled by --output-state.
-    results: List[Dict] = []
-
-    for office in offices:
-        page = 1
-        while True:
-            params = {
-                "api_key": api_key,
-                "state": "TX",
-                "office": office,
-                "cycle": cycle,
-                "per_page": 100,
-                "page": page,
+    by_state = harvest(
+        api_key,
+        cycle,
+        states or ["TX"],
+        offices,
+        workers=workers,
+        rate_limit=rate_limit,
+        endpoint=endpoint,
+    )
+
+    results: Dict[str, List[Dict]] = {}
+    for state, candidates in by_state.items():
+        results[state] = [
+            {
+                "external_id": candidate.get("candidate_id", ""),
+                "name": candidate.get("name", ""),
+                "state": candidate.get("state", state),
+                "district": candidate.get("district", ""),
+                "office": candidate.get("office_full") or candidate.get("office", ""),
+                "website": candidate.get("website", ""),
+                "featured": False,
+                "approved": False,
             }
-            resp = requests.get(FEC_ENDPOINT, params=params, timeout=30)
-            resp.raise_for_status()
-            payload = resp.json()
-            candidates = payload.get("results", [])
-            for candidate in candidates:
-                results.append(
-                    {
-                        "external_id": candidate.get("candidate_id", ""),
-                        "name": candidate.get("name", ""),
-                        "state": candidate.get("state", "TX"),
-                        "district": candidate.get("district", ""),
-                        "office": candidate.get("office_full") or candidate.get("office", ""),
-                        "website": candidate.get("website", ""),
-                        "featured": False,
-                        "approved": False,
-                    }
-                )
-
-            pagination = payload.get("pagination", {})
-            if page >= pagination.get("pages", 0):
-                break
-            page += 1
+            for candidate in candidates
+        ]
 
     return results
 
@@ -57,36 +56,80 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--api-key", required=True, help="FEC API key")
     parser.add_argument("--cycle", type=int, default=2024, help="Election cycle year")
+    parser.add_argument(
+        "--states",
+        default="TX",
+        help="Comma-separated state codes to harvest, or `all` (default: TX)",
+    )
     parser.add_argument(
         "--output-state",
-        default="Texas",
-        help="State value to write to JSON output (default: Texas)",
+        help="State value to write to JSON output for a single-state run (default: full state name, e.g. Texas)",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent state/office harvests")
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=5.0,
+        help="Max requests per second, shared by all workers (0 = unlimited)",
     )
+    parser.add_argument("--endpoint", default=FEC_ENDPOINT, help="FEC candidate search endpoint")
     parser.add_argument(
         "--offices",
         default="H,S,P",
         help="Comma-separated offices to include (H,S,P)",
     )
     parser.add_argument("--output", default="fec-tx.json", help="Output JSON file")
+    add_metrics_arguments(parser)
     return parser.parse_args()
 
 
-def main() -> int:
-    args = parse_args()
+def run(args: argparse.Namespace) -> int:
     offices = [office.strip().upper() for office in args.offices.split(",") if office.strip()]
     if not offices:
         print("No offices provided.", file=sys.stderr)
         return 1
 
-    data = fetch_candidates(args.api_key, args.cycle, offices)
-    for candidate in data:
-        # Standardize the output state so directory filters work consistently.
-        candidate["state"] = args.output_state
-    with open(args.output, "w", encoding="utf-8") as handle:
+    try:
+        states = parse_states(args.states)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    with stage("fetch_fec"):
+        by_state = fetch_candidates(
+            args.api_key,
+            args.cycle,
+            offices,
+            states=states,
+            workers=args.workers,
+            rate_limit=args.rate_limit,
+            endpoint=args.endpoint,
+        )
+    data: List[Dict] = []
+    root, ext = os.path.splitext(args.output)
+    for state, candidates in by_state.items():
+        for candidate in candidates:
+            # Standardize the output state so directory filters work consistently.
+            candidate["state"] = args.output_state if args.output_state and len(states) == 1 else STATE_NAMES[state]
+        data.extend(candidates)
+        if len(states) > 1:
+            state_output = f"{root}-{state.lower()}{ext or '.json'}"
+            with stage("write_output"), open(state_output, "w", encoding="utf-8") as handle:
+                json.dump(candidates, handle, indent=2)
+            print(f"Wrote {len(candidates)} candidates to {state_output}")
+
+    with stage("write_output"), open(args.output, "w", encoding="utf-8") as handle:
         json.dump(data, handle, indent=2)
+    incr("candidates_written", len(data))
     print(f"Wrote {len(data)} candidates to {args.output}")
     return 0
 
 
+def main() -> int:
+    args = parse_args()
+    with instrument("fetch_fec_tx", args, output=args.output):
+        return run(args)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
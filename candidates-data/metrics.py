@@ -0,0 +1,175 @@
+"""Stage timers, counters and optional profiling shared by the candidates-data scripts.
+
+Scripts call `add_metrics_arguments(parser)` and run their body inside `instrument()`:
+
+    with instrument("combine_fec_sos", args, output=args.output):
+        with stage("load_sos_csv"):
+            ...
+        incr("rows_read")
+
+Library code (e.g. `fec_client`) only uses the module-level `stage()`/`incr()`, which
+record into the active session, so counters don't need to be threaded through call
+signatures. With `--metrics` (or `--profile`) a JSON report is written next to the
+output: `<output root>.<tool>.metrics.json`, or `<dir>/<tool>.metrics.json` when the
+output is a directory. `--profile` also runs cProfile and tracemalloc and writes the raw
+profile to `<output root>.<tool>.pstats` (cProfile only sees the main thread; worker threads and
+processes show up in stage timings and counters).
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_TOP_FUNCTIONS = 25
+
+
+class Metrics:
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                entry = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+                entry["seconds"] += elapsed
+                entry["calls"] += 1
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self) -> Dict:
+        with self.lock:
+            stages = {name: {"seconds": round(entry["seconds"], 6), "calls": entry["calls"]} for name, entry in self.stages.items()}
+            counters = dict(self.counters)
+        report = {
+            "tool": self.tool,
+            "argv": sys.argv[1:],
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": stages,
+            "counters": counters,
+        }
+        if resource is not None:
+            # ru_maxrss is KiB on Linux, bytes on macOS.
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            report["peak_rss_mb"] = round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+        return report
+
+
+_active = Metrics("unknown")
+
+
+def current() -> Metrics:
+    return _active
+
+
+def stage(name: str):
+    return _active.stage(name)
+
+
+def incr(name: str, amount: int = 1) -> None:
+    _active.incr(name, amount)
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--metrics",
+        nargs="?",
+        const="auto",
+        help="Write a metrics JSON report (stage timings, counters); optional path, default next to the output",
+    )
+    parser.add_argument("--profile", action="store_true", help="Also profile the run with cProfile and tracemalloc")
+
+
+def metrics_path(tool: str, output: Optional[str]) -> str:
+    if not output:
+        return f"{tool}.metrics.json"
+    if os.path.isdir(output):
+        return os.path.join(output, f"{tool}.metrics.json")
+    root, _ext = os.path.splitext(output)
+    return f"{root}.{tool}.metrics.json"
+
+
+def _top_functions(profiler: cProfile.Profile) -> List[Dict]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_cc, calls, tottime, cumtime, _callers) in stats.stats.items():
+        rows.append(
+            {
+                "function": f"{os.path.basename(filename)}:{line}({function})",
+                "calls": calls,
+                "tottime": round(tottime, 6),
+                "cumtime": round(cumtime, 6),
+            }
+        )
+    rows.sort(key=lambda row: row["cumtime"], reverse=True)
+    return rows[:PROFILE_TOP_FUNCTIONS]
+
+
+@contextmanager
+def instrument(tool: str, args: argparse.Namespace, *, output: Optional[str] = None) -> Iterator[Metrics]:
+    """Start a metrics session for one script run; writes the report on exit if requested."""
+    global _active
+    _active = Metrics(tool)
+    enabled = bool(getattr(args, "metrics", None) or getattr(args, "profile", False))
+    profiler: Optional[cProfile.Profile] = None
+    if getattr(args, "profile", False):
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield _active
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if enabled:
+            path = args.metrics if args.metrics not in (None, "auto") else metrics_path(tool, output)
+            report = _active.report()
+            if profiler is not None:
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                base = path[: -len(".metrics.json")] if path.endswith(".metrics.json") else os.path.splitext(path)[0]
+                pstats_path = f"{base}.pstats"
+                try:
+                    profiler.dump_stats(pstats_path)
+                except OSError:
+                    pstats_path = ""
+                report["profile"] = {
+                    "tracemalloc_peak_mb": round(peak / (1024 * 1024), 1),
+                    "pstats": pstats_path,
+                    "top_functions": _top_functions(profiler),
+                }
+            try:
+                with open(path, "w", encoding="utf-8") as handle:
+                    json.dump(report, handle, indent=2)
+            except OSError as e:
+                # Don't mask the error that made the run fail (e.g. a missing output directory).
+                print(f"Could not write metrics to {path}: {e}", file=sys.stderr)
+            else:
+                print(f"Wrote metrics to {path}", file=sys.stderr)
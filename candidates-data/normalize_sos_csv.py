@@ -5,8 +5,12 @@ import argparse
 import csv
 import json
 import re
+from functools import partial
 from typing import Dict, List
 
+from csv_chunks import normalize_csv_parallel
+from metrics import add_metrics_arguments, incr, instrument, stage
+
 
 def slugify(value: str) -> str:
     value = value.strip().lower()
@@ -115,11 +119,17 @@ def parse_args() -> argparse.Namespace:
         parser.add_argument(f"--button-{i}-label", default=f"button_{i}_label", help=f"CSV column for button {i} label")
         parser.add_argument(f"--button-{i}-url", default=f"button_{i}_url", help=f"CSV column for button {i} URL")
     parser.add_argument("--category", default="category", help="CSV column for category slugs (comma-separated)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Normalize in N processes over memory-mapped chunks (output matches a serial run; 0 = CPU count)",
+    )
+    add_metrics_arguments(parser)
     return parser.parse_args()
 
 
-def main() -> int:
-    args = parse_args()
+def run(args: argparse.Namespace) -> int:
     mapping = {
         "name": args.name,
         "first_name": args.first_name,
@@ -144,28 +154,54 @@ def main() -> int:
         mapping[f"button_{i}_url"] = getattr(args, f"button_{i}_url")
 
     data: List[Dict] = []
-    seen_external_ids: Dict[str, int] = {}
-    with open(args.input, newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            if not row:
-                continue
-            normalized = normalize_row(
-                row,
-                mapping,
+    with stage("normalize"):
+        if args.workers != 1:
+            normalize = partial(
+                normalize_row,
+                mapping=mapping,
                 default_state=args.default_state,
                 external_id_prefix=args.external_id_prefix,
-                seen_external_ids=seen_external_ids,
             )
-            if normalized["name"]:
-                data.append(normalized)
-
-    with open(args.output, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2)
+            data = normalize_csv_parallel(
+                args.input,
+                normalize,
+                external_id_column=mapping["external_id"],
+                workers=args.workers or None,
+            )
+        else:
+            seen_external_ids: Dict[str, int] = {}
+            with open(args.input, newline="", encoding="utf-8") as handle:
+                reader = csv.DictReader(handle)
+                for row in reader:
+                    if not row:
+                        continue
+                    incr("rows_read")
+                    normalized = normalize_row(
+                        row,
+                        mapping,
+                        default_state=args.default_state,
+                        external_id_prefix=args.external_id_prefix,
+                        seen_external_ids=seen_external_ids,
+                    )
+                    if normalized["name"]:
+                        data.append(normalized)
+                    else:
+                        incr("rows_dropped_missing_name")
+
+    with stage("write_output"):
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, indent=2)
+    incr("candidates_written", len(data))
 
     print(f"Wrote {len(data)} candidates to {args.output}")
     return 0
 
 
+def main() -> int:
+    args = parse_args()
+    with instrument("normalize_sos_csv", args, output=args.output):
+        return run(args)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
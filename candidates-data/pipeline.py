@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Run the candidate data pipeline as a cached DAG: fetch → normalize → merge → validate → publish.
+
+    fetch_fec ─────┐
+                   ├─> merge ─> validate ─> publish
+    normalize_sos ─┘
+
+Each stage runs one of the existing scripts. Its outputs are stored under
+`<cache-dir>/<stage>/<key>/`, where the key hashes the stage parameters, the content of
+its input files and the candidates-data scripts themselves. A stage whose key already
+has outputs is skipped, and stages whose dependencies are done (FEC fetch and SOS
+normalize) run in parallel.
+
+FEC results depend on the live API, not just on parameters: pass `--force fetch_fec`
+to refetch.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGE_MARKER = "stage.json"
+
+
+class StageFailed(Exception):
+    pass
+
+
+class Stage:
+    """One pipeline step.
+
+    `run(output_dir, inputs)` writes the stage outputs into `output_dir`; `inputs` maps
+    each dependency name to that dependency's output directory.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[str, Dict[str, str]], None],
+        *,
+        deps: Optional[List[str]] = None,
+        params: Optional[Dict] = None,
+        input_files: Optional[List[str]] = None,
+        cacheable: bool = True,
+    ):
+        self.name = name
+        self.run = run
+        self.deps = deps or []
+        self.params = params or {}
+        self.input_files = input_files or []
+        self.cacheable = cacheable
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dir_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        # Logs mention the temporary build directory, so they would change every key downstream.
+        if name == STAGE_MARKER or name.endswith(".log"):
+            continue
+        full = os.path.join(path, name)
+        if os.path.isfile(full):
+            digest.update(name.encode("utf-8"))
+            digest.update(file_digest(full).encode("ascii"))
+    return digest.hexdigest()
+
+
+def code_digest() -> str:
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(SCRIPT_DIR)):
+        if name.endswith(".py"):
+            digest.update(name.encode("utf-8"))
+            digest.update(file_digest(os.path.join(SCRIPT_DIR, name)).encode("ascii"))
+    return digest.hexdigest()
+
+
+def run_script(script: str, args: List[str], *, log_path: str) -> None:
+    command = [sys.executable, os.path.join(SCRIPT_DIR, script)] + args
+    with open(log_path, "w", encoding="utf-8") as log:
+        result = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT, cwd=SCRIPT_DIR)
+    if result.returncode != 0:
+        with open(log_path, "r", encoding="utf-8") as log:
+            raise StageFailed(f"{script} exited with {result.returncode}:\n{log.read()}")
+
+
+class Pipeline:
+    def __init__(self, stages: List[Stage], cache_dir: str, *, jobs: int = 2, force: Optional[List[str]] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = cache_dir
+        self.jobs = jobs
+        self.force = set(force or [])
+        self.code = code_digest()
+
+    def stage_key(self, stage: Stage, dep_dirs: Dict[str, str]) -> str:
+        payload = {
+            "stage": stage.name,
+            "code": self.code,
+            "params": stage.params,
+            "files": {path: file_digest(path) for path in stage.input_files},
+            "deps": {name: dir_digest(path) for name, path in sorted(dep_dirs.items())},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def run_stage(self, stage: Stage, dep_dirs: Dict[str, str]) -> Dict:
+        key = self.stage_key(stage, dep_dirs)
+        output_dir = os.path.join(self.cache_dir, stage.name, key)
+        if (
+            stage.cacheable
+            and stage.name not in self.force
+            and os.path.exists(os.path.join(output_dir, STAGE_MARKER))
+        ):
+            return {"stage": stage.name, "key": key, "output_dir": output_dir, "cached": True, "seconds": 0.0}
+
+        started = time.monotonic()
+        tmp_dir = f"{output_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            stage.run(tmp_dir, dep_dirs)
+            with open(os.path.join(tmp_dir, STAGE_MARKER), "w", encoding="utf-8") as handle:
+                json.dump({"stage": stage.name, "key": key, "params": stage.params}, handle, indent=2)
+        except BaseException:
+            # The stage log is already in the StageFailed message; nothing in here is reusable.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        # Publish the whole directory at once so an interrupted run never looks cached.
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.replace(tmp_dir, output_dir)
+        return {
+            "stage": stage.name,
+            "key": key,
+            "output_dir": output_dir,
+            "cached": False,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+
+    def run(self) -> List[Dict]:
+        done: Dict[str, Dict] = {}
+        pending = dict(self.stages)
+        running: Dict = {}
+        with ThreadPoolExecutor(max_workers=max(self.jobs, 1)) as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(dep in done for dep in stage.deps):
+                        dep_dirs = {dep: done[dep]["output_dir"] for dep in stage.deps}
+                        running[pool.submit(self.run_stage, stage, dep_dirs)] = name
+                        del pending[name]
+                if not running:
+                    missing = {name: [d for d in stage.deps if d not in self.stages] for name, stage in pending.items()}
+                    raise StageFailed(f"Unresolvable stage dependencies: {missing}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    result = future.result()
+                    done[name] = result
+                    status = "cached" if result["cached"] else f"ran in {result['seconds']:.2f}s"
+                    print(f"[{name}] {status} ({result['key']})")
+        return [done[name] for name in self.stages]
+
+
+def build_stages(args: argparse.Namespace) -> List[Stage]:
+    stages: List[Stage] = []
+    merge_deps: List[str] = []
+
+    if args.fec_api_key:
+        fec_params = {
+            "cycle": args.fec_cycle,
+            "offices": args.fec_offices,
+            "states": args.states,
+            "endpoint": args.fec_endpoint,
+        }
+
+        def fetch_fec(output_dir: str, _inputs: Dict[str, str]) -> None:
+            run_script(
+                "combine_fec_sos.py",
+                [
+                    "--fec-api-key", args.fec_api_key,
+                    "--fec-cycle", str(args.fec_cycle),
+                    "--fec-offices", args.fec_offices,
+                    "--states", args.states,
+                    "--fec-endpoint", args.fec_endpoint,
+                    "--output", os.path.join(output_dir, "fec.json"),
+                ],
+                log_path=os.path.join(output_dir, "fetch_fec.log"),
+            )
+
+        stages.append(Stage("fetch_fec", fetch_fec, params=fec_params))
+        merge_deps.append("fetch_fec")
+
+    if args.sos_csv:
+        sos_csv = os.path.abspath(args.sos_csv)
+        column_args: List[str] = []
+        for mapping in args.sos_column or []:
+            field, _, column = mapping.partition("=")
+            column_args += [f"--{field.strip().replace('_', '-')}", column.strip()]
+
+        def normalize_sos(output_dir: str, _inputs: Dict[str, str]) -> None:
+            run_script(
+                "combine_fec_sos.py",
+                [
+                    "--sos-csv", sos_csv,
+                    "--sos-workers", str(args.sos_workers),
+                    "--external-id-prefix", args.external_id_prefix,
+                    "--output", os.path.join(output_dir, "sos.json"),
+                ] + column_args,
+                log_path=os.path.join(output_dir, "normalize_sos.log"),
+            )
+
+        stages.append(
+            Stage(
+                "normalize_sos",
+                normalize_sos,
+                params={"columns": column_args, "external_id_prefix": args.external_id_prefix},
+                input_files=[sos_csv],
+            )
+        )
+        merge_deps.append("normalize_sos")
+
+    def merge(output_dir: str, inputs: Dict[str, str]) -> None:
+        merge_args: List[str] = []
+        for name in merge_deps:
+            merge_args += ["--input-json", os.path.join(inputs[name], "fec.json" if name == "fetch_fec" else "sos.json")]
+        if args.resolve_duplicates:
+            merge_args.append("--resolve-duplicates")
+        run_script(
+            "combine_fec_sos.py",
+            merge_args + ["--output", os.path.join(output_dir, "candidates.json")],
+            log_path=os.path.join(output_dir, "merge.log"),
+        )
+
+    stages.append(Stage("merge", merge, deps=merge_deps, params={"resolve_duplicates": args.resolve_duplicates}))
+
+    def validate(output_dir: str, inputs: Dict[str, str]) -> None:
+        validate_args = ["--input", os.path.join(inputs["merge"], "candidates.json")]
+        if args.strict:
+            validate_args.append("--strict")
+        run_script("validate_candidates_json.py", validate_args, log_path=os.path.join(output_dir, "validate.log"))
+
+    stages.append(Stage("validate", validate, deps=["merge"], params={"strict": args.strict}))
+
+    if args.publish:
+        publish_path = os.path.abspath(args.publish)
+
+        def publish(output_dir: str, inputs: Dict[str, str]) -> None:
+            source = os.path.join(inputs["merge"], "candidates.json")
+            if not (os.path.exists(publish_path) and file_digest(publish_path) == file_digest(source)):
+                os.makedirs(os.path.dirname(publish_path), exist_ok=True)
+                shutil.copyfile(source, publish_path)
+            with open(os.path.join(output_dir, "published.txt"), "w", encoding="utf-8") as handle:
+                handle.write(publish_path + "\n")
+
+        # Not cached: the destination may have been edited or removed since the last run.
+        stages.append(Stage("publish", publish, deps=["merge", "validate"], params={"path": publish_path}, cacheable=False))
+
+    return stages
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache-dir", default=".pipeline-cache", help="Stage output cache directory")
+    parser.add_argument("--jobs", type=int, default=2, help="Stages to run in parallel")
+    parser.add_argument("--force", action="append", help="Re-run this stage even if cached (repeatable)")
+    parser.add_argument("--fec-api-key", help="FEC API key (omit to skip the FEC fetch stage)")
+    parser.add_argument("--fec-cycle", type=int, default=2024, help="FEC cycle year")
+    parser.add_argument("--fec-offices", default="H,S,P", help="Comma-separated offices")
+    parser.add_argument("--states", default="TX", help="Comma-separated state codes, or `all`")
+    parser.add_argument("--fec-endpoint", default="https://api.open.fec.gov/v1/candidates/search/", help="FEC endpoint")
+    parser.add_argument("--sos-csv", help="Texas SOS CSV (omit to skip the SOS normalize stage)")
+    parser.add_argument(
+        "--sos-column",
+        action="append",
+        help="SOS column mapping as FIELD=COLUMN, e.g. name=CandidateName (repeatable)",
+    )
+    parser.add_argument("--sos-workers", type=int, default=1, help="Processes for SOS normalization")
+    parser.add_argument("--external-id-prefix", default="txsos", help="Prefix for generated SOS external_id")
+    parser.add_argument("--resolve-duplicates", action="store_true", help="Merge FEC/SOS duplicates")
+    parser.add_argument("--strict", action="store_true", help="Validate with --strict")
+    parser.add_argument("--publish", help="Copy the validated dataset here, e.g. pia-candidates-mu/data/tx.json")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if not args.fec_api_key and not args.sos_csv:
+        print("Nothing to do: pass --fec-api-key and/or --sos-csv.", file=sys.stderr)
+        return 1
+
+    args.cache_dir = os.path.abspath(args.cache_dir)
+    pipeline = Pipeline(build_stages(args), args.cache_dir, jobs=args.jobs, force=args.force)
+    try:
+        results = pipeline.run()
+    except StageFailed as e:
+        print(f"Pipeline failed: {e}", file=sys.stderr)
+        return 1
+
+    merged = next(result for result in results if result["stage"] == "merge")
+    print(f"Dataset: {os.path.join(merged['output_dir'], 'candidates.json')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Prefetch candidate portraits into a local cache and rewrite the dataset with thumbnails.
+
+- Downloads every distinct `portrait_url` concurrently into a content-addressed cache
+  (`<cache-dir>/objects/<sha256>`); `<cache-dir>/urls.json` remembers which URL maps to
+  which object so re-runs skip downloads.
+- Generates fixed-size (bounding box, aspect preserved) JPEG thumbnails with Pillow in a
+  process pool (`<cache-dir>/thumbs/<sha256>-<W>x<H>.jpg`).
+- Writes the dataset with `portrait_thumbnail: {path, width, height}` per candidate. With
+  `--public-base-url`, `portrait_url` is pointed at the thumbnail and the original URL is
+  kept in `portrait_source_url`.
+
+`video_url` values are embeds (YouTube/Vimeo) and are left untouched. If any download or
+thumbnail fails, the dataset is still written but the exit status is 1.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from dataset_io import load_dataset, write_dataset
+from metrics import add_metrics_arguments, incr, instrument, stage
+
+URL_MAP_NAME = "urls.json"
+# mkstemp() creates 0600 files; thumbnails are uploaded and served as-is.
+PUBLIC_FILE_MODE = 0o644
+
+
+def object_path(cache_dir: str, digest: str) -> str:
+    return os.path.join(cache_dir, "objects", digest[:2], digest)
+
+
+def load_url_map(cache_dir: str) -> Dict[str, str]:
+    path = os.path.join(cache_dir, URL_MAP_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_url_map(cache_dir: str, url_map: Dict[str, str]) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, URL_MAP_NAME), "w", encoding="utf-8") as handle:
+        json.dump(url_map, handle, indent=2, sort_keys=True)
+
+
+def write_atomically(path: str, write) -> None:
+    """Write `path` through a temp file in the same directory; on failure the temp file is removed."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=os.path.splitext(path)[1])
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            write(handle)
+        os.chmod(tmp_path, PUBLIC_FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def download(url: str, cache_dir: str, timeout: int) -> str:
+    """Download `url` into the object cache and return the sha256 of its content."""
+    resp = requests.get(url, timeout=timeout)
+    resp.raise_for_status()
+    content_type = resp.headers.get("Content-Type", "").split(";")[0].strip()
+    if content_type and not content_type.startswith("image/"):
+        raise ValueError(f"unexpected content type {content_type!r}")
+
+    digest = hashlib.sha256(resp.content).hexdigest()
+    path = object_path(cache_dir, digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file first so a crashed run never leaves a truncated object.
+        write_atomically(path, lambda handle: handle.write(resp.content))
+    return digest
+
+
+def make_thumbnail(source_path: str, dest_dir: str, digest: str, size: Tuple[int, int]) -> Tuple[str, int, int]:
+    """Render a thumbnail for one cached object. Runs in a worker process."""
+    from PIL import Image
+
+    os.makedirs(dest_dir, exist_ok=True)
+    with Image.open(source_path) as image:
+        image = image.convert("RGB")
+        image.thumbnail(size, Image.LANCZOS)
+        width, height = image.size
+        dest_path = os.path.join(dest_dir, f"{digest}-{width}x{height}.jpg")
+        if not os.path.exists(dest_path):
+            write_atomically(dest_path, lambda handle: image.save(handle, "JPEG", quality=85, optimize=True))
+    return dest_path, width, height
+
+
+def prefetch(
+    urls: List[str],
+    cache_dir: str,
+    *,
+    download_workers: int,
+    timeout: int,
+    refresh: bool = False,
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Return (url -> digest, url -> error) for every URL."""
+    url_map = {} if refresh else load_url_map(cache_dir)
+    pending = [url for url in urls if url not in url_map or not os.path.exists(object_path(cache_dir, url_map[url]))]
+    errors: Dict[str, str] = {}
+
+    with ThreadPoolExecutor(max_workers=download_workers) as pool:
+        futures = {url: pool.submit(download, url, cache_dir, timeout) for url in pending}
+        for url, future in futures.items():
+            try:
+                url_map[url] = future.result()
+            except (requests.RequestException, ValueError, OSError) as e:
+                url_map.pop(url, None)
+                errors[url] = str(e)
+
+    save_url_map(cache_dir, url_map)
+    return {url: url_map[url] for url in urls if url in url_map}, errors
+
+
+def build_thumbnails(
+    digests: List[str],
+    cache_dir: str,
+    size: Tuple[int, int],
+    *,
+    workers: Optional[int],
+) -> Tuple[Dict[str, Tuple[str, int, int]], Dict[str, str]]:
+    thumbs_dir = os.path.join(cache_dir, "thumbs")
+    thumbnails: Dict[str, Tuple[str, int, int]] = {}
+    errors: Dict[str, str] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            digest: pool.submit(make_thumbnail, object_path(cache_dir, digest), thumbs_dir, digest, size)
+            for digest in digests
+        }
+        for digest, future in futures.items():
+            try:
+                thumbnails[digest] = future.result()
+            except Exception as e:  # Pillow raises a variety of decoder errors.
+                errors[digest] = str(e)
+    return thumbnails, errors
+
+
+def source_url(candidate: Dict) -> str:
+    # Re-runs over an already rewritten dataset must fetch the original, not our thumbnail.
+    url = candidate.get("portrait_source_url") or candidate.get("portrait_url") or ""
+    return url.strip() if isinstance(url, str) else ""
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height or width)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="Candidate dataset JSON (flat list or grouped object)")
+    parser.add_argument("--output", required=True, help="Output JSON with thumbnail paths and dimensions")
+    parser.add_argument("--cache-dir", default="portrait-cache", help="Content-addressed download/thumbnail cache")
+    parser.add_argument("--size", default="300x300", help="Thumbnail bounding box, WxH (default: 300x300)")
+    parser.add_argument("--download-workers", type=int, default=8, help="Concurrent downloads")
+    parser.add_argument("--thumbnail-workers", type=int, default=None, help="Thumbnail processes (default: CPU count)")
+    parser.add_argument("--timeout", type=int, default=30, help="Per-download timeout in seconds")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the URL map and re-download everything")
+    parser.add_argument(
+        "--public-base-url",
+        help="If set, rewrite portrait_url to <base>/<thumbnail path relative to cache dir>",
+    )
+    add_metrics_arguments(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        with stage("load_input"):
+            candidates = load_dataset(args.input, dedupe=True)
+    except FileNotFoundError:
+        print(f"File not found: {args.input}", file=sys.stderr)
+        return 2
+    except json.JSONDecodeError as e:
+        print(f"Invalid JSON: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Pillow is required for thumbnails: pip install -r candidates-data/requirements.txt", file=sys.stderr)
+        return 2
+
+    urls = list(dict.fromkeys(url for url in map(source_url, candidates) if url))
+    with stage("download"):
+        digests, download_errors = prefetch(
+            urls,
+            args.cache_dir,
+            download_workers=args.download_workers,
+            timeout=args.timeout,
+            refresh=args.refresh,
+        )
+    with stage("thumbnails"):
+        thumbnails, thumbnail_errors = build_thumbnails(
+            sorted(set(digests.values())),
+            args.cache_dir,
+            parse_size(args.size),
+            workers=args.thumbnail_workers,
+        )
+    incr("portraits", len(urls))
+    incr("download_errors", len(download_errors))
+    incr("thumbnail_errors", len(thumbnail_errors))
+
+    rewritten = 0
+    for candidate in candidates:
+        url = source_url(candidate)
+        thumb = thumbnails.get(digests.get(url, ""))
+        if not thumb:
+            continue
+        path, width, height = thumb
+        relative_path = os.path.relpath(path, args.cache_dir).replace(os.sep, "/")
+        candidate["portrait_thumbnail"] = {"path": relative_path, "width": width, "height": height}
+        if args.public_base_url:
+            candidate["portrait_source_url"] = url
+            candidate["portrait_url"] = f"{args.public_base_url.rstrip('/')}/{relative_path}"
+        rewritten += 1
+
+    with stage("write_output"):
+        write_dataset(args.output, candidates)
+
+    print(f"Wrote {len(candidates)} candidates to {args.output} ({rewritten} with thumbnails, {len(urls)} distinct portraits)")
+    failures = [f"{url}: {error}" for url, error in download_errors.items()]
+    failures += [f"{digest[:12]}: {error}" for digest, error in thumbnail_errors.items()]
+    if failures:
+        print(f"FAILED ({len(failures)}):", file=sys.stderr)
+        for msg in failures[:50]:
+            print(f"- {msg}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    with instrument("prefetch_portraits", args, output=args.output):
+        return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""Pre-render `[pia_candidate_directory]` and `[pia_candidate_profile]` output as static HTML.
+
+Layout written under `--output-dir`:
+
+    manifest.json                          page -> input hash, plus facet value -> directory
+    directory/all/page-<n>.html            every candidate, `--per-page` cards per page
+    directory/<facet>/<value>/page-<n>.html  one listing per state/county/district/office/category value
+    profiles/<slug>.html                   one profile fragment per candidate
+
+Markup mirrors the plugin's shortcodes (same classes, ordering and "Information
+pending/not provided" fallbacks), so the fragments can be served in place of the
+shortcode output. Facet listings use the same case-insensitive substring match as the
+shortcode's `LIKE` filters (via `directory_index.query_index()`).
+
+Pages are rendered in a process pool. Each page's inputs (its records and the render
+options) are hashed; pages whose hash matches the previous manifest and whose file
+still exists are skipped, so a re-run after a small data change only rewrites the
+affected pages. Files for pages that no longer exist are removed.
+
+`bio` is inserted as HTML after the same kind of allowlist filtering the importer
+applies with `wp_kses_post()` (see `sanitize_html()`); plain-text bios are escaped and
+split into paragraphs. Every `href`/`src` goes through `esc_url()`, which, like
+WordPress's, keeps only http, https, mailto and relative URLs. Video URLs are rendered
+as links, since oEmbed lookups need WordPress.
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from dataset_io import canonical_json, content_hash, dataset_hash, load_dataset
+from directory_index import build_index, get_records, query_index
+from metrics import add_metrics_arguments, incr, instrument, stage
+
+MANIFEST_NAME = "manifest.json"
+MISSING_TEXT = "Information pending/not provided"
+DEFAULT_FACETS = "state,county,district,office,category"
+
+ALLOWED_URL_SCHEMES = ("http", "https", "mailto")
+URL_ATTRIBUTES = {"href", "src", "cite"}
+# The post-content subset of wp_kses_allowed_html("post") that candidate bios use.
+GLOBAL_ATTRIBUTES = {"class", "id", "title", "lang", "dir"}
+ALLOWED_TAGS: Dict[str, set] = {
+    "a": {"href", "target", "rel", "name"},
+    "abbr": set(),
+    "b": set(),
+    "blockquote": {"cite"},
+    "br": set(),
+    "cite": set(),
+    "code": set(),
+    "del": {"datetime"},
+    "div": {"align"},
+    "em": set(),
+    "h1": set(),
+    "h2": set(),
+    "h3": set(),
+    "h4": set(),
+    "h5": set(),
+    "h6": set(),
+    "hr": set(),
+    "i": set(),
+    "img": {"src", "alt", "width", "height", "loading"},
+    "ins": {"datetime"},
+    "li": set(),
+    "ol": {"start", "reversed"},
+    "p": {"align"},
+    "pre": set(),
+    "q": {"cite"},
+    "s": set(),
+    "small": set(),
+    "span": set(),
+    "strong": set(),
+    "sub": set(),
+    "sup": set(),
+    "table": set(),
+    "tbody": set(),
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan", "scope"},
+    "thead": set(),
+    "tr": set(),
+    "u": set(),
+    "ul": set(),
+}
+VOID_TAGS = {"br", "hr", "img"}
+# Removed together with their content; other disallowed tags are removed and their text kept, as kses does.
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "noscript", "template", "textarea", "select"}
+
+
+def slugify(value: str) -> str:
+    value = value.strip().lower()
+    value = re.sub(r"[^a-z0-9]+", "-", value)
+    return value.strip("-")
+
+
+def esc(value) -> str:
+    return html.escape(str(value or ""), quote=True)
+
+
+def esc_url(value) -> str:
+    """Escaped URL for an href/src attribute, or "" unless it is http(s), mailto or relative."""
+    # Browsers ignore whitespace and control characters inside a scheme ("java\tscript:").
+    url = re.sub(r"[\x00-\x20\x7f]+", "", str(value or ""))
+    scheme = re.match(r"([^/?#]*):", url)
+    if not url or (scheme and scheme.group(1).lower() not in ALLOWED_URL_SCHEMES):
+        return ""
+    return html.escape(url, quote=True)
+
+
+class _HtmlSanitizer(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.out: List[str] = []
+        self.open_tags: List[str] = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_TAGS[tag] | GLOBAL_ATTRIBUTES
+        kept = []
+        for name, value in attrs:
+            # Event handlers, style and anything else outside the allowlist are dropped.
+            if name not in allowed:
+                continue
+            value = esc_url(value) if name in URL_ATTRIBUTES else esc(value)
+            if value or name not in URL_ATTRIBUTES:
+                kept.append(f' {name}="{value}"')
+        if tag in VOID_TAGS:
+            self.out.append(f"<{tag}{''.join(kept)} />")
+        else:
+            self.out.append(f"<{tag}{''.join(kept)}>")
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        if tag in DROP_CONTENT_TAGS:
+            return
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        # Close anything still open inside this element so the fragment stays balanced.
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.out.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data: str) -> None:
+        if not self.dropping:
+            self.out.append(esc(data))
+
+    def result(self) -> str:
+        self.close()
+        return "".join(self.out) + "".join(f"</{tag}>" for tag in reversed(self.open_tags))
+
+
+def sanitize_html(value: str) -> str:
+    """Allowlist-filter an HTML fragment the way `wp_kses_post()` does.
+
+    Tags outside ALLOWED_TAGS, attributes outside their allowlist (including every on*
+    handler) and non-http(s)/mailto URLs are removed; text is re-escaped.
+    """
+    sanitizer = _HtmlSanitizer()
+    sanitizer.feed(value)
+    return sanitizer.result()
+
+
+def renderer_digest() -> str:
+    # Markup changes in this file must re-render every page.
+    with open(os.path.abspath(__file__), "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()
+
+
+def render_portrait(portrait_url: str, approved: bool, badge_url: str) -> str:
+    output = '<div class="pia-candidate-portrait">'
+    if portrait_url:
+        output += f'<img src="{esc_url(portrait_url)}" alt="" />'
+    else:
+        output += f'<div class="pia-candidate-portrait--placeholder">{esc(MISSING_TEXT)}</div>'
+    if approved and badge_url:
+        output += f'<span class="pia-candidate-badge"><img src="{esc_url(badge_url)}" alt="PIA Approved" /></span>'
+    return output + "</div>"
+
+
+def location_text(record: Dict) -> str:
+    parts = [str(record.get(key) or "") for key in ("state", "county", "district")]
+    return " • ".join(part for part in parts if part) or MISSING_TEXT
+
+
+def render_bio(bio: str) -> str:
+    if not (bio or "").strip():
+        return f"<p>{esc(MISSING_TEXT)}</p>"
+    if re.search(r"<[a-zA-Z/][^>]*>", bio):
+        return sanitize_html(bio)
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", bio) if p.strip()]
+    return "".join(f"<p>{esc(p).replace(chr(10), '<br />')}</p>" for p in paragraphs)
+
+
+def render_directory_page(records: List[Dict], options: Dict, page: int, pages: int, page_base: str) -> str:
+    if not records:
+        return "<p>No candidates found.</p>"
+
+    out = ['<div class="pia-candidate-grid">']
+    for record in records:
+        out.append('<article class="pia-candidate-card">')
+        out.append(render_portrait(record.get("portrait_url", ""), bool(record.get("approved")), options["badge_url"]))
+        out.append(f"<h3>{esc(record.get('name'))}</h3>")
+        out.append(f"<p>{esc(record.get('office') or MISSING_TEXT)}</p>")
+        out.append(f'<span class="pia-candidate-tag">{esc(location_text(record))}</span>')
+        if record.get("featured"):
+            out.append('<span class="pia-candidate-featured">Featured</span>')
+        out.append('<div class="pia-candidate-buttons">')
+        out.append(f'<a href="{esc_url(record["profile_url"])}">Candidate Profile</a>')
+        if record.get("website"):
+            out.append(f'<a href="{esc_url(record["website"])}" target="_blank" rel="noopener">Website</a>')
+        else:
+            out.append(f'<span class="pia-candidate-button-disabled">{esc(MISSING_TEXT)}</span>')
+        out.append("</div>")
+        out.append("</article>")
+    out.append("</div>")
+
+    if pages > 1:
+        out.append('<nav class="pia-candidate-pagination">')
+        if page > 1:
+            out.append(f'<a class="prev" href="{esc_url(page_base + f"page-{page - 1}.html")}">Previous</a>')
+        out.append(f'<span class="current">Page {page} of {pages}</span>')
+        if page < pages:
+            out.append(f'<a class="next" href="{esc_url(page_base + f"page-{page + 1}.html")}">Next</a>')
+        out.append("</nav>")
+    return "".join(out)
+
+
+def render_profile_page(candidate: Dict, options: Dict) -> str:
+    out = ['<div class="pia-candidate-profile">']
+    out.append(render_portrait(str(candidate.get("portrait_url") or ""), bool(candidate.get("approved")), options["badge_url"]))
+    out.append(f"<h2>{esc(candidate.get('name'))}</h2>")
+    out.append(f"<p>{esc(candidate.get('office') or MISSING_TEXT)}</p>")
+    out.append(f'<p class="pia-candidate-tag">{esc(location_text(candidate))}</p>')
+    out.append(render_bio(str(candidate.get("bio") or "")))
+
+    website = candidate.get("website") or ""
+    if website:
+        out.append(f'<p><a href="{esc_url(website)}" target="_blank" rel="noopener">Website</a></p>')
+    else:
+        out.append(f"<p>Website: {esc(MISSING_TEXT)}</p>")
+
+    video_url = candidate.get("video_url") or ""
+    if video_url:
+        out.append(f'<p><a href="{esc_url(video_url)}">Watch video</a></p>')
+    else:
+        out.append(f"<p>Video: {esc(MISSING_TEXT)}</p>")
+
+    out.append('<div class="pia-candidate-buttons">')
+    buttons = candidate.get("buttons") if isinstance(candidate.get("buttons"), list) else []
+    for button in buttons[:3]:
+        if isinstance(button, dict) and button.get("label") and button.get("url"):
+            out.append(f'<a href="{esc_url(button["url"])}">{esc(button["label"])}</a>')
+    out.append("</div>")
+    out.append("</div>")
+    return "".join(out)
+
+
+def render_task(task: Dict, options: Dict, output_dir: str) -> str:
+    """Render and write one page. Runs in a worker process."""
+    if task["kind"] == "profile":
+        body = render_profile_page(task["candidate"], options)
+    else:
+        body = render_directory_page(task["records"], options, task["page"], task["pages"], task["page_base"])
+
+    path = os.path.join(output_dir, task["path"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write(body + "\n")
+    os.replace(tmp_path, path)
+    return task["path"]
+
+
+def unique_path(base: str, used: set) -> str:
+    path = base
+    suffix = 1
+    while path in used:
+        suffix += 1
+        path = f"{base}-{suffix}"
+    used.add(path)
+    return path
+
+
+def plan_pages(candidates: List[Dict], options: Dict, facets: List[str]) -> Tuple[List[Dict], Dict]:
+    """Return (page tasks, facet value -> directory map) for the whole site."""
+    tasks: List[Dict] = []
+
+    # Profile slugs follow WordPress post names: the sanitized title, `-2`, `-3` on collisions.
+    profile_urls: Dict[str, str] = {}
+    used_slugs: set = set()
+    for candidate in candidates:
+        slug = unique_path(slugify(str(candidate.get("name") or "")) or "candidate", used_slugs)
+        profile_urls[str(candidate.get("external_id") or candidate.get("name") or "")] = (
+            f"{options['profile_base_url'].rstrip('/')}/{slug}/"
+        )
+        tasks.append({"kind": "profile", "path": f"profiles/{slug}.html", "candidate": candidate})
+
+    index = build_index(candidates)
+    per_page = options["per_page"]
+
+    def add_listing(directory: str, record_ids: List[int]) -> int:
+        records = get_records(index, record_ids)
+        for record in records:
+            record["profile_url"] = profile_urls.get(record["external_id"] or record["name"], "")
+        pages = max(1, -(-len(records) // per_page))
+        for page in range(1, pages + 1):
+            tasks.append(
+                {
+                    "kind": "directory",
+                    "path": f"{directory}/page-{page}.html",
+                    "records": records[(page - 1) * per_page:page * per_page],
+                    "page": page,
+                    "pages": pages,
+                    "page_base": f"{options['directory_base_url'].rstrip('/')}/{directory}/",
+                }
+            )
+        return pages
+
+    directories: Dict[str, Dict] = {"all": {"path": "directory/all", "pages": add_listing("directory/all", query_index(index))}}
+    for facet in facets:
+        used: set = set()
+        directories[facet] = {}
+        for value in sorted(index["facets"].get(facet, {})):
+            directory = unique_path(f"directory/{facet}/{slugify(value) or 'unknown'}", used)
+            pages = add_listing(directory, query_index(index, **{facet: value}))
+            directories[facet][value] = {"path": directory, "pages": pages}
+    return tasks, directories
+
+
+def task_hash(task: Dict, options: Dict, digest: str) -> str:
+    if task["kind"] == "profile":
+        payload = [digest, options, task["kind"], content_hash(task["candidate"])]
+    else:
+        payload = [digest, options, {key: value for key, value in task.items() if key != "path"}]
+    return hashlib.sha256(canonical_json(payload).encode("utf-8")).hexdigest()
+
+
+def load_manifest(output_dir: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as handle:
+            return json.load(handle).get("pages", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def render_site(
+    candidates: List[Dict],
+    output_dir: str,
+    options: Dict,
+    *,
+    facets: List[str],
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> Dict:
+    digest = renderer_digest()
+    with stage("plan_pages"):
+        tasks, directories = plan_pages(candidates, options, facets)
+    previous = {} if force else load_manifest(output_dir)
+
+    with stage("hash_pages"):
+        hashes = {task["path"]: task_hash(task, options, digest) for task in tasks}
+    stale = [
+        task
+        for task in tasks
+        if previous.get(task["path"]) != hashes[task["path"]]
+        or not os.path.exists(os.path.join(output_dir, task["path"]))
+    ]
+
+    incr("pages", len(tasks))
+    incr("pages_rendered", len(stale))
+    if stale:
+        with stage("render"), ProcessPoolExecutor(max_workers=workers) as pool:
+            # Chunking keeps the per-task pickling overhead small for thousands of tiny pages.
+            list(pool.map(render_task, stale, [options] * len(stale), [output_dir] * len(stale), chunksize=32))
+
+    removed = 0
+    for path in set(previous) - set(hashes):
+        try:
+            os.remove(os.path.join(output_dir, path))
+            removed += 1
+        except FileNotFoundError:
+            pass
+
+    manifest = {
+        "dataset_hash": dataset_hash(candidates),
+        "per_page": options["per_page"],
+        "directories": directories,
+        "pages": hashes,
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    return {"pages": len(tasks), "rendered": len(stale), "removed": removed}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="Candidate dataset (JSON, grouped JSON or snapshot)")
+    parser.add_argument("--output-dir", required=True, help="Directory for the rendered fragments")
+    parser.add_argument("--per-page", type=int, default=12, help="Cards per directory page (shortcode per_page)")
+    parser.add_argument("--facets", default=DEFAULT_FACETS, help=f"Facets to render listings for (default: {DEFAULT_FACETS})")
+    parser.add_argument("--badge-url", default="", help="PIA Approved badge image URL")
+    parser.add_argument("--profile-base-url", default="/candidates", help="Base URL of candidate profiles (post type slug)")
+    parser.add_argument("--directory-base-url", default="", help="URL the output directory is served from (pagination links)")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render every page")
+    add_metrics_arguments(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        with stage("load_input"):
+            candidates = load_dataset(args.input, dedupe=True)
+    except FileNotFoundError:
+        print(f"File not found: {args.input}", file=sys.stderr)
+        return 2
+    except json.JSONDecodeError as e:
+        print(f"Invalid JSON: {e}", file=sys.stderr)
+        return 2
+
+    facets = [facet.strip() for facet in args.facets.split(",") if facet.strip()]
+    unknown = [facet for facet in facets if facet not in DEFAULT_FACETS.split(",") + ["party"]]
+    if unknown or args.per_page < 1:
+        print(f"Invalid --facets/--per-page: {', '.join(unknown) or args.per_page}", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    options = {
+        "per_page": args.per_page,
+        "badge_url": args.badge_url,
+        "profile_base_url": args.profile_base_url,
+        "directory_base_url": args.directory_base_url,
+    }
+    stats = render_site(candidates, args.output_dir, options, facets=facets, workers=args.workers, force=args.force)
+    print(
+        f"Rendered {stats['rendered']} of {stats['pages']} pages into {args.output_dir} "
+        f"({stats['pages'] - stats['rendered']} unchanged, {stats['removed']} removed)"
+    )
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    with instrument("render_static_pages", args, output=args.output_dir):
+        return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
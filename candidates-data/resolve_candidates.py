@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Merge candidates that appear in both the FEC and Texas SOS data into one record.
+
+Candidates are blocked by (office, district, normalized surname), so only records that
+share a block are compared; this keeps resolution close to linear in dataset size.
+Within a block, FEC/SOS pairs are scored on surname and given name separately: the
+surnames are compared with Jaro-Winkler, and the first given names must be equal, or one
+must be the other's initial. "SMITH, MARK" and "Mary Smith" therefore never merge, nor does
+a surname-only record. The best pairs above `--threshold` are merged.
+
+A merged record keeps the FEC `external_id` (stable across cycles), lists the SOS ID
+under `alternate_external_ids`, fills empty fields from either side, and keeps both
+raw payloads under `source.raw.fec` / `source.raw.tx_sos`.
+"""
+
+import argparse
+import json
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from dataset_io import load_dataset, write_dataset
+from metrics import add_metrics_arguments, incr, instrument, stage
+
+DEFAULT_THRESHOLD = 0.9
+# Given-name score when one side only has an initial ("SMITH, J" vs "John Smith").
+INITIAL_MATCH_SCORE = 0.95
+
+NAME_NOISE = {"mr", "mrs", "ms", "dr", "hon", "jr", "sr", "ii", "iii", "iv", "v"}
+
+
+def normalize_name(name: str) -> List[str]:
+    """Lowercase name tokens in "first ... last" order, without titles or suffixes.
+
+    Initials are kept as one-letter tokens.
+    """
+    name = (name or "").strip()
+    if "," in name:
+        # FEC names are "LAST, FIRST MIDDLE".
+        last, _, first = name.partition(",")
+        name = f"{first} {last}"
+    tokens = re.split(r"[^a-z]+", name.lower())
+    return [token for token in tokens if token and token not in NAME_NOISE]
+
+
+def office_key(candidate: Dict) -> str:
+    source = candidate.get("source") or {}
+    raw = source.get("raw") or {}
+    if source.get("source_type") == "fec" and raw.get("office") in {"H", "S", "P"}:
+        return raw["office"]
+
+    office = str(candidate.get("office") or "").lower()
+    # Bare "Senate"/"House" is how FEC `office_full` spells federal offices.
+    federal = office in {"senate", "house"} or any(marker in office for marker in ("u.s.", "us ", "united states", "congress"))
+    if "president" in office:
+        return "P"
+    if "senate" in office or "senator" in office:
+        return "S" if federal else "state-senate"
+    if "house" in office or "representative" in office:
+        return "H" if federal else "state-house"
+    return re.sub(r"[^a-z0-9]+", "-", office).strip("-")
+
+
+def district_key(candidate: Dict) -> str:
+    # FEC uses "00" for statewide/at-large seats where SOS data says "Statewide".
+    match = re.search(r"\d+", str(candidate.get("district") or ""))
+    return str(int(match.group()) or "") if match else ""
+
+
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    if a == b:
+        return 1.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+
+    window = max(max(len_a, len_b) // 2 - 1, 0)
+    matched_a = [False] * len_a
+    matched_b = [False] * len_b
+    matches = 0
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len_b, i + window + 1)):
+            if not matched_b[j] and b[j] == char:
+                matched_a[i] = matched_b[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    transpositions = 0
+    j = 0
+    for i in range(len_a):
+        if matched_a[i]:
+            while not matched_b[j]:
+                j += 1
+            if a[i] != b[j]:
+                transpositions += 1
+            j += 1
+
+    jaro = (matches / len_a + matches / len_b + (matches - transpositions / 2) / matches) / 3
+    prefix = 0
+    for char_a, char_b in zip(a[:4], b[:4]):
+        if char_a != char_b:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def _same_given_name(a: str, b: str) -> bool:
+    return a == b or ((len(a) == 1 or len(b) == 1) and a[0] == b[0])
+
+
+def given_name_score(given_a: List[str], given_b: List[str]) -> float:
+    """1.0 for equal first names, INITIAL_MATCH_SCORE for an initial against a name, else 0.
+
+    Similar spellings don't count: Mark/Mary and Daniel/Daniela are different people.
+    A full given name shared elsewhere (someone who goes by their middle name) scores like
+    an initial. Middle names present on both sides must not contradict each other.
+    """
+    if not given_a or not given_b:
+        return 0.0
+    if given_a[0] == given_b[0]:
+        score = 1.0
+    elif _same_given_name(given_a[0], given_b[0]):
+        score = INITIAL_MATCH_SCORE
+    elif {t for t in given_a if len(t) > 1} & {t for t in given_b if len(t) > 1}:
+        return INITIAL_MATCH_SCORE
+    else:
+        return 0.0
+    if len(given_a) > 1 and len(given_b) > 1 and not _same_given_name(given_a[1], given_b[1]):
+        return 0.0
+    return score
+
+
+def name_similarity(tokens_a: List[str], tokens_b: List[str]) -> float:
+    """Surname similarity times given-name agreement; 0 unless both names have a given name."""
+    if len(tokens_a) < 2 or len(tokens_b) < 2:
+        return 0.0
+    return jaro_winkler(tokens_a[-1], tokens_b[-1]) * given_name_score(tokens_a[:-1], tokens_b[:-1])
+
+
+def block_key(candidate: Dict, tokens: List[str]) -> Optional[Tuple[str, str, str]]:
+    if not tokens:
+        return None
+    office = office_key(candidate)
+    district = "" if office in {"S", "P"} else district_key(candidate)
+    return office, district, tokens[-1]
+
+
+def merge_pair(fec: Dict, sos: Dict) -> Dict:
+    merged = dict(sos)
+    for key, value in fec.items():
+        if key == "source":
+            continue
+        if merged.get(key) in (None, "", [], {}):
+            merged[key] = value
+    merged["external_id"] = fec.get("external_id") or sos.get("external_id", "")
+    alternates = [eid for eid in [sos.get("external_id")] if eid and eid != merged["external_id"]]
+    if alternates:
+        merged["alternate_external_ids"] = alternates
+    merged["source"] = {
+        "source_type": "fec+tx_sos",
+        "raw": {
+            "fec": (fec.get("source") or {}).get("raw", {}),
+            "tx_sos": (sos.get("source") or {}).get("raw", {}),
+        },
+    }
+    return merged
+
+
+def resolve_candidates(candidates: List[Dict], *, threshold: float = DEFAULT_THRESHOLD) -> Tuple[List[Dict], int]:
+    """Return (resolved candidates, number of merges). Order follows the input."""
+    tokens = [normalize_name(candidate.get("name", "")) for candidate in candidates]
+
+    blocks: Dict[Tuple[str, str, str], Dict[str, List[int]]] = {}
+    for position, candidate in enumerate(candidates):
+        source_type = (candidate.get("source") or {}).get("source_type")
+        if source_type not in {"fec", "tx_sos"}:
+            continue
+        key = block_key(candidate, tokens[position])
+        if key is not None:
+            blocks.setdefault(key, {"fec": [], "tx_sos": []})[source_type].append(position)
+
+    merged_into: Dict[int, int] = {}
+    replacements: Dict[int, Dict] = {}
+    for members in blocks.values():
+        if not members["fec"] or not members["tx_sos"]:
+            continue
+        scored = sorted(
+            (
+                (name_similarity(tokens[f], tokens[s]), f, s)
+                for f in members["fec"]
+                for s in members["tx_sos"]
+            ),
+            reverse=True,
+        )
+        used = set()
+        for score, fec_pos, sos_pos in scored:
+            if score < threshold:
+                break
+            if fec_pos in used or sos_pos in used:
+                continue
+            used.update((fec_pos, sos_pos))
+            replacements[fec_pos] = merge_pair(candidates[fec_pos], candidates[sos_pos])
+            merged_into[sos_pos] = fec_pos
+
+    resolved = [
+        replacements.get(position, candidate)
+        for position, candidate in enumerate(candidates)
+        if position not in merged_into
+    ]
+    return resolved, len(merged_into)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="Combined FEC + SOS JSON (from combine_fec_sos.py)")
+    parser.add_argument("--output", required=True, help="Output JSON with cross-source duplicates merged")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Minimum name similarity (0-1) to merge a pair (default: {DEFAULT_THRESHOLD})",
+    )
+    add_metrics_arguments(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        with stage("load_input"):
+            candidates = load_dataset(args.input)
+    except FileNotFoundError:
+        print(f"File not found: {args.input}", file=sys.stderr)
+        return 2
+    except json.JSONDecodeError as e:
+        print(f"Invalid JSON: {e}", file=sys.stderr)
+        return 2
+
+    with stage("resolve_duplicates"):
+        resolved, merges = resolve_candidates(candidates, threshold=args.threshold)
+    incr("duplicates_merged", merges)
+    with stage("write_output"):
+        write_dataset(args.output, resolved)
+
+    print(f"Wrote {len(resolved)} candidates to {args.output} ({merges} cross-source duplicates merged)")
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    with instrument("resolve_candidates", args, output=args.output):
+        return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Split a candidate dataset into per-level, per-county and per-district shards.
+
+Layout written under `--shard-dir`:
+
+    manifest.json            record counts, byte sizes and sha256 per shard
+    level/<level>.json       federal / state / county
+    county/<county>.json     every candidate with that county
+    district/<district>.json keyed by county + district for county races
+
+District entries in the manifest also record `county` and `district` separately, so
+`load_shards(d, county="Potter", district="Precinct 4")` (or `district="Precinct 4"`
+alone, across counties) finds them.
+
+Each shard is a flat JSON list, so a site that only shows one county can point the
+plugin's Local JSON File at `data/shards/county/potter.json` instead of decoding
+the whole state.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from dataset_io import dataset_hash, load_dataset
+from metrics import add_metrics_arguments, instrument, stage
+
+MANIFEST_NAME = "manifest.json"
+SHARD_KINDS = ("level", "county", "district")
+
+FEDERAL_OFFICE_MARKERS = ("u.s.", "us senate", "us house", "united states", "president", "congress")
+
+
+def slugify(value: str) -> str:
+    value = value.strip().lower()
+    value = re.sub(r"[^a-z0-9]+", "-", value)
+    return value.strip("-")
+
+
+def office_level(candidate: Dict) -> str:
+    source_type = (candidate.get("source") or {}).get("source_type", "")
+    office = str(candidate.get("office") or "").lower()
+    if "fec" in source_type.split("+") or any(marker in office for marker in FEDERAL_OFFICE_MARKERS):
+        return "federal"
+    if str(candidate.get("county") or "").strip():
+        return "county"
+    return "state"
+
+
+def shard_keys(candidate: Dict) -> Iterable[tuple]:
+    """(kind, key, extra manifest fields) for every shard the candidate belongs to."""
+    county = str(candidate.get("county") or "").strip()
+    district = str(candidate.get("district") or "").strip()
+    yield "level", office_level(candidate), {}
+    if county:
+        yield "county", county, {}
+    if district:
+        # County precincts repeat across counties ("Precinct 4"), so qualify them.
+        yield "district", f"{county} {district}" if county else district, {"county": county, "district": district}
+
+
+def write_shards(candidates: List[Dict], shard_dir: str) -> Dict:
+    shards: Dict[tuple, List[Dict]] = {}
+    fields: Dict[tuple, Dict] = {}
+    for candidate in candidates:
+        for kind, key, extra in shard_keys(candidate):
+            shards.setdefault((kind, key), []).append(candidate)
+            fields.setdefault((kind, key), extra)
+
+    for kind in SHARD_KINDS:
+        kind_dir = os.path.join(shard_dir, kind)
+        os.makedirs(kind_dir, exist_ok=True)
+        # Drop shards left over from a previous run so the directory matches the manifest.
+        for name in os.listdir(kind_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(kind_dir, name))
+
+    entries = []
+    used_paths: set = set()
+    for (kind, key), members in sorted(shards.items()):
+        base = f"{kind}/{slugify(key) or 'unknown'}"
+        relative_path = f"{base}.json"
+        suffix = 1
+        while relative_path in used_paths:
+            suffix += 1
+            relative_path = f"{base}-{suffix}.json"
+        used_paths.add(relative_path)
+        body = json.dumps(members, separators=(",", ":")).encode("utf-8")
+        with open(os.path.join(shard_dir, relative_path), "wb") as handle:
+            handle.write(body)
+        entries.append(
+            {
+                "kind": kind,
+                "key": key,
+                **fields[(kind, key)],
+                "path": relative_path,
+                "count": len(members),
+                "bytes": len(body),
+                "sha256": hashlib.sha256(body).hexdigest(),
+            }
+        )
+
+    manifest = {
+        "dataset_hash": dataset_hash(candidates),
+        "total": len(candidates),
+        "shards": entries,
+    }
+    with open(os.path.join(shard_dir, MANIFEST_NAME), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    return manifest
+
+
+def _same(a: str, b: str) -> bool:
+    return a.strip().casefold() == b.strip().casefold()
+
+
+def shard_matches(entry: Dict, kind: str, value: str, county: Optional[str]) -> bool:
+    if entry["kind"] != kind:
+        return False
+    if kind != "district":
+        return _same(entry["key"], value)
+    if _same(entry["key"], value):
+        # The composed "County District" key, as older manifests only had.
+        return True
+    if "district" not in entry or not _same(entry["district"], value):
+        return False
+    return not county or _same(entry.get("county", ""), county)
+
+
+def load_shards(
+    shard_dir: str,
+    *,
+    level: Optional[str] = None,
+    county: Optional[str] = None,
+    district: Optional[str] = None,
+    verify: bool = False,
+) -> List[Dict]:
+    """Load only the shards matching the given filters (intersection when several are set).
+
+    `district` is the district as it appears in the dataset ("Precinct 4"); with `county`
+    it selects that county's district, without it every county's district of that name.
+    """
+    with open(os.path.join(shard_dir, MANIFEST_NAME), "r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+
+    wanted = {kind: value for kind, value in (("level", level), ("county", county), ("district", district)) if value}
+    if not wanted:
+        raise ValueError("load_shards() needs at least one of level, county or district")
+
+    selected: Optional[Dict[str, Dict]] = None
+    for kind, value in wanted.items():
+        loaded: Dict[str, Dict] = {}
+        for entry in manifest["shards"]:
+            if not shard_matches(entry, kind, value, county):
+                continue
+            with open(os.path.join(shard_dir, entry["path"]), "rb") as handle:
+                body = handle.read()
+            if verify and hashlib.sha256(body).hexdigest() != entry["sha256"]:
+                raise ValueError(f"Checksum mismatch for shard {entry['path']}")
+            for candidate in json.loads(body):
+                loaded[candidate.get("external_id") or candidate.get("name", "")] = candidate
+        selected = loaded if selected is None else {k: v for k, v in selected.items() if k in loaded}
+    return list((selected or {}).values())
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="Candidate dataset JSON (flat list or grouped object)")
+    parser.add_argument("--shard-dir", required=True, help="Directory to write shards and manifest.json into")
+    add_metrics_arguments(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        with stage("load_input"):
+            candidates = load_dataset(args.input, dedupe=True)
+    except FileNotFoundError:
+        print(f"File not found: {args.input}", file=sys.stderr)
+        return 2
+    except json.JSONDecodeError as e:
+        print(f"Invalid JSON: {e}", file=sys.stderr)
+        return 2
+
+    with stage("write_shards"):
+        manifest = write_shards(candidates, args.shard_dir)
+    print(f"Wrote {len(manifest['shards'])} shards for {manifest['total']} candidates to {args.shard_dir}")
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    with instrument("shard_dataset", args, output=args.shard_dir):
+        return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
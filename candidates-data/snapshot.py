@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Compact binary (msgpack) snapshots of candidate datasets.
+
+Layout (all integers little-endian):
+
+    magic     4 bytes   b"PIAC"
+    version   uint16    SNAPSHOT_VERSION
+    reserved  uint16
+    count     uint32    number of records
+    keys_len  uint32    byte length of the key table
+    offsets   (count + 1) x uint64, record offsets relative to the start of the record area
+    keys      msgpack list of `record_key()` values, in record order
+    records   one msgpack map per candidate, back to back
+
+The offset table lets readers decode a single record (or a handful) without touching
+the rest of the file, and the key table finds records by `external_id` without
+decoding any of them. `load_dataset()` reads snapshots transparently, and this script
+converts between snapshots and the importer JSON:
+
+    python candidates-data/snapshot.py --input tx-candidates.json --output tx-candidates.msgpack
+    python candidates-data/snapshot.py --input tx-candidates.msgpack --output tx-candidates.json
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import msgpack
+
+from dataset_io import SNAPSHOT_MAGIC, SNAPSHOT_SUFFIXES, load_dataset, record_key, write_dataset
+from metrics import add_metrics_arguments, instrument, stage
+
+SNAPSHOT_VERSION = 1
+
+HEADER = struct.Struct("<4sHHII")
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def write_snapshot(path: str, candidates: List[Dict]) -> None:
+    records = [msgpack.packb(candidate, use_bin_type=True) for candidate in candidates]
+    keys = msgpack.packb([record_key(candidate) for candidate in candidates], use_bin_type=True)
+
+    offsets = [0]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(records), len(keys)))
+        handle.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        handle.write(keys)
+        for record in records:
+            handle.write(record)
+    os.replace(tmp_path, path)
+
+
+class SnapshotReader:
+    """Memory-mapped random access to a snapshot; records are only decoded when read."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._handle = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._handle.close()
+            raise SnapshotError(f"{path}: not a candidate snapshot")
+
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise SnapshotError(f"{path}: not a candidate snapshot")
+        magic, version, _reserved, count, keys_len = HEADER.unpack_from(self._mm, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise SnapshotError(f"{path}: not a candidate snapshot")
+        if version > SNAPSHOT_VERSION:
+            self.close()
+            raise SnapshotError(f"{path}: snapshot version {version} is newer than supported ({SNAPSHOT_VERSION})")
+
+        self.version = version
+        self.count = count
+        self._offsets = struct.unpack_from(f"<{count + 1}Q", self._mm, HEADER.size)
+        self._keys_start = HEADER.size + 8 * (count + 1)
+        self._records_start = self._keys_start + keys_len
+        self._key_positions: Optional[Dict[str, int]] = None
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._handle.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int) -> Dict:
+        if position < 0:
+            position += self.count
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        start = self._records_start + self._offsets[position]
+        end = self._records_start + self._offsets[position + 1]
+        return msgpack.unpackb(self._mm[start:end], raw=False)
+
+    def __iter__(self) -> Iterator[Dict]:
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(self._mm[self._records_start:self._records_start + self._offsets[-1]])
+        return iter(unpacker)
+
+    def keys(self) -> List[str]:
+        return msgpack.unpackb(self._mm[self._keys_start:self._records_start], raw=False)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the record whose `record_key()` is `key` (usually its external_id)."""
+        if self._key_positions is None:
+            self._key_positions = {k: position for position, k in enumerate(self.keys())}
+        position = self._key_positions.get(key)
+        return None if position is None else self[position]
+
+    def records(self, positions: Iterable[int]) -> List[Dict]:
+        return [self[position] for position in positions]
+
+
+def read_snapshot(path: str) -> List[Dict]:
+    with SnapshotReader(path) as reader:
+        return list(reader)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="Candidate JSON or snapshot")
+    parser.add_argument(
+        "--output",
+        required=True,
+        help=f"Output path; {', '.join(SNAPSHOT_SUFFIXES)} writes a snapshot, anything else importer JSON",
+    )
+    add_metrics_arguments(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        with stage("load_input"):
+            candidates = load_dataset(args.input, dedupe=True)
+    except FileNotFoundError:
+        print(f"File not found: {args.input}", file=sys.stderr)
+        return 2
+    except (json.JSONDecodeError, SnapshotError) as e:
+        print(f"Invalid input: {e}", file=sys.stderr)
+        return 2
+
+    with stage("write_output"):
+        write_dataset(args.output, candidates)
+
+    print(f"Wrote {len(candidates)} candidates to {args.output}")
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    with instrument("snapshot", args, output=args.output):
+        return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
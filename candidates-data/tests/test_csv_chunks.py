@@ -0,0 +1,91 @@
+import csv
+import os
+import sys
+import tempfile
+import unittest
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from combine_fec_sos import load_sos_csv, normalize_sos_row  # noqa: E402
+from csv_chunks import normalize_csv_parallel, read_rows, split_csv  # noqa: E402
+
+MAPPING = {
+    "external_id": "candidate_id",
+    "name": "candidate_name",
+    "office": "office",
+    "county": "county",
+    "bio": "bio",
+}
+
+ROWS = [
+    ["candidate_id", "candidate_name", "office", "county", "bio"],
+    ["", "Ann Lee", "Mayor", "Potter", 'Says "hello"\nand "goodbye"'],
+    ["", "Ann Lee", "Mayor", "Potter", "Line one\n\nline three, with a comma"],
+    ["X9", "Bob Ng", "Sheriff", "Randall", '""'],
+    ["", "", "Judge", "Potter", "dropped: no name"],
+    ["", "Ann Lee", "Mayor", "Potter", '"\n"\n"'],
+    ["", 'Cy "Chip" Oh', "Constable", "Gray", "plain"],
+    ["", "Ann Lee", "Mayor", "Potter", 'ends with a quote and newline "\n'],
+    ["", "Di Ray", "Clerk", "Hale", "a\r\nb"],
+] + [["", f"Ed {i}", "Judge", "Ector", f'row {i}: "q"\n{i}'] for i in range(12)]
+
+
+def write_csv(path, rows, line_terminator):
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        csv.writer(handle, lineterminator=line_terminator).writerows(rows)
+
+
+class SplitCsvTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def check_every_split(self, line_terminator):
+        path = os.path.join(self.tmp.name, "sos.csv")
+        write_csv(path, ROWS, line_terminator)
+        with open(path, encoding="utf-8", newline="") as handle:
+            serial = list(csv.DictReader(handle))
+        size = os.path.getsize(path)
+        # Enough chunk counts that boundaries land inside quoted fields, on "" escapes and on embedded newlines
+        for chunks in range(1, size // 4):
+            fieldnames, ranges = split_csv(path, chunks, min_chunk_bytes=1)
+            with self.subTest(chunks=chunks):
+                self.assertEqual(fieldnames, ROWS[0])
+                self.assertEqual(ranges[-1][1], size)
+                self.assertTrue(all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:])))
+                rows = [row for start, end in ranges for row in read_rows(path, fieldnames, start, end)]
+                self.assertEqual(rows, serial)
+
+    def test_boundaries_never_split_a_quoted_field(self):
+        self.check_every_split("\n")
+
+    def test_boundaries_with_crlf_line_endings(self):
+        self.check_every_split("\r\n")
+
+    def test_empty_file(self):
+        path = os.path.join(self.tmp.name, "empty.csv")
+        open(path, "w").close()
+        self.assertEqual(split_csv(path, 4), ([], []))
+
+
+class ParallelNormalizeTest(unittest.TestCase):
+    def test_parallel_rows_and_ids_match_serial(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "sos.csv")
+        write_csv(path, ROWS, "\n")
+        serial = load_sos_csv(path, MAPPING, default_state="Texas", external_id_prefix="txsos", workers=1)
+        self.assertIn("txsos-ann-lee-mayor-potter-4", [row["external_id"] for row in serial])
+
+        normalize = partial(normalize_sos_row, mapping=MAPPING, default_state="Texas", external_id_prefix="txsos")
+        for workers in (2, 3, 7):
+            with self.subTest(workers=workers):
+                parallel = normalize_csv_parallel(
+                    path, normalize, external_id_column="candidate_id", workers=workers, min_chunk_bytes=1
+                )
+                self.assertEqual(parallel, serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
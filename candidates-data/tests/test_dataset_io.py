@@ -0,0 +1,40 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset_io import flatten_dataset  # noqa: E402
+
+
+def ids(candidates):
+    return [candidate["external_id"] for candidate in candidates]
+
+
+class FlattenDatasetTest(unittest.TestCase):
+    def test_flat_list(self):
+        self.assertEqual(ids(flatten_dataset([{"external_id": "a"}, "junk", {"external_id": "b"}])), ["a", "b"])
+
+    def test_single_candidate(self):
+        self.assertEqual(ids(flatten_dataset({"external_id": "a", "name": "Ann"})), ["a"])
+
+    def test_reads_top_level_lists_only_like_the_importer(self):
+        data = {
+            "federal": [{"external_id": "f"}],
+            "county": {"potter": [{"external_id": "nested"}]},
+            "generated_at": "2026-01-01",
+            "all": [{"external_id": "f", "name": "later"}, {"external_id": "c"}],
+        }
+        self.assertEqual(ids(flatten_dataset(data)), ["f", "f", "c"])
+        candidates = flatten_dataset(data, dedupe=True)
+        self.assertEqual(ids(candidates), ["f", "c"])
+        self.assertEqual(candidates[0]["name"], "later")
+
+    def test_keeps_records_sharing_an_id_unless_asked(self):
+        data = [{"external_id": "X1", "name": "Ann Lee"}, {"external_id": "X1", "name": "Bob Ng"}]
+        self.assertEqual([c["name"] for c in flatten_dataset(data)], ["Ann Lee", "Bob Ng"])
+        self.assertEqual([c["name"] for c in flatten_dataset(data, dedupe=True)], ["Bob Ng"])
+
+
+if __name__ == "__main__":
+    unittest.main()
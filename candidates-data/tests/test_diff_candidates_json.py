@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset_io import content_hash, flatten_dataset  # noqa: E402
+from diff_candidates_json import build_changeset  # noqa: E402
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "diff_candidates_json.py")
+
+PREVIOUS = [
+    {"external_id": "a1", "name": "Ann Able", "office": "Mayor"},
+    {"external_id": "b2", "name": "Bob Baker", "office": "Sheriff"},
+    {"external_id": "c3", "name": "Cy Cole", "office": "Judge"},
+    {"name": "Di Dunn", "office": "Constable"},
+    {"first_name": "Ed", "last_name": "Eve", "office": "Clerk"},
+]
+
+
+class BuildChangesetTest(unittest.TestCase):
+    def test_added_updated_deleted_unchanged(self):
+        current = [
+            {"external_id": "a1", "name": "Ann Able", "office": "Mayor"},
+            {"external_id": "b2", "name": "Bob Baker", "office": "County Sheriff"},
+            {"external_id": "d4", "name": "Flo Ford", "office": "Treasurer"},
+            {"first_name": "Ed", "last_name": "Eve", "office": "Clerk"},
+        ]
+        changeset = build_changeset(PREVIOUS, current)
+        self.assertEqual(
+            changeset["summary"], {"added": 1, "updated": 1, "deleted": 1, "deleted_names": 1, "unchanged": 2}
+        )
+        self.assertEqual([c["external_id"] for c in changeset["added"]], ["d4"])
+        self.assertEqual([c["external_id"] for c in changeset["updated"]], ["b2"])
+        self.assertEqual(changeset["updated"][0]["content_hash"], content_hash(current[1]))
+        self.assertEqual(changeset["deleted"], ["c3"])
+        self.assertEqual(changeset["deleted_names"], ["Di Dunn"])
+
+    def test_previous_content_hash_is_trusted(self):
+        previous = [dict(PREVIOUS[0], content_hash=content_hash(PREVIOUS[0]))]
+        self.assertEqual(build_changeset(previous, [PREVIOUS[0]])["summary"]["unchanged"], 1)
+
+    def test_importer_reads_only_added_and_updated(self):
+        current = [{"external_id": "a1", "name": "Ann Able", "office": "Mayor (Ret.)"}]
+        changeset = json.loads(json.dumps(build_changeset(PREVIOUS, current)))
+        self.assertTrue(changeset["deleted"] and changeset["deleted_names"])
+        imported = flatten_dataset(changeset)
+        self.assertEqual([c["external_id"] for c in imported], ["a1"])
+
+
+class DiffScriptTest(unittest.TestCase):
+    def test_warns_about_deleted_records_without_external_id(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            previous, current, output = (os.path.join(tmp, name) for name in ("prev.json", "cur.json", "out.json"))
+            with open(previous, "w", encoding="utf-8") as handle:
+                json.dump(PREVIOUS, handle)
+            with open(current, "w", encoding="utf-8") as handle:
+                json.dump(PREVIOUS[:3], handle)
+            result = subprocess.run(
+                [sys.executable, SCRIPT, "--previous", previous, "--current", current, "--output", output],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn("2 deleted candidates have no external_id", result.stderr)
+            with open(output, encoding="utf-8") as handle:
+                changeset = json.load(handle)
+        self.assertEqual(changeset["deleted"], [])
+        self.assertEqual(changeset["deleted_names"], ["Di Dunn", "Ed Eve"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from directory_index import build_index, get_records, query_index, verify_index  # noqa: E402
+
+CANDIDATES = [
+    {"external_id": "a", "name": "Ann Lee", "state": "TX", "county": "Travis", "district": "TX-10",
+     "office": "U.S. House", "party": "DEM", "category": ["federal", "house"], "featured": True, "approved": True},
+    {"external_id": "b", "name": "Bob Leeds", "state": "TX", "county": "Travis", "district": "Precinct 4",
+     "office": "County Commissioner", "party": "REP", "category": "county, commissioner", "approved": True},
+    {"external_id": "c", "name": "Cy O'Neil", "state": "tx", "county": "Potter", "district": "Precinct 4",
+     "office": "Constable", "party": "Rep", "category": "county", "featured": False},
+    {"external_id": "d", "name": "Di Ng", "state": "TX", "district": 13, "office": "U.S. House",
+     "party": None, "category": None, "featured": True},
+    {"external_id": "e", "name": "Ed Ward", "state": "OK", "county": "Travis Heights", "office": "Mayor",
+     "party": "IND", "category": ["city", 7], "approved": False},
+]
+
+
+def text(value):
+    return "" if value is None else str(value).casefold()
+
+
+def categories(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    return {slug.strip().casefold() for slug in value or [] if isinstance(slug, str) and slug.strip()}
+
+
+def expected(filters):
+    """External IDs the shortcode would list, worked out directly from the source candidates."""
+    matched = []
+    for candidate in CANDIDATES:
+        if any(
+            filters.get(field) and filters[field].casefold() not in text(candidate.get(field))
+            for field in ("state", "county", "district", "office", "party")
+        ):
+            continue
+        if filters.get("category") and not categories(filters["category"]) & categories(candidate.get("category")):
+            continue
+        if any(
+            field in filters and filters[field] != bool(candidate.get(field)) for field in ("featured", "approved")
+        ):
+            continue
+        words = [word for word in text(candidate.get("name")).replace("'", " ").split() if word]
+        if any(not any(word.startswith(term) for word in words) for term in filters.get("name_prefix", "").casefold().split()):
+            continue
+        matched.append(candidate["external_id"])
+    return sorted(matched)
+
+
+class QueryIndexTest(unittest.TestCase):
+    FILTERS = [
+        {},
+        {"state": "tx"},
+        {"county": "travis"},
+        {"county": "Travis", "office": "commissioner"},
+        {"district": "precinct 4"},
+        {"district": "13"},
+        {"party": "rep"},
+        {"category": "county"},
+        {"category": "commissioner"},
+        {"category": "house,city"},
+        {"category": "county", "party": "REP", "featured": False},
+        {"featured": True},
+        {"approved": False},
+        {"approved": True, "state": "TX"},
+        {"name_prefix": "lee"},
+        {"name_prefix": "o"},
+        {"name_prefix": "neil"},
+        {"name_prefix": "b lee", "category": "county"},
+        {"office": "house", "county": "travis"},
+        {"category": "none-such"},
+    ]
+
+    def setUp(self):
+        self.index = build_index(CANDIDATES)
+
+    def query(self, filters):
+        return sorted(record["external_id"] for record in get_records(self.index, query_index(self.index, **filters)))
+
+    def test_matches_filter_over_source_candidates(self):
+        for filters in self.FILTERS:
+            with self.subTest(filters=filters):
+                self.assertEqual(self.query(filters), expected(filters))
+
+    def test_comma_separated_category_string_is_indexed(self):
+        self.assertEqual(self.query({"category": "commissioner"}), ["b"])
+        record = get_records(self.index, query_index(self.index, category="commissioner"))[0]
+        self.assertEqual(record["category"], ["county", "commissioner"])
+
+    def test_results_in_directory_order(self):
+        names = [record["name"] for record in get_records(self.index, query_index(self.index, state="tx"))]
+        self.assertEqual(names, ["Ann Lee", "Di Ng", "Bob Leeds", "Cy O'Neil"])
+
+    def test_verify_index_against_source(self):
+        self.assertEqual(verify_index(self.index, CANDIDATES), [])
+        broken = build_index(CANDIDATES)
+        broken["records"][0][broken["fields"].index("category")] = []
+        broken["facets"]["category"] = {}
+        self.assertNotEqual(verify_index(broken, CANDIDATES), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
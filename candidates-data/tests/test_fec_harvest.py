@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_fec_tx  # noqa: E402
+from fake_fec_server import start_server, synthetic_candidates  # noqa: E402
+from fec_client import RateLimiter, harvest  # noqa: E402
+from metrics import current  # noqa: E402
+
+STATES = ["TX", "OK", "NM"]
+OFFICES = ["H", "S", "P"]
+TOTAL = 750
+
+
+def expected_requests(candidates, states, offices, per_page=100):
+    # An empty (state, office) still costs one request for page 1
+    return sum(max(-(-len(candidates.get((state, office), [])) // per_page), 1) for state in states for office in offices)
+
+
+class HarvestTest(unittest.TestCase):
+    def setUp(self):
+        self.server = start_server(TOTAL, states=STATES, error_rate=0.2, retry_after=0.01, seed=3)
+        self.addCleanup(self.server.stop)
+        self.candidates = synthetic_candidates(TOTAL, STATES, seed=3)
+
+    def counter(self, name):
+        return current().counters.get(name, 0)
+
+    def test_multi_state_run_writes_every_record(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        output = os.path.join(tmp.name, "fec.json")
+        args = argparse.Namespace(
+            api_key="test",
+            cycle=2024,
+            states=",".join(STATES),
+            output_state=None,
+            workers=4,
+            rate_limit=0,
+            endpoint=self.server.url,
+            offices=",".join(OFFICES),
+            output=output,
+        )
+        self.assertEqual(fetch_fec_tx.run(args), 0)
+
+        with open(output, encoding="utf-8") as handle:
+            data = json.load(handle)
+        expected_ids = sorted(c["candidate_id"] for members in self.candidates.values() for c in members)
+        self.assertEqual(sorted(record["external_id"] for record in data), expected_ids)
+        for state, name in (("TX", "Texas"), ("OK", "Oklahoma"), ("NM", "New Mexico")):
+            with open(os.path.join(tmp.name, f"fec-{state.lower()}.json"), encoding="utf-8") as handle:
+                records = json.load(handle)
+            self.assertEqual({record["state"] for record in records}, {name})
+            self.assertEqual(len(records), sum(len(self.candidates.get((state, office), [])) for office in OFFICES))
+
+    def test_pages_and_429_retries(self):
+        # TX House alone spans several pages
+        self.assertGreater(len(self.candidates[("TX", "H")]), 100)
+        retries_before = self.counter("fec_retries")
+        by_state = harvest("test", 2024, STATES, OFFICES, workers=4, rate_limit=0, endpoint=self.server.url)
+
+        for state in STATES:
+            expected = [c["candidate_id"] for office in OFFICES for c in self.candidates.get((state, office), [])]
+            self.assertEqual([c["candidate_id"] for c in by_state[state]], expected)
+        stats = self.server.stats()
+        self.assertGreater(stats["throttled"], 0)
+        self.assertEqual(stats["requests"], expected_requests(self.candidates, STATES, OFFICES) + stats["throttled"])
+        self.assertEqual(self.counter("fec_retries") - retries_before, stats["throttled"])
+
+    def test_rate_limit_shared_by_all_workers(self):
+        self.server.error_rate = 0.0
+        rate = 20.0
+        started = time.monotonic()
+        harvest("test", 2024, STATES, OFFICES, workers=8, rate_limit=rate, endpoint=self.server.url)
+        elapsed = time.monotonic() - started
+        requests = self.server.stats()["requests"]
+        self.assertEqual(requests, expected_requests(self.candidates, STATES, OFFICES))
+        # No initial burst: n requests need at least (n - 1) intervals
+        self.assertGreaterEqual(elapsed, (requests - 1) / rate * 0.95)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_default_burst_spaces_first_requests(self):
+        limiter = RateLimiter(50.0)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 5 / 50.0 * 0.95)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPT_DIR)
+
+from pipeline import Pipeline, Stage, StageFailed  # noqa: E402
+
+
+class PipelineCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.source = os.path.join(self.tmp.name, "source.txt")
+        with open(self.source, "w", encoding="utf-8") as handle:
+            handle.write("one\n")
+        self.calls = []
+
+    def stages(self, suffix="!"):
+        def read(output_dir, _inputs):
+            self.calls.append("read")
+            with open(self.source, encoding="utf-8") as src, open(os.path.join(output_dir, "out.txt"), "w") as out:
+                out.write(src.read() + suffix)
+
+        def shout(output_dir, inputs):
+            self.calls.append("shout")
+            with open(os.path.join(inputs["read"], "out.txt")) as src, open(os.path.join(output_dir, "out.txt"), "w") as out:
+                out.write(src.read().upper())
+
+        return [
+            Stage("read", read, params={"suffix": suffix}, input_files=[self.source]),
+            Stage("shout", shout, deps=["read"]),
+        ]
+
+    def run_pipeline(self, **kwargs):
+        results = Pipeline(self.stages(**kwargs), self.cache_dir).run()
+        return {result["stage"]: result for result in results}
+
+    def test_second_run_is_cached(self):
+        first = self.run_pipeline()
+        second = self.run_pipeline()
+        self.assertEqual(self.calls, ["read", "shout"])
+        self.assertTrue(all(result["cached"] for result in second.values()))
+        self.assertEqual(first["shout"]["output_dir"], second["shout"]["output_dir"])
+        with open(os.path.join(second["shout"]["output_dir"], "out.txt")) as handle:
+            self.assertEqual(handle.read(), "ONE\n!")
+
+    def test_parameter_change_invalidates_stage_and_dependents(self):
+        self.run_pipeline()
+        results = self.run_pipeline(suffix="?")
+        self.assertEqual(self.calls, ["read", "shout", "read", "shout"])
+        self.assertFalse(results["read"]["cached"])
+
+    def test_input_file_change_invalidates_stage(self):
+        self.run_pipeline()
+        with open(self.source, "w", encoding="utf-8") as handle:
+            handle.write("two\n")
+        results = self.run_pipeline()
+        self.assertEqual(self.calls, ["read", "shout", "read", "shout"])
+        with open(os.path.join(results["shout"]["output_dir"], "out.txt")) as handle:
+            self.assertEqual(handle.read(), "TWO\n!")
+
+    def test_unchanged_dependency_output_keeps_downstream_cached(self):
+        self.run_pipeline()
+        # Same content, new mtime: the read stage key depends on content only.
+        with open(self.source, "w", encoding="utf-8") as handle:
+            handle.write("one\n")
+        results = self.run_pipeline()
+        self.assertEqual(self.calls, ["read", "shout"])
+        self.assertTrue(results["shout"]["cached"])
+
+    def test_failed_stage_leaves_no_temp_directory(self):
+        def fail(output_dir, _inputs):
+            with open(os.path.join(output_dir, "partial.json"), "w") as handle:
+                handle.write("{")
+            raise StageFailed("boom")
+
+        with self.assertRaises(StageFailed):
+            Pipeline([Stage("broken", fail)], self.cache_dir).run()
+        stage_dir = os.path.join(self.cache_dir, "broken")
+        self.assertEqual(os.listdir(stage_dir) if os.path.isdir(stage_dir) else [], [])
+
+
+class PipelineDuplicateIdTest(unittest.TestCase):
+    def test_records_sharing_an_external_id_fail_validation(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        sos_csv = os.path.join(tmp.name, "sos.csv")
+        with open(sos_csv, "w", encoding="utf-8", newline="") as handle:
+            handle.write("candidate_id,candidate_name,office\nX1,Ann Lee,Mayor\nX1,Bob Ng,Mayor\n")
+        result = subprocess.run(
+            [
+                sys.executable,
+                os.path.join(SCRIPT_DIR, "pipeline.py"),
+                "--cache-dir", os.path.join(tmp.name, "cache"),
+                "--sos-csv", sos_csv,
+                "--publish", os.path.join(tmp.name, "published.json"),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 1, result.stdout + result.stderr)
+        self.assertIn("Duplicate external_id values detected (1): X1", result.stderr)
+        self.assertFalse(os.path.exists(os.path.join(tmp.name, "published.json")))
+        for root, dirs, _files in os.walk(os.path.join(tmp.name, "cache")):
+            self.assertEqual([d for d in dirs if ".tmp-" in d], [], root)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import argparse
+import functools
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prefetch_portraits import URL_MAP_NAME, run, write_atomically  # noqa: E402
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed for the success path
+    Image = None
+
+
+class WriteAtomicallyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_writes_file(self):
+        path = os.path.join(self.tmp.name, "thumb.jpg")
+        write_atomically(path, lambda handle: handle.write(b"jpeg"))
+        with open(path, "rb") as handle:
+            self.assertEqual(handle.read(), b"jpeg")
+        self.assertEqual(os.listdir(self.tmp.name), ["thumb.jpg"])
+
+    def test_failed_write_leaves_no_temp_file(self):
+        def fail(handle):
+            handle.write(b"partial")
+            raise OSError("encoder failed")
+
+        with self.assertRaises(OSError):
+            write_atomically(os.path.join(self.tmp.name, "thumb.jpg"), fail)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+
+class CountingHandler(SimpleHTTPRequestHandler):
+    requests_served = 0
+
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        type(self).requests_served += 1
+        super().do_GET()
+
+
+def make_args(tmp_dir, candidates, **overrides):
+    dataset = os.path.join(tmp_dir, "in.json")
+    with open(dataset, "w", encoding="utf-8") as handle:
+        json.dump(candidates, handle)
+    args = argparse.Namespace(
+        input=dataset,
+        output=os.path.join(tmp_dir, "out.json"),
+        cache_dir=os.path.join(tmp_dir, "cache"),
+        size="300x300",
+        download_workers=2,
+        thumbnail_workers=1,
+        timeout=5,
+        refresh=False,
+        public_base_url=None,
+    )
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+class RunTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_failures_give_nonzero_exit_status(self):
+        # Nothing listens on port 1, so the download fails straight away
+        args = make_args(self.tmp.name, [{"external_id": "a", "name": "Ann", "portrait_url": "http://127.0.0.1:1/a.jpg"}])
+        self.assertEqual(run(args), 1)
+        self.assertTrue(os.path.exists(args.output))
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_downloads_once_and_writes_thumbnails(self):
+        site = os.path.join(self.tmp.name, "site")
+        os.makedirs(site)
+        Image.new("RGB", (800, 400), "red").save(os.path.join(site, "ann.png"))
+        CountingHandler.requests_served = 0
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(CountingHandler, directory=site))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}/ann.png"
+
+        candidates = [
+            {"external_id": "a", "name": "Ann", "portrait_url": url},
+            {"external_id": "b", "name": "Ann again", "portrait_url": url},
+            {"external_id": "c", "name": "No portrait"},
+        ]
+        args = make_args(self.tmp.name, candidates, public_base_url="https://example.org/pia")
+        self.assertEqual(run(args), 0)
+        self.assertEqual(CountingHandler.requests_served, 1)
+
+        with open(os.path.join(args.cache_dir, URL_MAP_NAME), encoding="utf-8") as handle:
+            digest = json.load(handle)[url]
+        with open(args.output, encoding="utf-8") as handle:
+            written = json.load(handle)
+        thumbnail = written[0]["portrait_thumbnail"]
+        self.assertEqual(thumbnail, {"path": f"thumbs/{digest}-300x150.jpg", "width": 300, "height": 150})
+        self.assertEqual(written[1]["portrait_thumbnail"], thumbnail)
+        self.assertNotIn("portrait_thumbnail", written[2])
+        self.assertEqual(written[0]["portrait_url"], f"https://example.org/pia/{thumbnail['path']}")
+        self.assertEqual(written[0]["portrait_source_url"], url)
+
+        thumb_path = os.path.join(args.cache_dir, thumbnail["path"])
+        with Image.open(thumb_path) as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (300, 150)))
+        self.assertEqual(stat.S_IMODE(os.stat(thumb_path).st_mode), 0o644)
+
+        # A re-run over the rewritten dataset uses the cache instead of downloading again
+        args.input, args.output = args.output, os.path.join(self.tmp.name, "again.json")
+        self.assertEqual(run(args), 0)
+        self.assertEqual(CountingHandler.requests_served, 1)
+        with open(args.output, encoding="utf-8") as handle:
+            self.assertEqual(json.load(handle)[0]["portrait_thumbnail"], thumbnail)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from render_static_pages import esc_url, render_bio, render_directory_page, render_profile_page  # noqa: E402
+
+OPTIONS = {"badge_url": "javascript:alert(1)"}
+
+
+class EscUrlTest(unittest.TestCase):
+    def test_allows_web_mail_and_relative_urls(self):
+        self.assertEqual(esc_url("https://example.com/?a=1&b=2"), "https://example.com/?a=1&amp;b=2")
+        self.assertEqual(esc_url("mailto:info@example.com"), "mailto:info@example.com")
+        self.assertEqual(esc_url("/candidates/jane-doe/"), "/candidates/jane-doe/")
+        self.assertEqual(esc_url("page-2.html"), "page-2.html")
+
+    def test_rejects_other_schemes(self):
+        for url in ("javascript:alert(1)", " JaVaScRiPt:alert(1)", "java\tscript:alert(1)", "data:text/html,<b>", "vbscript:x"):
+            self.assertEqual(esc_url(url), "", url)
+
+
+class BioTest(unittest.TestCase):
+    def test_strips_scripts_handlers_and_bad_urls(self):
+        bio = (
+            '<p onclick="steal()">Hi <strong>there</strong><script>alert(1)</script></p>'
+            '<img src="x.png" onerror="alert(1)"><a href="javascript&#58;alert(1)">x</a>'
+        )
+        rendered = render_bio(bio)
+        self.assertEqual(rendered, '<p>Hi <strong>there</strong></p><img src="x.png" /><a>x</a>')
+
+    def test_keeps_allowed_markup_and_balances_tags(self):
+        rendered = render_bio('<p>See <a href="https://example.com" target="_blank">site</a> <em>now')
+        self.assertEqual(rendered, '<p>See <a href="https://example.com" target="_blank">site</a> <em>now</em></p>')
+
+    def test_plain_text_is_escaped(self):
+        self.assertEqual(render_bio("a < b\n\nline"), "<p>a &lt; b</p><p>line</p>")
+
+
+class UrlAttributeTest(unittest.TestCase):
+    def test_profile_urls_are_escaped(self):
+        candidate = {
+            "name": "Jane",
+            "website": "javascript:alert(1)",
+            "video_url": "javascript:alert(2)",
+            "portrait_url": "javascript:alert(3)",
+            "approved": True,
+            "buttons": [{"label": "Donate", "url": "javascript:alert(4)"}],
+        }
+        self.assertNotIn("javascript", render_profile_page(candidate, OPTIONS))
+
+    def test_directory_urls_are_escaped(self):
+        record = {"name": "Jane", "website": "javascript:alert(1)", "profile_url": "javascript:alert(2)", "approved": True}
+        self.assertNotIn("javascript", render_directory_page([record], OPTIONS, 1, 1, "/dir/"))
+
+
+if __name__ == "__main__":
+    unittest.main()
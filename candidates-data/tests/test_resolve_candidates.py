@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resolve_candidates import DEFAULT_THRESHOLD, name_similarity, normalize_name, resolve_candidates  # noqa: E402
+
+
+def similarity(fec_name, sos_name):
+    return name_similarity(normalize_name(fec_name), normalize_name(sos_name))
+
+
+def candidate(source_type, external_id, name, office="U.S. House", district="07"):
+    return {
+        "external_id": external_id,
+        "name": name,
+        "office": office,
+        "district": district,
+        "source": {"source_type": source_type, "raw": {}},
+    }
+
+
+class NameSimilarityTest(unittest.TestCase):
+    DIFFERENT_PEOPLE = [
+        ("SMITH, MARK", "Mary Smith"),
+        ("SMITH, JOHN", "Joan Smith"),
+        ("GARCIA, DANIEL", "Daniela Garcia"),
+        ("JONES, CARL", "Carla Jones"),
+        ("SMITH, ROBERT", "Smith"),
+        ("SMITH", "Robert Smith"),
+        ("SMITH, JOHN ALLEN", "John Brian Smith"),
+    ]
+    SAME_PERSON = [
+        ("SMITH, JOHN A", "John Smith"),
+        ("SMITH, JOHN A.", "John A. Smith"),
+        ("SMITH, JOHN", "J. Smith"),
+        ("GARCIA LOPEZ, MARIA", "Maria Garcia-Lopez"),
+        ("JONES, CARL JR", "Mr. Carl Jones"),
+        ("WILSON, J ROBERT", "Robert Wilson"),
+    ]
+
+    def test_different_people_score_below_threshold(self):
+        for fec_name, sos_name in self.DIFFERENT_PEOPLE:
+            with self.subTest(fec=fec_name, sos=sos_name):
+                self.assertLess(similarity(fec_name, sos_name), DEFAULT_THRESHOLD)
+
+    def test_same_person_scores_at_or_above_threshold(self):
+        for fec_name, sos_name in self.SAME_PERSON:
+            with self.subTest(fec=fec_name, sos=sos_name):
+                self.assertGreaterEqual(similarity(fec_name, sos_name), DEFAULT_THRESHOLD)
+
+
+class ResolveCandidatesTest(unittest.TestCase):
+    def test_merges_only_the_same_person(self):
+        candidates = [
+            candidate("fec", "H6TX07001", "SMITH, JOHN A"),
+            candidate("fec", "H6TX07002", "SMITH, MARK"),
+            candidate("tx_sos", "txsos-john-smith", "John Smith"),
+            candidate("tx_sos", "txsos-mary-smith", "Mary Smith"),
+            candidate("tx_sos", "txsos-smith", "Smith"),
+        ]
+        resolved, merges = resolve_candidates(candidates)
+        self.assertEqual(merges, 1)
+        self.assertEqual(
+            [record["external_id"] for record in resolved],
+            ["H6TX07001", "H6TX07002", "txsos-mary-smith", "txsos-smith"],
+        )
+        self.assertEqual(resolved[0]["alternate_external_ids"], ["txsos-john-smith"])
+
+    def test_other_districts_are_not_compared(self):
+        candidates = [candidate("fec", "H1", "SMITH, JOHN"), candidate("tx_sos", "s1", "John Smith", district="08")]
+        self.assertEqual(resolve_candidates(candidates)[1], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shard_dataset import load_shards, write_shards  # noqa: E402
+
+CANDIDATES = [
+    {"external_id": "p4", "name": "Ann Potter", "county": "Potter", "district": "Precinct 4", "office": "Commissioner"},
+    {"external_id": "p2", "name": "Bob Potter", "county": "Potter", "district": "Precinct 2", "office": "Commissioner"},
+    {"external_id": "r4", "name": "Cy Randall", "county": "Randall", "district": "Precinct 4", "office": "Constable"},
+    {"external_id": "h13", "name": "Di House", "district": "13", "office": "U.S. House"},
+]
+
+
+def ids(candidates):
+    return sorted(candidate["external_id"] for candidate in candidates)
+
+
+class LoadShardsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.manifest = write_shards(CANDIDATES, self.tmp.name)
+
+    def test_manifest_records_county_and_district_separately(self):
+        entry = next(e for e in self.manifest["shards"] if e["key"] == "Potter Precinct 4")
+        self.assertEqual((entry["county"], entry["district"]), ("Potter", "Precinct 4"))
+
+    def test_county_and_district(self):
+        self.assertEqual(ids(load_shards(self.tmp.name, county="Potter", district="Precinct 4")), ["p4"])
+        self.assertEqual(ids(load_shards(self.tmp.name, county="randall", district="precinct 4")), ["r4"])
+
+    def test_district_alone_spans_counties(self):
+        self.assertEqual(ids(load_shards(self.tmp.name, district="Precinct 4")), ["p4", "r4"])
+        self.assertEqual(ids(load_shards(self.tmp.name, district="13")), ["h13"])
+
+    def test_composed_key_still_works(self):
+        self.assertEqual(ids(load_shards(self.tmp.name, district="Potter Precinct 4")), ["p4"])
+
+    def test_county_and_level(self):
+        self.assertEqual(ids(load_shards(self.tmp.name, county="Potter")), ["p2", "p4"])
+        self.assertEqual(ids(load_shards(self.tmp.name, level="federal", district="13", verify=True)), ["h13"])
+        self.assertEqual(load_shards(self.tmp.name, county="Potter", district="13"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import validate_candidates_json  # noqa: E402
+from validate_candidates_json import run  # noqa: E402
+
+CANDIDATES = [
+    {"external_id": "a", "name": "Ann Lee", "state": "Texas", "office": "Mayor"},
+    {"external_id": "b", "name": "Bob Ng", "state": "Texas", "office": "Sheriff"},
+    {"name": "Cy Oh", "state": "Texas", "office": "Clerk"},
+]
+
+
+class ValidationCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.input = os.path.join(self.tmp.name, "candidates.json")
+        self.cache = os.path.join(self.tmp.name, "cache.json")
+        self.write(CANDIDATES)
+
+    def write(self, candidates):
+        with open(self.input, "w", encoding="utf-8") as handle:
+            json.dump(candidates, handle)
+
+    def validate(self, strict=False, cache=True):
+        """(exit status, names of the records that were actually validated, stdout + stderr)."""
+        args = argparse.Namespace(input=self.input, strict=strict, cache=self.cache if cache else None)
+        output = io.StringIO()
+        with mock.patch.object(
+            validate_candidates_json, "validate_candidate", wraps=validate_candidates_json.validate_candidate
+        ) as validate_candidate, contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            status = run(args)
+        return status, [call.args[0]["name"] for call in validate_candidate.call_args_list], output.getvalue()
+
+    def test_unchanged_records_are_not_revalidated(self):
+        self.assertEqual(self.validate()[1], ["Ann Lee", "Bob Ng", "Cy Oh"])
+        status, validated, output = self.validate()
+        self.assertEqual((status, validated), (0, []))
+        self.assertIn("3 unchanged records reused, 0 validated", output)
+
+    def test_editing_one_record_revalidates_only_that_record(self):
+        self.validate()
+        edited = [dict(candidate) for candidate in CANDIDATES]
+        edited[1]["website"] = 42
+        self.write(edited)
+        status, validated, output = self.validate()
+        self.assertEqual(validated, ["Bob Ng"])
+        self.assertEqual(status, 1)
+        self.assertIn("[1] invalid `website` (must be string)", output)
+
+    def test_cached_results_match_an_uncached_run(self):
+        self.validate()
+        self.assertEqual(self.validate()[0], self.validate(cache=False)[0])
+        cached_messages = self.validate()[2].splitlines()[2:]
+        uncached_messages = self.validate(cache=False)[2].splitlines()[1:]
+        self.assertEqual(cached_messages, uncached_messages)
+
+    def test_strict_is_part_of_the_cache_key(self):
+        status, _validated, output = self.validate()
+        self.assertEqual(status, 0)
+        self.assertIn("[2] missing `external_id`", output)
+
+        status, validated, output = self.validate(strict=True)
+        self.assertEqual((status, validated), (1, ["Ann Lee", "Bob Ng", "Cy Oh"]))
+        self.assertIn("[2] missing `external_id`", output)
+        with open(self.cache, encoding="utf-8") as handle:
+            self.assertTrue(all(key.startswith("strict:") for key in json.load(handle)["records"]))
+
+        self.assertEqual(self.validate(strict=True)[:2], (1, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,13 +7,26 @@ This checks:
 - booleans for featured/approved
 - optional buttons/category structure
 - duplicate external_id collisions
+
+Binary snapshots (see snapshot.py) are accepted as well as JSON.
+
+With `--cache`, per-record results are stored by record content hash, so re-runs only
+validate new or changed records. The cache also keeps each record's `external_id` and
+`state`, which is all the dataset-wide duplicate and mixed-state checks need.
 """
 
 import argparse
+import hashlib
 import json
+import os
 import sys
 from collections import Counter
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+from dataset_io import content_hash, is_snapshot_file
+from metrics import add_metrics_arguments, incr, instrument, stage
+
+CACHE_VERSION = 1
 
 
 def is_bool(value: Any) -> bool:
@@ -82,6 +95,56 @@ def validate_candidate(candidate: Dict[str, Any], index: int, strict: bool) -> T
     return errors, warnings
 
 
+def validator_digest() -> str:
+    # Any change to the rules in this file invalidates previously cached results.
+    with open(os.path.abspath(__file__), "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()
+
+
+def load_cache(path: str, digest: str) -> Dict[str, Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            cache = json.load(handle)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if cache.get("version") != CACHE_VERSION or cache.get("validator") != digest:
+        return {}
+    return cache.get("records", {})
+
+
+def save_cache(path: str, digest: str, records: Dict[str, Dict]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump({"version": CACHE_VERSION, "validator": digest, "records": records}, handle, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def validate_cached(
+    candidate: Dict[str, Any],
+    index: int,
+    strict: bool,
+    cache: Dict[str, Dict],
+    seen: Dict[str, Dict],
+) -> Tuple[Dict, bool]:
+    """Return (cache entry, cache hit) for one record; messages in the entry carry no `[index]` prefix."""
+    key = f"{'strict' if strict else 'default'}:{content_hash(candidate)}"
+    entry = cache.get(key)
+    hit = entry is not None
+    if entry is None:
+        errors, warnings = validate_candidate(candidate, index, strict)
+        prefix = f"[{index}] "
+        external_id = candidate.get("external_id", "")
+        state = candidate.get("state", "")
+        entry = {
+            "errors": [msg[len(prefix):] if msg.startswith(prefix) else msg for msg in errors],
+            "warnings": [msg[len(prefix):] if msg.startswith(prefix) else msg for msg in warnings],
+            "external_id": external_id.strip() if isinstance(external_id, str) else "",
+            "state": state.strip() if isinstance(state, str) else "",
+        }
+    seen[key] = entry
+    return entry, hit
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--input", required=True, help="Path to candidate JSON file (array of objects)")
@@ -90,20 +153,30 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Treat missing external_id as an error (recommended for production imports)",
     )
+    parser.add_argument("--cache", help="Validation cache file; only new or changed records are re-validated")
+    add_metrics_arguments(parser)
     return parser.parse_args()
 
 
-def main() -> int:
-    args = parse_args()
+def run(args: argparse.Namespace) -> int:
     try:
-        with open(args.input, "r", encoding="utf-8") as handle:
-            payload = json.load(handle)
+        with stage("load_input"):
+            if is_snapshot_file(args.input):
+                from snapshot import read_snapshot
+
+                payload = read_snapshot(args.input)
+            else:
+                with open(args.input, "r", encoding="utf-8") as handle:
+                    payload = json.load(handle)
     except FileNotFoundError:
         print(f"File not found: {args.input}", file=sys.stderr)
         return 2
     except json.JSONDecodeError as e:
         print(f"Invalid JSON: {e}", file=sys.stderr)
         return 2
+    except ValueError as e:  # snapshot.SnapshotError
+        print(f"Invalid snapshot: {e}", file=sys.stderr)
+        return 2
 
     if not isinstance(payload, list):
         print("Top-level JSON must be a list/array of candidates.", file=sys.stderr)
@@ -112,21 +185,43 @@ def main() -> int:
     all_errors: List[str] = []
     all_warnings: List[str] = []
 
+    digest = validator_digest() if args.cache else ""
+    cache: Optional[Dict[str, Dict]] = load_cache(args.cache, digest) if args.cache else None
+    seen: Dict[str, Dict] = {}
+    cache_hits = 0
+
     external_ids: List[str] = []
     states: List[str] = []
-    for idx, item in enumerate(payload):
-        if not isinstance(item, dict):
-            all_errors.append(f"[{idx}] candidate must be an object/dict")
-            continue
-        external_id = item.get("external_id", "")
-        if isinstance(external_id, str) and external_id.strip():
-            external_ids.append(external_id.strip())
-        state = item.get("state", "")
-        if isinstance(state, str) and state.strip():
-            states.append(state.strip())
-        errors, warnings = validate_candidate(item, idx, args.strict)
-        all_errors.extend(errors)
-        all_warnings.extend(warnings)
+    with stage("validate"):
+        for idx, item in enumerate(payload):
+            if not isinstance(item, dict):
+                all_errors.append(f"[{idx}] candidate must be an object/dict")
+                continue
+            if cache is not None:
+                entry, hit = validate_cached(item, idx, args.strict, cache, seen)
+                cache_hits += hit
+                if entry["external_id"]:
+                    external_ids.append(entry["external_id"])
+                if entry["state"]:
+                    states.append(entry["state"])
+                all_errors.extend(f"[{idx}] {msg}" for msg in entry["errors"])
+                all_warnings.extend(f"[{idx}] {msg}" for msg in entry["warnings"])
+                continue
+            external_id = item.get("external_id", "")
+            if isinstance(external_id, str) and external_id.strip():
+                external_ids.append(external_id.strip())
+            state = item.get("state", "")
+            if isinstance(state, str) and state.strip():
+                states.append(state.strip())
+            errors, warnings = validate_candidate(item, idx, args.strict)
+            all_errors.extend(errors)
+            all_warnings.extend(warnings)
+    incr("records_validated", len(payload) - cache_hits)
+    incr("validation_cache_hits", cache_hits)
+
+    if args.cache:
+        # Only keep entries for records in this dataset so the cache doesn't grow without bound.
+        save_cache(args.cache, digest, seen)
 
     dupes = [eid for eid, count in Counter(external_ids).items() if count > 1]
     if dupes:
@@ -138,6 +233,8 @@ def main() -> int:
 
     total = len(payload)
     print(f"Validated {total} candidates from {args.input}")
+    if args.cache:
+        print(f"Validation cache: {cache_hits} unchanged records reused, {len(payload) - cache_hits} validated")
     if all_warnings:
         print(f"WARNINGS ({len(all_warnings)}):")
         for msg in all_warnings[:50]:
@@ -156,6 +253,12 @@ def main() -> int:
     return 0
 
 
+def main() -> int:
+    args = parse_args()
+    with instrument("validate_candidates_json", args, output=args.input):
+        return run(args)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
 
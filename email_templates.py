@@ -0,0 +1,151 @@
+"""Jinja2 email templates for send_emails.py.
+
+A campaign is an HTML template and a plain-text template, by default
+`resetnotification.html` and `emailtemplate.txt` next to this file. Template paths
+are relative to the current directory, or absolute; a bare file name that isn't in
+the current directory is looked up next to this file. Either template
+sets the subject with `{% set subject = "..." %}`, and both are rendered with the
+recipient's mailing-list row (`email`, plus any other columns such as `firstname`).
+
+Templates are compiled once and kept in the Jinja environment's cache. A cached
+template is recompiled only when its file's mtime changes. The `<style>` rules of an
+HTML template are copied into `style=""` attributes when the template is loaded, so
+that happens once per compile rather than once per message. Rules that can't be
+inlined (`a:hover`, descendant selectors, @media) are left in the `<style>` block.
+"""
+import os
+import re
+
+import jinja2
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+HTML_TEMPLATE = 'resetnotification.html'
+TEXT_TEMPLATE = 'emailtemplate.txt'
+
+STYLE_BLOCK = re.compile(r'<style[^>]*>(.*?)</style>', re.S | re.I)
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+CSS_RULE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+# tag, .class, tag.class.other; anything else stays in the <style> block
+SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)?((?:\.[\w-]+)*)$')
+START_TAG = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)\b([^<>]*?)(/?)>')
+CLASS_ATTR = re.compile(r'\sclass\s*=\s*(["\'])(.*?)\1', re.S | re.I)
+STYLE_ATTR = re.compile(r'\sstyle\s*=\s*(["\'])(.*?)\1', re.S | re.I)
+
+
+def parse_declarations(text):
+    declarations = {}
+    for declaration in text.split(';'):
+        name, colon, value = declaration.partition(':')
+        if colon and name.strip() and value.strip():
+            declarations[name.strip().lower()] = ' '.join(value.split())
+    return declarations
+
+
+def parse_css(css):
+    """[(specificity, tag, classes, declarations)] for the rules simple enough to inline, in cascade order."""
+    rules = []
+    for selectors, body in CSS_RULE.findall(CSS_COMMENT.sub('', css)):
+        if selectors.strip().startswith('@'):
+            continue
+        declarations = parse_declarations(body)
+        for selector in selectors.split(','):
+            match = SIMPLE_SELECTOR.match(selector.strip())
+            if not match or not selector.strip():
+                continue
+            tag = (match.group(1) or '').lower()
+            classes = frozenset(name for name in match.group(2).split('.') if name)
+            rules.append(((len(classes), bool(tag)), len(rules), tag, classes, declarations))
+    rules.sort(key=lambda rule: rule[:2])
+    return [(specificity, tag, classes, declarations) for specificity, _order, tag, classes, declarations in rules]
+
+
+def inline_css(source):
+    """Copy the simple <style> rules of an HTML document into style attributes in its <body>."""
+    rules = []
+    for css in STYLE_BLOCK.findall(source):
+        rules.extend(parse_css(css))
+    if not rules:
+        return source
+
+    def add_style(match):
+        tag, attrs, self_closing = match.group(1).lower(), match.group(2), match.group(3)
+        class_attr = CLASS_ATTR.search(attrs)
+        classes = set(class_attr.group(2).split()) if class_attr else set()
+        style = {}
+        for _specificity, rule_tag, rule_classes, declarations in rules:
+            if (not rule_tag or rule_tag == tag) and rule_classes <= classes:
+                style.update(declarations)
+        if not style:
+            return match.group(0)
+        style_attr = STYLE_ATTR.search(attrs)
+        if style_attr:
+            # The element's own style attribute wins over the stylesheet
+            style.update(parse_declarations(style_attr.group(2)))
+            attrs = attrs[:style_attr.start()] + attrs[style_attr.end():]
+        css = '; '.join(f'{name}: {value}' for name, value in style.items())
+        return f'<{match.group(1)}{attrs} style="{css}"{self_closing}>'
+
+    body_start = re.search(r'<body\b', source, re.I)
+    split = body_start.start() if body_start else source.rfind('</style>') + 1
+    return source[:split] + START_TAG.sub(add_style, source[split:])
+
+
+class InliningLoader(jinja2.FileSystemLoader):
+    """FileSystemLoader that inlines the CSS of .html templates before they are compiled."""
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        if template.endswith(('.html', '.htm')):
+            source = inline_css(source)
+        return source, filename, uptodate
+
+
+_environments = {}
+
+
+def template_environment(directory=TEMPLATE_DIR):
+    # FileSystemLoader's uptodate check compares the file's mtime, so with auto_reload the
+    # cached compiled template is reused until the file is edited
+    environment = _environments.get(directory)
+    if environment is None:
+        environment = _environments[directory] = jinja2.Environment(
+            loader=InliningLoader(directory),
+            autoescape=jinja2.select_autoescape(['html', 'htm']),
+            auto_reload=True,
+            keep_trailing_newline=True,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            undefined=jinja2.StrictUndefined,
+        )
+    return environment
+
+
+def resolve_template(path):
+    """(directory, file name) of a template path given on the command line."""
+    full_path = os.path.abspath(path)
+    if not os.path.dirname(path) and not os.path.isfile(full_path):
+        full_path = os.path.join(TEMPLATE_DIR, path)
+    return os.path.dirname(full_path), os.path.basename(full_path)
+
+
+def load_template(path):
+    # One environment (and cache) per template directory
+    directory, name = resolve_template(path)
+    return template_environment(directory).get_template(name)
+
+
+class Campaign:
+    """The compiled HTML and text templates of one mailing."""
+
+    def __init__(self, html_template=HTML_TEMPLATE, text_template=TEXT_TEMPLATE):
+        self.html = load_template(html_template)
+        self.text = load_template(text_template)
+
+    def render(self, context):
+        """(subject, text, html) for one recipient."""
+        text = self.text.make_module(context)
+        html = self.html.make_module(context)
+        subject = getattr(text, 'subject', None) or getattr(html, 'subject', None)
+        if not subject:
+            raise ValueError(f'Neither {self.text.name} nor {self.html.name} sets a subject')
+        return ' '.join(str(subject).split()), str(text), str(html)
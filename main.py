@@ -1,122 +1,102 @@
 import os
+import sys
 import csv
+import time
+import argparse
+import hashlib
+import logging
 from datetime import datetime
-from collections import defaultdict
-import matplotlib.pyplot as plt
-import pandas as pd
 
-def extract_info_from_csv(file_path):
-    items = {}
-    total_amount = 0.0
-    date_str = ""
-
-    try:
-        with open(file_path, mode='r', newline='') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                if len(row) < 2:  # Ensure row has at least 2 columns
-                    continue
-                if "Invoice" in row[0]:
-                    try:
-                        date_str = datetime.strptime(row[1].split('-')[1].strip(), "%m/%d/%Y %I:%M %p").strftime("%Y-%m-%d")
-                    except Exception as e:
-                        print(f"Error parsing date from row {row}: {e}")
-                if row[0].isdigit() and len(row) >= 5:
-                    item_description = row[1].strip()
-                    price_string = row[-1].replace('$', '').replace(',', '').strip()
-                    if price_string:
-                        try:
-                            price = float(price_string)
-                            if item_description in items:
-                                item_data = items[item_description]
-                                item_data['total'] += price
-                                item_data['count'] += 1
-                                item_data['min'] = min(item_data['min'], price)
-                                item_data['max'] = max(item_data['max'], price)
-                            else:
-                                items[item_description] = {
-                                    'total': price,
-                                    'count': 1,
-                                    'min': price,
-                                    'max': price
-                                }
-                        except ValueError:
-                            print(f"Invalid price format: {price_string}")
-
-                if len(row) >= 2 and "Total" in row[1]:  # Ensure row has at least 2 columns and "Total" in second column
-                    total_string = row[-1].replace('$', '').replace(',', '').strip()
-                    if total_string:
-                        try:
-                            total_amount = float(total_string)
-                        except ValueError:
-                            print(f"Invalid total format: {total_string}")
-
-    except Exception as e:
-        print(f"Error processing file {file_path}: {e}")
-
-    print(f"Items processed from {file_path}: {items}")  # Debugging statement
-    print(f"Total from {file_path}: {total_amount}")  # Debugging statement
-    return total_amount, date_str, items
-
-
-def process_receipts(directory_path):
-    grand_total = 0.0
-    totals_by_date = {}
-    totals_by_month = defaultdict(float)
-    monthly_counts = defaultdict(int)
-    all_items = {}
-    processed_data = []
-
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.csv'):
-            file_path = os.path.join(directory_path, filename)
-            total, date_str, items = extract_info_from_csv(file_path)
-            grand_total += total
-            if date_str in totals_by_date:
-                totals_by_date[date_str] += total
-            else:
-                totals_by_date[date_str] = total
-
-            month_str = date_str[:7]  # Extract the year-month part of the date
-            totals_by_month[month_str] += total
-            monthly_counts[month_str] += 1
-
-            for item, data in items.items():
-                if item in all_items:
-                    all_items[item]['total'] += data['total']
-                    all_items[item]['count'] += data['count']
-                    all_items[item]['min'] = min(all_items[item]['min'], data['min'])
-                    all_items[item]['max'] = max(all_items[item]['max'], data['max'])
-                else:
-                    all_items[item] = data
-
-            # Collect data for processed file
-            processed_data.append((date_str, items))
-
-    monthly_averages = {month: totals_by_month[month] / monthly_counts[month] for month in totals_by_month}
+from price_history import DEFAULT_WINDOW, build_price_history, write_price_report
+from receipt_charts import chart_outputs, render_charts
+from receipt_dedup import DedupIndex
+from receipt_log import DebugSampler, ParseReport, logger, setup_logging
+from receipt_export import (EXPORT_FORMATS, display_rows, export_report, item_rows, monthly_rows,
+                            most_bought_rows, parse_formats, processed_rows, totals_rows)
+from receipt_io import atomic_open
+from receipt_models import RunningTotals, aggregate_line_items
+from receipt_parsers import parse_receipt
+from receipt_store import DEFAULT_DB, ReceiptStore
+
+# Per-file item dumps are only logged at DEBUG, and then only for one file in every N.
+debug_sample = DebugSampler()
+
+def read_receipt(file_path, report=None):
+    receipt = parse_receipt(file_path, report)
+    item_stats = aggregate_line_items(receipt.items)
+    if debug_sample():
+        logger.debug('Items processed from %s (%s): %s', file_path, receipt.vendor,
+                     {item: stats.as_dict() for item, stats in item_stats.items()})
+        logger.debug('Total from %s: %s', file_path, receipt.total)
+    return receipt, item_stats
+
+
+def extract_info_from_csv(file_path, report=None):
+    receipt, item_stats = read_receipt(file_path, report)
+    return receipt.total, receipt.date, {item: stats.as_dict() for item, stats in item_stats.items()}
+
+
+def ingest_file(file_path, totals, report=None, dedup=None, store=None):
+    """Parse one receipt into the running totals; returns False if it was skipped."""
+    # Re-exported invoices are skipped after reading only their header lines
+    if dedup is not None and dedup.check(file_path):
+        return False
+    receipt, item_stats = read_receipt(file_path, report)
+    if receipt.vendor is None:  # unreadable or unrecognized; already quarantined
+        return False
+    # Only files that are new or changed since the last run are rewritten in the store
+    if store is not None and store.needs_update(file_path):
+        store.add_receipt(file_path, receipt.invoice, receipt.date, receipt.total,
+                          [line_item.store_row() for line_item in receipt.items if not line_item.summary])
+    totals.add(file_path, receipt.date, receipt.total_cents, item_stats)
+    return True
+
+
+def receipt_files(directory_path):
+    return [os.path.join(directory_path, filename) for filename in sorted(os.listdir(directory_path)) if filename.endswith('.csv')]
+
+
+def process_receipts(directory_path, report=None, dedup=None, store=None, totals=None):
+    # Money is summed in integer cents and only converted to dollars for the results
+    if totals is None:
+        totals = RunningTotals()
+    if dedup is None:
+        dedup = DedupIndex()
+
+    for file_path in receipt_files(directory_path):
+        ingest_file(file_path, totals, report, dedup, store)
+
+    if store is not None:
+        store.prune(totals.files)
+    processed_data, grand_total, totals_by_date, all_items, monthly_averages = totals.results()
 
     # Output results
-    print(f"Grand Total: ${grand_total:.2f}")
-    for date, total in totals_by_date.items():
-        print(f"Date: {date}, Total: ${total:.2f}")
-    for month, avg in monthly_averages.items():
-        print(f"Month: {month}, Average Total: ${avg:.2f}")
-    for item, data in sorted(all_items.items(), key=lambda x: x[1]['total'], reverse=True):
-        print(f"Item: {item}, Total: ${data['total']:.2f}, Count: {data['count']}, Min: ${data['min']:.2f}, Max: ${data['max']:.2f}")
+    logger.info("Grand Total: $%.2f", grand_total)
+    if logger.isEnabledFor(logging.DEBUG):
+        for date, total in totals_by_date.items():
+            logger.debug("Date: %s, Total: $%.2f", date, total)
+        for month, avg in monthly_averages.items():
+            logger.debug("Month: %s, Average Total: $%.2f", month, avg)
+        for item, data in sorted(all_items.items(), key=lambda x: x[1]['total'], reverse=True):
+            logger.debug("Item: %s, Total: $%.2f, Count: %d, Min: $%.2f, Max: $%.2f", item, data['total'], data['count'], data['min'], data['max'])
 
     return processed_data, grand_total, totals_by_date, all_items, monthly_averages
 
 
-def calculate_totals(directory_path):
+def calculate_totals(directory_path, report=None, dedup=None):
     grand_total = 0.0
     totals_by_date = {}
     all_items = {}
+    if dedup is None:
+        dedup = DedupIndex()
 
-    for filename in os.listdir(directory_path):
+    for filename in sorted(os.listdir(directory_path)):
         if filename.endswith('.csv'):
             file_path = os.path.join(directory_path, filename)
-            total, date_str, items = extract_info_from_csv(file_path)
-            print(f"File: {filename}, Date: {date_str}, Total: {total}")  # Debugging output
+            if dedup.check(file_path):
+                continue
+            total, date_str, items = extract_info_from_csv(file_path, report)
+            logger.debug("File: %s, Date: %s, Total: %s", filename, date_str, total)
             if date_str:
                 grand_total += total
                 if date_str in totals_by_date:
@@ -131,150 +111,292 @@ def calculate_totals(directory_path):
                     else:
                         all_items[item] = {'total': data['total'], 'count': 1}
 
-    print(f"Calculated Grand Total: ${grand_total:.2f}")  # Debugging output
+    logger.debug("Calculated Grand Total: $%.2f", grand_total)
     return grand_total, totals_by_date, all_items
 
 
-def save_to_csv(totals_by_date, items, grand_total, output_file, items_file, processed_file, monthly_averages):
+def write_totals_csv(output_file, totals_by_date, grand_total):
     # Writing date and total information to CSV
-    with open(output_file, mode='w', newline='') as file:
+    with atomic_open(output_file) as file:
         writer = csv.writer(file)
         writer.writerow(['Date', 'Total'])
-        for date, total in sorted(totals_by_date.items()):
-            writer.writerow([date, f"${total:.2f}"])
+        writer.writerows(display_rows('totals_by_date', totals_rows(totals_by_date)))
         writer.writerow(['Grand Total', f"${grand_total:.2f}"])
 
+
+def write_items_csv(items_file, items):
     # Writing item details to CSV
-    with open(items_file, mode='w', newline='') as file:
+    with atomic_open(items_file) as file:
         writer = csv.writer(file)
         writer.writerow(['Item', 'Total Cost', 'Frequency', 'Min Price', 'Max Price', 'Average Price'])
-        for item, data in sorted(items.items(), key=lambda x: x[1]['total'], reverse=True):
-            if 'min' in data and 'max' in data:  # Checking that all required fields are present
-                average_price = data['total'] / data['count'] if data['count'] > 0 else 0
-                writer.writerow([item, f"${data['total']:.2f}", data['count'], f"${data['min']:.2f}", f"${data['max']:.2f}", f"${average_price:.2f}"])
-            else:
-                print(f"Missing 'min' or 'max' for item {item}: {data}")
+        writer.writerows(display_rows('items', item_rows(items)))
+
 
+def write_processed_csv(processed_file, processed_data):
     # Writing processed data details to CSV
-    with open(processed_file, mode='w', newline='') as file:
+    with atomic_open(processed_file) as file:
         writer = csv.writer(file)
         writer.writerow(['Date', 'Item', 'Total Cost', 'Frequency', 'Min Price', 'Max Price'])
-        for date, items in processed_data:
-            for item, data in items.items():
-                writer.writerow([date, item, f"${data['total']:.2f}", data['count'], f"${data['min']:.2f}", f"${data['max']:.2f}"])
+        writer.writerows(display_rows('processed', processed_rows(processed_data)))
+
 
+def write_monthly_averages_csv(monthly_file, monthly_averages):
     # Writing monthly averages to CSV
-    with open(os.path.join(output_dir, 'monthly_averages.csv'), mode='w', newline='') as file:
+    with atomic_open(monthly_file) as file:
         writer = csv.writer(file)
         writer.writerow(['Month', 'Average Total'])
-        for month, avg in sorted(monthly_averages.items()):
-            writer.writerow([month, f"${avg:.2f}"])
+        writer.writerows(display_rows('monthly_averages', monthly_rows(monthly_averages)))
 
 
-def save_most_bought_items_to_csv(items, output_csv_file):
-    # Sorting items by count in descending order
-    sorted_items = sorted(items.items(), key=lambda x: x[1]['count'], reverse=True)
+def save_to_csv(totals_by_date, items, grand_total, output_file, items_file, processed_file, monthly_averages, processed_data, output_dir):
+    write_totals_csv(output_file, totals_by_date, grand_total)
+    write_items_csv(items_file, items)
+    write_processed_csv(processed_file, processed_data)
+    write_monthly_averages_csv(os.path.join(output_dir, 'monthly_averages.csv'), monthly_averages)
+
 
-    # Writing most bought items and their costs to a CSV file
-    with open(output_csv_file, mode='w', newline='') as file:
+def save_most_bought_items_to_csv(items, output_csv_file):
+    # Writing most bought items (by count) and their costs to a CSV file
+    with atomic_open(output_csv_file) as file:
         writer = csv.writer(file)
         writer.writerow(['Item', 'Count', 'Total Cost'])
-        for item, data in sorted_items:
-            writer.writerow([item, data['count'], f"${data['total']:.2f}"])
+        writer.writerows(display_rows('most_bought_items', most_bought_rows(items)))
+
+
+def report_outputs(output_dir, processed_data, grand_total, totals_by_date, all_items, monthly_averages):
+    """[(path, fingerprint, write)] for every summary CSV and chart.
+
+    A fingerprint only changes when the output's content would, so watch mode can rewrite
+    just the outputs a new receipt actually affects.
+    """
+    totals_key = (sorted(totals_by_date.items()), grand_total)
+    monthly_key = sorted(monthly_averages.items())
+    items_key = sorted((item, data['total'], data['count'], data['min'], data['max']) for item, data in all_items.items())
+    return [
+        (os.path.join(output_dir, 'totals_summary.csv'), totals_key,
+         lambda path: write_totals_csv(path, totals_by_date, grand_total)),
+        (os.path.join(output_dir, 'items_summary.csv'), items_key,
+         lambda path: write_items_csv(path, all_items)),
+        # processed_data only grows until it is rebuilt, so serial and length identify its contents
+        (os.path.join(output_dir, 'processed_summary.csv'), (processed_data.serial, len(processed_data)),
+         lambda path: write_processed_csv(path, processed_data)),
+        (os.path.join(output_dir, 'monthly_averages.csv'), monthly_key,
+         lambda path: write_monthly_averages_csv(path, monthly_averages)),
+        (os.path.join(output_dir, 'most_bought_items.csv'), items_key,
+         lambda path: save_most_bought_items_to_csv(all_items, path)),
+    ] + chart_outputs(output_dir, totals_by_date, all_items, monthly_averages)
 
 
 def create_visualizations(output_dir, totals_by_date, items, monthly_averages):
-    # Create directory for visualizations
-    visualization_dir = os.path.join(output_dir, 'visualizations')
-    os.makedirs(visualization_dir, exist_ok=True)
-
-    # Visualization 1: Totals by Date
-    dates = list(totals_by_date.keys())
-    totals = list(totals_by_date.values())
-
-    plt.figure(figsize=(10, 6))
-    plt.bar(dates, totals)
-    plt.xlabel('Date')
-    plt.ylabel('Total Amount')
-    plt.title('Total Amount by Date')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(os.path.join(visualization_dir, 'totals_by_date.png'))
-    plt.close()
-
-    # Visualization 2: Monthly Averages
-    months = list(monthly_averages.keys())
-    averages = list(monthly_averages.values())
-
-    plt.figure(figsize=(10, 6))
-    plt.bar(months, averages)
-    plt.xlabel('Month')
-    plt.ylabel('Average Total')
-    plt.title('Average Total by Month')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(os.path.join(visualization_dir, 'monthly_averages.png'))
-    plt.close()
-
-    # Visualization 3: Most Bought Items
-    item_names = list(items.keys())
-    item_totals = [data['total'] for data in items.values()]
-
-    plt.figure(figsize=(10, 6))
-    plt.barh(item_names, item_totals)
-    plt.xlabel('Total Amount')
-    plt.ylabel('Item')
-    plt.title('Total Amount by Item')
-    plt.tight_layout()
-    plt.savefig(os.path.join(visualization_dir, 'items_totals.png'))
-    plt.close()
-
-    # Visualization 4: Top 10 Most Bought Items
-    exclude_items = {"subtotal", "tax", "total", "balance", "iou", "payment", "debit"}
-    filtered_items = {k: v for k, v in items.items() if all(x not in k.lower() for x in exclude_items)}
-
-    sorted_items = sorted(filtered_items.items(), key=lambda x: x[1]['count'], reverse=True)[:10]
-    top_items = [item[0] for item in sorted_items]
-    top_counts = [item[1]['count'] for item in sorted_items]
-    top_totals = [item[1]['total'] for item in sorted_items]
-
-    fig, ax1 = plt.subplots(figsize=(10, 6))
-
-    color = 'tab:blue'
-    ax1.set_xlabel('Item')
-    ax1.set_ylabel('Count', color=color)
-    ax1.bar(top_items, top_counts, color=color, alpha=0.6, label='Count')
-    ax1.tick_params(axis='y', labelcolor=color)
-    plt.xticks(rotation=45)
-    
-    ax2 = ax1.twinx()  # instantiate a second axes that shares the same x-axis
-    color = 'tab:red'
-    ax2.set_ylabel('Total Cost', color=color)  # we already handled the x-label with ax1
-    ax2.plot(top_items, top_totals, color=color, marker='o', linestyle='-', linewidth=2, label='Total Cost')
-    ax2.tick_params(axis='y', labelcolor=color)
-
-    fig.tight_layout()  # otherwise the right y-label is slightly clipped
-    plt.title('Top 10 Most Bought Items')
-    plt.legend(loc='upper left')
-    plt.savefig(os.path.join(visualization_dir, 'top_10_most_bought_items.png'))
-    plt.close()
-
-
-# Execution
-directory_path = 'receipts'
-current_date = datetime.now().strftime("%Y-%m-%d")
-output_dir = f'output_{current_date}'
-os.makedirs(output_dir, exist_ok=True)
-
-output_csv_file = os.path.join(output_dir, 'totals_summary.csv')
-items_csv_file = os.path.join(output_dir, 'items_summary.csv')
-processed_csv_file = os.path.join(output_dir, 'processed_summary.csv')
-most_bought_items_csv_file = os.path.join(output_dir, 'most_bought_items.csv')
-
-processed_data, grand_total, totals_by_date, all_items, monthly_averages = process_receipts(directory_path)
-print(f"Grand Total: ${grand_total:.2f}")
-save_to_csv(totals_by_date, all_items, grand_total, output_csv_file, items_csv_file, processed_csv_file, monthly_averages)
-save_most_bought_items_to_csv(all_items, most_bought_items_csv_file)
-
-# Create visualizations
-create_visualizations(output_dir, totals_by_date, all_items, monthly_averages)
+    # All charts in one headless batch, straight from the aggregates
+    render_charts(output_dir, totals_by_date, items, monthly_averages)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Summarize Restaurant Depot receipt CSVs, or search the line items.')
+    parser.add_argument('--log-level', default='INFO', help='DEBUG, INFO, WARNING or ERROR (default: INFO)')
+    parser.add_argument('--log-file', help='Also write the log to this file')
+    parser.add_argument('--debug-sample', type=int, default=10, help='At DEBUG, dump parsed items for one file in every N (default: 10)')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'Line-item query store (default: {DEFAULT_DB}); filled on every report run')
+    subparsers = parser.add_subparsers(dest='command')
+    report = subparsers.add_parser('report', help='Parse receipts/ and write output_<date>/ (the default)')
+    report.add_argument('--price-window', type=int, default=DEFAULT_WINDOW, help=f'Purchases per UPC in the rolling average unit price (default: {DEFAULT_WINDOW})')
+    report.add_argument('--export', help=f'Also write typed tables to output_<date>/export/: comma-separated {", ".join(EXPORT_FORMATS)}')
+    watch = subparsers.add_parser('watch', help='Keep output_<date>/ current as receipts land in receipts/')
+    watch.add_argument('--output-dir', help='Report directory to keep updated (default: output_<today>)')
+    watch.add_argument('--price-window', type=int, default=DEFAULT_WINDOW, help=f'Purchases per UPC in the rolling average unit price (default: {DEFAULT_WINDOW})')
+    watch.add_argument('--poll', action='store_true', help='Poll the directory instead of using inotify')
+    watch.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between polls (default: 2)')
+    watch.add_argument('--settle', type=float, default=1.0, help='Wait this long after the last event before updating (default: 1)')
+    query = subparsers.add_parser('query', help='Search stored line items by description, UPC and date')
+    query.add_argument('text', nargs='?', help='Words that must all appear in the description (prefix match)')
+    query.add_argument('--upc', help='Exact UPC')
+    query.add_argument('--since', help='First date to include (YYYY-MM-DD)')
+    query.add_argument('--until', help='Last date to include (YYYY-MM-DD)')
+    query.add_argument('--limit', type=int, help='Show at most this many lines')
+    return parser.parse_args()
+
+
+def run_report(args):
+    try:
+        export_formats = parse_formats(getattr(args, 'export', None))
+    except ValueError as e:
+        logger.error("%s", e)
+        return 2
+    directory_path = 'receipts'
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    output_dir = f'output_{current_date}'
+    os.makedirs(output_dir, exist_ok=True)
+
+    output_csv_file = os.path.join(output_dir, 'totals_summary.csv')
+    items_csv_file = os.path.join(output_dir, 'items_summary.csv')
+    processed_csv_file = os.path.join(output_dir, 'processed_summary.csv')
+    most_bought_items_csv_file = os.path.join(output_dir, 'most_bought_items.csv')
+
+    parse_report = ParseReport()
+    dedup_index = DedupIndex()
+    with ReceiptStore(args.db) as store:
+        processed_data, grand_total, totals_by_date, all_items, monthly_averages = process_receipts(directory_path, parse_report, dedup_index, store)
+        # Per-UPC unit price history over everything in the store
+        price_history = build_price_history(store.all_lines(), window=max(getattr(args, 'price_window', DEFAULT_WINDOW), 1))
+    write_price_report(price_history, output_dir)
+    save_to_csv(totals_by_date, all_items, grand_total, output_csv_file, items_csv_file, processed_csv_file, monthly_averages, processed_data, output_dir)
+    save_most_bought_items_to_csv(all_items, most_bought_items_csv_file)
+    if export_formats:
+        try:
+            exported = export_report(output_dir, export_formats, (processed_data, grand_total, totals_by_date, all_items, monthly_averages))
+        except RuntimeError as e:
+            logger.error("%s", e)
+            return 1
+        logger.info("Exported %d files to %s", len(exported), os.path.join(output_dir, 'export'))
+
+    # Create visualizations
+    create_visualizations(output_dir, totals_by_date, all_items, monthly_averages)
+
+    # Quarantine report and per-file parse timings
+    parse_report.write(output_dir)
+    parse_report.log_summary()
+    dedup_index.write(output_dir)
+    if dedup_index.duplicates:
+        logger.info("Skipped %d duplicate receipts (see %s)", len(dedup_index.duplicates), os.path.join(output_dir, 'duplicates.csv'))
+    return 0
+
+
+def file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class WatchState:
+    """Everything one pass over receipts/ accumulates; replaced wholesale on a rebuild."""
+
+    def __init__(self):
+        self.report = ParseReport()
+        self.dedup = DedupIndex()
+        self.totals = RunningTotals()
+        self.seen = {}
+
+
+def update_reports(output_dir, state, store, written, price_window):
+    """Rewrite the outputs whose fingerprint changed since they were last written."""
+    rewritten = []
+    for path, key, write in report_outputs(output_dir, *state.totals.results()):
+        fingerprint = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        if written.get(path) != fingerprint or not os.path.exists(path):
+            write(path)
+            written[path] = fingerprint
+            rewritten.append(os.path.basename(path))
+    write_price_report(build_price_history(store.all_lines(), window=price_window), output_dir)
+    state.report.write(output_dir)
+    state.dedup.write(output_dir)
+    return rewritten
+
+
+def run_watch(args):
+    from receipt_watch import make_watcher
+
+    directory_path = 'receipts'
+    output_dir = args.output_dir or f'output_{datetime.now().strftime("%Y-%m-%d")}'
+    os.makedirs(output_dir, exist_ok=True)
+    price_window = max(args.price_window, 1)
+    written = {}
+
+    def rebuild(store):
+        state = WatchState()
+        for file_path in receipt_files(directory_path):
+            state.seen[file_path] = file_signature(file_path)
+        process_receipts(directory_path, state.report, state.dedup, store, state.totals)
+        return state
+
+    watcher = make_watcher(directory_path, args.poll_interval, args.poll)
+    with ReceiptStore(args.db) as store:
+        state = rebuild(store)
+        update_reports(output_dir, state, store, written, price_window)
+        logger.info("Watching %s with %s; reports in %s (Ctrl+C to stop)", directory_path, type(watcher).__name__, output_dir)
+        try:
+            while True:
+                names = watcher.wait(3600)
+                if not names and not watcher.overflowed:
+                    continue
+                # Let a burst of exports finish before updating
+                while True:
+                    more = watcher.wait(args.settle)
+                    if not more:
+                        break
+                    names |= more
+
+                started = time.perf_counter()
+                new_files, needs_rebuild = [], watcher.overflowed
+                watcher.overflowed = False
+                for name in sorted(names):
+                    if not name.endswith('.csv'):
+                        continue
+                    file_path = os.path.join(directory_path, name)
+                    signature = file_signature(file_path)
+                    if file_path not in state.seen:
+                        if signature is not None:
+                            new_files.append(file_path)
+                    elif signature != state.seen[file_path]:
+                        # A counted receipt changed or went away; its old contribution can't be subtracted
+                        needs_rebuild = True
+
+                if needs_rebuild:
+                    logger.info("Receipts changed or were removed; recomputing from scratch")
+                    state = rebuild(store)
+                elif new_files:
+                    added = 0
+                    for file_path in new_files:
+                        state.seen[file_path] = file_signature(file_path)
+                        if ingest_file(file_path, state.totals, state.report, state.dedup, store):
+                            logger.debug("Added %s", file_path)
+                            added += 1
+                    logger.info("Added %d of %d new receipts", added, len(new_files))
+                else:
+                    continue
+                rewritten = update_reports(output_dir, state, store, written, price_window)
+                logger.info("Updated %s in %.2fs", ', '.join(rewritten) or 'no summaries', time.perf_counter() - started)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+    return 0
+
+
+def run_query(args):
+    for value in (args.since, args.until):
+        if value:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                logger.error("Dates must be YYYY-MM-DD, got %r", value)
+                return 2
+    if not os.path.exists(args.db):
+        logger.error("No query store at %s; run `python main.py` first", args.db)
+        return 2
+
+    with ReceiptStore(args.db) as store:
+        rows = store.query(args.text, upc=args.upc, since=args.since, until=args.until, limit=args.limit)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(['Date', 'Invoice', 'UPC', 'Description', 'UnitQty', 'CaseQty', 'Price'])
+    for row in rows:
+        writer.writerow([row['date'], row['invoice'], row['upc'], row['description'], row['unit_qty'], row['case_qty'], f"{row['price']:.2f}"])
+    logger.info("%d lines, total $%.2f", len(rows), sum(row['price'] for row in rows))
+    return 0
+
+
+def main():
+    args = parse_args()
+    setup_logging(args.log_level, args.log_file)
+    debug_sample.every = max(args.debug_sample, 1)
+    if args.command == 'query':
+        return run_query(args)
+    if args.command == 'watch':
+        return run_watch(args)
+    return run_report(args)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -17,6 +17,7 @@ final class PIA_Candidates_MU {
     const OPTION_NAME = 'pia_candidates_options';
     const SETTINGS_SLUG = 'pia-candidates-settings';
     const DEFAULT_FEC_CYCLE = 2024;
+    const FEC_ENDPOINT = 'https://api.open.fec.gov/v1/candidates/search/';
     const MISSING_TEXT = 'Information pending/not provided';
 
     public function __construct() {
@@ -87,6 +88,7 @@ final class PIA_Candidates_MU {
         ];
 
         register_post_meta(self::POST_TYPE, 'pia_candidate_external_id', $string_meta);
+        register_post_meta(self::POST_TYPE, 'pia_candidate_content_hash', $string_meta);
         register_post_meta(self::POST_TYPE, 'pia_candidate_state', $string_meta);
         register_post_meta(self::POST_TYPE, 'pia_candidate_county', $string_meta);
         register_post_meta(self::POST_TYPE, 'pia_candidate_district', $string_meta);
@@ -698,6 +700,10 @@ final class PIA_Candidates_MU {
             $this->redirect_with_notice('No data found to import. Existing candidates were not changed.');
         }
 
+        // One lookup for every imported candidate instead of a meta query per row.
+        $existing = $this->get_existing_candidate_index();
+        $skipped = 0;
+
         foreach ($data as $candidate) {
             if (!is_array($candidate)) {
                 continue;
@@ -717,7 +723,18 @@ final class PIA_Candidates_MU {
                 continue;
             }
 
-            $post_id = $this->get_post_id_by_external_id($external_id, $name);
+            // Changesets from candidates-data/diff_candidates_json.py carry a content hash;
+            // skip candidates that were already imported with the same content.
+            $content_hash = isset($candidate['content_hash']) ? sanitize_text_field($candidate['content_hash']) : '';
+            if ($external_id && isset($existing[$external_id])) {
+                if ($content_hash !== '' && $content_hash === $existing[$external_id]['content_hash']) {
+                    $skipped++;
+                    continue;
+                }
+                $post_id = $existing[$external_id]['post_id'];
+            } else {
+                $post_id = $this->get_post_id_by_external_id($external_id, $name);
+            }
             $bio = isset($candidate['bio']) ? wp_kses_post($candidate['bio']) : '';
             $summary = isset($candidate['summary']) ? sanitize_text_field($candidate['summary']) : '';
 
@@ -752,9 +769,58 @@ final class PIA_Candidates_MU {
             }
 
             $this->update_candidate_meta($post_id, $candidate, $external_id);
+            if ($content_hash !== '') {
+                update_post_meta($post_id, 'pia_candidate_content_hash', $content_hash);
+            } else {
+                // A full import without hashes may have changed the post; drop the stale hash
+                // so the next changeset doesn't skip it.
+                delete_post_meta($post_id, 'pia_candidate_content_hash');
+            }
+            if ($external_id) {
+                $existing[$external_id] = [
+                    'post_id' => (int) $post_id,
+                    'content_hash' => $content_hash,
+                ];
+            }
+        }
+
+        $message = 'Import completed.';
+        if ($skipped) {
+            $message .= sprintf(' %d unchanged candidates skipped.', $skipped);
+        }
+        $this->redirect_with_notice($message);
+    }
+
+    /**
+     * Map external_id => [post_id, content_hash] for all existing candidates.
+     */
+    private function get_existing_candidate_index(): array {
+        $post_ids = get_posts([
+            'post_type' => self::POST_TYPE,
+            'post_status' => 'any',
+            'fields' => 'ids',
+            'posts_per_page' => -1,
+            'no_found_rows' => true,
+        ]);
+        if (empty($post_ids)) {
+            return [];
+        }
+
+        update_meta_cache('post', $post_ids);
+
+        $index = [];
+        foreach ($post_ids as $post_id) {
+            $external_id = (string) get_post_meta($post_id, 'pia_candidate_external_id', true);
+            if ($external_id === '' || isset($index[$external_id])) {
+                continue;
+            }
+            $index[$external_id] = [
+                'post_id' => (int) $post_id,
+                'content_hash' => (string) get_post_meta($post_id, 'pia_candidate_content_hash', true),
+            ];
         }
 
-        $this->redirect_with_notice('Import completed.');
+        return $index;
     }
 
     private function get_import_data(): array {
@@ -857,6 +923,8 @@ final class PIA_Candidates_MU {
                 // Not a list; skip (could be metadata like {"generated_at": "..."}).
                 continue;
             }
+            // Changeset `deleted` / `deleted_names` lists hold plain strings and are skipped here:
+            // imports never delete candidates.
             foreach ($maybe_list as $candidate) {
                 if (is_array($candidate)) {
                     $flattened[] = $candidate;
@@ -939,6 +1007,8 @@ final class PIA_Candidates_MU {
 
         $cycle = $options['fec_cycle'] ?: self::DEFAULT_FEC_CYCLE;
         $offices = !empty($options['fec_offices']) ? (array) $options['fec_offices'] : ['H', 'S', 'P'];
+        // Filterable so imports can run against candidates-data/fake_fec_server.py.
+        $fec_endpoint = (string) apply_filters('pia_candidates_fec_endpoint', self::FEC_ENDPOINT);
         $data = [];
 
         foreach ($offices as $office) {
@@ -956,7 +1026,7 @@ final class PIA_Candidates_MU {
                         'per_page' => 100,
                         'page' => $page,
                     ],
-                    'https://api.open.fec.gov/v1/candidates/search/'
+                    $fec_endpoint
                 );
                 $response = wp_remote_get($endpoint, ['timeout' => 20]);
                 if (is_wp_error($response)) {
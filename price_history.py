@@ -0,0 +1,176 @@
+"""Per-UPC unit price history with rolling statistics, computed with NumPy over all products at once.
+
+Built from the line items in the query store (see receipt_store.py) after each report run:
+
+- The unit price is the line price divided by UnitQty (weighed items, e.g. $/lb), or by
+  CaseQty when UnitQty is 0.
+- Discount lines are negative amounts with a non-negative quantity, like the
+  `PD BERRY BLACK` `-$10.03` line. They are netted into the purchase line for the same
+  UPC just before them on the same receipt, so the series tracks what was actually paid.
+- Returns (negative quantities) and lines without a quantity are left out.
+- Items without a UPC (itemized exports with no UPC column) are tracked by description
+  instead, so unrelated products don't share one series.
+
+Every statistic is a whole-array operation over observations sorted by (UPC, date), so
+the cost doesn't grow with the number of products:
+
+- rolling mean of the last `window` unit prices
+- percent change from the previous purchase
+- outlier flag: robust z-score against the UPC's median (median absolute deviation)
+"""
+import csv
+import os
+
+import numpy as np
+
+from receipt_io import atomic_open
+
+PRICE_HISTORY_FILE = 'price_history.csv'
+PRICE_SUMMARY_FILE = 'price_summary.csv'
+DEFAULT_WINDOW = 4
+OUTLIER_Z = 3.5
+MIN_OBSERVATIONS_FOR_OUTLIERS = 3
+
+
+def group_starts(keys):
+    """For keys sorted into runs, return the index where each element's run starts."""
+    n = len(keys)
+    is_start = np.ones(n, dtype=bool)
+    is_start[1:] = keys[1:] != keys[:-1]
+    return np.maximum.accumulate(np.where(is_start, np.arange(n), 0)), is_start
+
+
+def net_discounts(receipt_ids, upc_codes, lines, unit_qty, case_qty, prices):
+    """Return (net price per line, mask of purchase lines) with discounts folded into purchases."""
+    quantity = np.where(unit_qty != 0, unit_qty, case_qty)
+    purchase = (prices > 0) & (quantity > 0)
+    discount = (prices < 0) & (unit_qty >= 0) & (case_qty >= 0)
+
+    # Walk each (receipt, UPC) run in line order and point every row at the latest purchase so far.
+    order = np.lexsort((lines, upc_codes, receipt_ids))
+    run_keys = receipt_ids[order] * (upc_codes.max() + 1 if len(upc_codes) else 1) + upc_codes[order]
+    starts, _ = group_starts(run_keys)
+    positions = np.arange(len(order))
+    last_purchase = np.maximum.accumulate(np.where(purchase[order], positions, -1))
+    has_target = discount[order] & (last_purchase >= starts)
+
+    net = prices.astype(float).copy()
+    np.add.at(net, order[last_purchase[has_target]], prices[order[has_target]])
+    return net, purchase, quantity
+
+
+def rolling_mean(values, starts, window):
+    """Mean of the last `window` values within each run (runs given by their start indexes)."""
+    n = len(values)
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    first = np.maximum(np.arange(n) - window + 1, starts)
+    return (cumulative[np.arange(n) + 1] - cumulative[first]) / (np.arange(n) - first + 1)
+
+
+def group_median(values, group_ids, counts):
+    """Median of values per group; group_ids are 0..k-1 and counts their sizes."""
+    order = np.lexsort((values, group_ids))
+    sorted_values = values[order]
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    low = sorted_values[offsets + (counts - 1) // 2]
+    high = sorted_values[offsets + counts // 2]
+    return (low + high) / 2
+
+
+def build_price_history(rows, window=DEFAULT_WINDOW):
+    """rows are (receipt_id, line, date, upc, description, unit_qty, case_qty, price, invoice).
+
+    Returns a dict of equal-length arrays, one entry per purchase, sorted by UPC and date.
+    """
+    if not rows:
+        return None
+    receipt_ids, lines, dates, upcs, descriptions, unit_qty, case_qty, prices, invoices = zip(*rows)
+    receipt_ids = np.asarray(receipt_ids, dtype=np.int64)
+    lines = np.asarray(lines, dtype=np.int64)
+    unit_qty = np.asarray([q or 0.0 for q in unit_qty], dtype=float)
+    case_qty = np.asarray([q or 0.0 for q in case_qty], dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    upcs = np.asarray([(upc or '').strip() for upc in upcs], dtype=object)
+    # UPCs never contain a tab, so description keys can't collide with a real UPC.
+    series_keys = np.asarray([upc or '\t' + (description or '').strip().upper()
+                              for upc, description in zip(upcs, descriptions)])
+    _, upc_codes = np.unique(series_keys, return_inverse=True)
+    dates = np.asarray([d or '' for d in dates])
+
+    net, purchase, quantity = net_discounts(receipt_ids, upc_codes, lines, unit_qty, case_qty, prices)
+    keep = np.flatnonzero(purchase & (dates != '') & (series_keys != '\t'))
+    if not len(keep):
+        return None
+    order = keep[np.lexsort((lines[keep], receipt_ids[keep], dates[keep], upc_codes[keep]))]
+
+    codes = upc_codes[order]
+    unit_price = net[order] / quantity[order]
+    starts, is_start = group_starts(codes)
+
+    previous = np.roll(unit_price, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_change = np.where(is_start | (previous == 0), np.nan, (unit_price - previous) / previous * 100)
+
+    group_ids = np.cumsum(is_start) - 1
+    counts = np.bincount(group_ids)
+    median = group_median(unit_price, group_ids, counts)
+    mad = group_median(np.abs(unit_price - median[group_ids]), group_ids, counts)
+    # A MAD of 0 (identical prices) would flag any change; fall back to 1% of the median.
+    scale = np.maximum(1.4826 * mad, 0.01 * np.abs(median))[group_ids]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_score = np.where(scale > 0, np.abs(unit_price - median[group_ids]) / scale, 0.0)
+    outlier = (z_score > OUTLIER_Z) & (counts[group_ids] >= MIN_OBSERVATIONS_FOR_OUTLIERS)
+
+    descriptions = np.asarray(descriptions, dtype=object)
+    invoices = np.asarray(invoices, dtype=object)
+    return {
+        'upc': upcs[order],
+        'description': descriptions[order],
+        'date': dates[order],
+        'invoice': invoices[order],
+        'quantity': quantity[order],
+        'net_price': net[order],
+        'unit_price': unit_price,
+        'rolling_mean': rolling_mean(unit_price, starts, window),
+        'pct_change': pct_change,
+        'z_score': z_score,
+        'outlier': outlier,
+        'group_start': is_start,
+    }
+
+
+def write_price_report(history, output_dir):
+    """Write price_history.csv (one row per purchase) and price_summary.csv (one row per UPC)."""
+    with atomic_open(os.path.join(output_dir, PRICE_HISTORY_FILE)) as file:
+        writer = csv.writer(file)
+        writer.writerow(['UPC', 'Description', 'Date', 'Invoice', 'Quantity', 'Net Price', 'Unit Price',
+                         'Rolling Avg Unit Price', 'Pct Change', 'Outlier'])
+        if history is not None:
+            writer.writerows(zip(
+                history['upc'], history['description'], history['date'], history['invoice'],
+                np.round(history['quantity'], 3), np.round(history['net_price'], 2),
+                np.round(history['unit_price'], 4), np.round(history['rolling_mean'], 4),
+                ['' if np.isnan(p) else f'{p:.2f}'.replace('-0.00', '0.00') for p in history['pct_change']],
+                history['outlier'].astype(int),
+            ))
+
+    with atomic_open(os.path.join(output_dir, PRICE_SUMMARY_FILE)) as file:
+        writer = csv.writer(file)
+        writer.writerow(['UPC', 'Description', 'Purchases', 'First Date', 'Last Date', 'First Unit Price',
+                         'Last Unit Price', 'Change Pct', 'Min Unit Price', 'Max Unit Price', 'Outliers'])
+        if history is None:
+            return
+        starts = np.flatnonzero(history['group_start'])
+        ends = np.concatenate((starts[1:], [len(history['upc'])])) - 1
+        unit_price = history['unit_price']
+        first, last = unit_price[starts], unit_price[ends]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.where(first != 0, (last - first) / first * 100, np.nan)
+        writer.writerows(zip(
+            history['upc'][starts], history['description'][ends], ends - starts + 1,
+            history['date'][starts], history['date'][ends],
+            np.round(first, 4), np.round(last, 4), np.round(change, 2),
+            np.round(np.minimum.reduceat(unit_price, starts), 4),
+            np.round(np.maximum.reduceat(unit_price, starts), 4),
+            np.add.reduceat(history['outlier'].astype(int), starts),
+        ))
@@ -0,0 +1,328 @@
+"""Headless charts for the receipt reports.
+
+Every chart is drawn from the in-memory aggregates (totals_by_date, all_items,
+monthly_averages, as returned by RunningTotals.results()) with matplotlib's Agg backend,
+so nothing opens a window or blocks a batch job. `main.py report` renders all of them
+into output_<date>/visualizations/ in one pass after aggregation. The vis_*.py scripts
+re-plot a subset from a report's typed export instead of re-reading the summary CSVs:
+
+    python main.py report --export csv.gz
+    python vis_items.py output_2024-06-10
+"""
+import argparse
+import os
+
+import numpy as np
+
+from receipt_export import load_report
+from receipt_io import atomic_open
+from receipt_log import logger, setup_logging
+
+VISUALIZATION_DIR = 'visualizations'
+TOP_ITEMS = 10
+# Description fragments of totals and tender rows, which aren't products
+SUMMARY_WORDS = ('subtotal', 'sub-total', 'tax', 'total', 'balance', 'iou', 'payment', 'debit', 'mc/visa')
+# Narrowest bar worth drawing; longer histories are summed into weeks or months to keep bars at least this wide
+MIN_BAR_PIXELS = 4
+# Days in each resampling period, for bar widths
+PERIOD_DAYS = {'day': 1, 'week': 7, 'month': 28}
+
+
+def pyplot():
+    # Imported on first use so `main.py query` doesn't pay for matplotlib
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def save_figure(plt, path):
+    with atomic_open(path, 'wb') as file:
+        plt.savefig(file, format='png')
+    plt.close()
+
+
+def product_items(items):
+    """all_items without totals/tender rows and items that netted out to zero."""
+    return {item: data for item, data in items.items()
+            if data['total'] != 0 and all(word not in item.lower() for word in SUMMARY_WORDS)}
+
+
+def top_bought_items(items, count=TOP_ITEMS):
+    exclude_items = {"subtotal", "tax", "total", "balance", "iou", "payment", "debit"}
+    filtered_items = {k: v for k, v in items.items() if all(x not in k.lower() for x in exclude_items)}
+    return sorted(filtered_items.items(), key=lambda x: x[1]['count'], reverse=True)[:count]
+
+
+def top_items_by_total(items, count=TOP_ITEMS):
+    return sorted(product_items(items).items(), key=lambda x: x[1]['total'], reverse=True)[:count]
+
+
+def time_series(values_by_date, unit='D'):
+    """Sorted (datetime64 dates, float values) from {'YYYY-MM-DD' or 'YYYY-MM': value}."""
+    dates, values = [], []
+    for date, value in values_by_date.items():
+        try:
+            dates.append(np.datetime64(date, unit))
+        except ValueError:
+            logger.warning("Not charting %r: not a date", date)
+            continue
+        values.append(value)
+    dates = np.array(dates, dtype=f'datetime64[{unit}]')
+    values = np.array(values, dtype=np.float64)
+    order = np.argsort(dates, kind='stable')
+    return dates[order], values[order]
+
+
+def week_start(dates):
+    days = dates.astype(np.int64)
+    # Day 0 (1970-01-01) was a Thursday; weeks start on Monday
+    return (days - (days + 3) % 7).astype('datetime64[D]')
+
+
+def resample(dates, values, max_bins):
+    """Sum daily values into days, weeks or months: the finest period with at most max_bins bins over the span."""
+    if len(dates) == 0:
+        return dates, values, 'day'
+    span_days = int((dates[-1] - dates[0]).astype(np.int64)) + 1
+    if span_days <= max_bins:
+        return dates, values, 'day'
+    if span_days / 7 <= max_bins:
+        period, keys = 'week', week_start(dates)
+    else:
+        period, keys = 'month', dates.astype('datetime64[M]').astype('datetime64[D]')
+    bins, inverse = np.unique(keys, return_inverse=True)
+    return bins, np.bincount(inverse, weights=values, minlength=len(bins)), period
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the line's shape.
+
+    The first and last points are kept; the rest are split into threshold - 2 buckets, and
+    from each the point forming the largest triangle with the previously kept point and the
+    next bucket's average is kept.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    keep = np.empty(threshold, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket == threshold - 3:
+            next_x, next_y = x[n - 1], y[n - 1]
+        else:
+            next_x, next_y = x[end:edges[bucket + 2]].mean(), y[end:edges[bucket + 2]].mean()
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep[bucket + 1] = previous
+    return keep
+
+
+def axes_pixel_width(fig, ax):
+    fig.tight_layout()
+    return max(int(ax.get_window_extent().width), 1)
+
+
+def date_axis(ax):
+    import matplotlib.dates as mdates
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+
+def plot_totals_by_date(path, totals_by_date):
+    plt = pyplot()
+    dates, totals = time_series(totals_by_date)
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    date_axis(ax)
+    # At most one bar per MIN_BAR_PIXELS, whatever the number of receipt days
+    dates, totals, period = resample(dates, totals, axes_pixel_width(fig, ax) // MIN_BAR_PIXELS)
+    ax.bar(dates, totals, width=0.8 * PERIOD_DAYS[period], align='center' if period == 'day' else 'edge')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Total Amount')
+    ax.set_title('Total Amount by Date' if period == 'day' else f'Total Amount by {period.capitalize()}')
+    fig.tight_layout()
+    save_figure(plt, path)
+
+
+def plot_sales_over_time(path, totals_by_date):
+    plt = pyplot()
+    dates, totals = time_series(totals_by_date)
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    date_axis(ax)
+    # No more vertices than the line has pixels to draw them in
+    keep = lttb(dates.astype(np.float64), totals, axes_pixel_width(fig, ax))
+    ax.plot(dates[keep], totals[keep], marker='o' if len(keep) <= 200 else None)
+    ax.set_title('Total Sales Over Time')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Total Sales ($)')
+    ax.grid(True)
+    fig.tight_layout()
+    save_figure(plt, path)
+
+
+def plot_monthly_averages(path, monthly_averages):
+    plt = pyplot()
+    months, averages = time_series(monthly_averages, 'M')
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    date_axis(ax)
+    ax.bar(months.astype('datetime64[D]'), averages, width=0.8 * PERIOD_DAYS['month'], align='edge')
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Average Total')
+    ax.set_title('Average Total by Month')
+    fig.tight_layout()
+    save_figure(plt, path)
+
+
+def plot_items_totals(path, items):
+    plt = pyplot()
+    item_names = list(items.keys())
+    item_totals = [data['total'] for data in items.values()]
+
+    plt.figure(figsize=(10, 6))
+    plt.barh(item_names, item_totals)
+    plt.xlabel('Total Amount')
+    plt.ylabel('Item')
+    plt.title('Total Amount by Item')
+    plt.tight_layout()
+    save_figure(plt, path)
+
+
+def plot_top_items(path, sorted_items):
+    plt = pyplot()
+    top_items = [item[0] for item in sorted_items]
+    top_counts = [item[1]['count'] for item in sorted_items]
+    top_totals = [item[1]['total'] for item in sorted_items]
+
+    fig, ax1 = plt.subplots(figsize=(10, 6))
+
+    color = 'tab:blue'
+    ax1.set_xlabel('Item')
+    ax1.set_ylabel('Count', color=color)
+    ax1.bar(top_items, top_counts, color=color, alpha=0.6, label='Count')
+    ax1.tick_params(axis='y', labelcolor=color)
+    plt.xticks(rotation=45)
+
+    ax2 = ax1.twinx()  # instantiate a second axes that shares the same x-axis
+    color = 'tab:red'
+    ax2.set_ylabel('Total Cost', color=color)  # we already handled the x-label with ax1
+    ax2.plot(top_items, top_totals, color=color, marker='o', linestyle='-', linewidth=2, label='Total Cost')
+    ax2.tick_params(axis='y', labelcolor=color)
+
+    fig.tight_layout()  # otherwise the right y-label is slightly clipped
+    plt.title('Top 10 Most Bought Items')
+    plt.legend(loc='upper left')
+    save_figure(plt, path)
+
+
+def plot_top_items_by_total(path, sorted_items):
+    plt = pyplot()
+    # Largest at the top
+    names = [item for item, _data in reversed(sorted_items)]
+    totals = [data['total'] for _item, data in reversed(sorted_items)]
+
+    plt.figure(figsize=(12, 8))
+    plt.barh(names, totals)
+    plt.title('Top 10 Most Expensive Items')
+    plt.xlabel('Total Cost ($)')
+    plt.ylabel('Item')
+    plt.tight_layout()
+    save_figure(plt, path)
+
+
+def plot_item_counts_distribution(path, products):
+    plt = pyplot()
+    plt.figure(figsize=(12, 8))
+    plt.hist([data['count'] for data in products.values()], bins=30)
+    plt.title('Distribution of Item Counts')
+    plt.xlabel('Item Count')
+    plt.ylabel('Frequency')
+    plt.tight_layout()
+    save_figure(plt, path)
+
+
+def plot_total_vs_count(path, products):
+    plt = pyplot()
+    plt.figure(figsize=(12, 8))
+    plt.scatter([data['count'] for data in products.values()], [data['total'] for data in products.values()], alpha=0.6)
+    plt.title('Total Cost vs. Item Count')
+    plt.xlabel('Item Count')
+    plt.ylabel('Total Cost ($)')
+    plt.tight_layout()
+    save_figure(plt, path)
+
+
+def chart_outputs(output_dir, totals_by_date, all_items, monthly_averages, names=None):
+    """[(path, fingerprint, write)] for each chart, optionally only those in names.
+
+    A fingerprint only changes when the chart would, so watch mode can skip redrawing it.
+    """
+    visualization_dir = os.path.join(output_dir, VISUALIZATION_DIR)
+    os.makedirs(visualization_dir, exist_ok=True)
+    top_by_count = top_bought_items(all_items)
+    top_by_total = top_items_by_total(all_items)
+    products = product_items(all_items)
+    product_key = sorted((item, data['total'], data['count']) for item, data in products.items())
+    charts = [
+        ('totals_by_date', list(totals_by_date.items()),
+         lambda path: plot_totals_by_date(path, totals_by_date)),
+        ('sales_over_time', sorted(totals_by_date.items()),
+         lambda path: plot_sales_over_time(path, totals_by_date)),
+        ('monthly_averages', list(monthly_averages.items()),
+         lambda path: plot_monthly_averages(path, monthly_averages)),
+        ('items_totals', [(item, data['total']) for item, data in all_items.items()],
+         lambda path: plot_items_totals(path, all_items)),
+        ('top_10_most_bought_items', [(item, data['count'], data['total']) for item, data in top_by_count],
+         lambda path: plot_top_items(path, top_by_count)),
+        ('top_items', [(item, data['total']) for item, data in top_by_total],
+         lambda path: plot_top_items_by_total(path, top_by_total)),
+        ('item_counts_distribution', sorted(data['count'] for data in products.values()),
+         lambda path: plot_item_counts_distribution(path, products)),
+        ('total_vs_count_scatter', product_key,
+         lambda path: plot_total_vs_count(path, products)),
+    ]
+    return [(os.path.join(visualization_dir, f'{name}.png'), key, write)
+            for name, key, write in charts if names is None or name in names]
+
+
+def render_charts(output_dir, totals_by_date, all_items, monthly_averages, names=None):
+    """Draw every chart (or those in names) into output_dir/visualizations/; returns the paths."""
+    paths = []
+    for path, _key, write in chart_outputs(output_dir, totals_by_date, all_items, monthly_averages, names):
+        write(path)
+        paths.append(path)
+    return paths
+
+
+def latest_output_dir():
+    dirs = sorted(name for name in os.listdir('.') if name.startswith('output_') and os.path.isdir(name))
+    return dirs[-1] if dirs else None
+
+
+def run_from_export(names, description, argv=None):
+    """Command line for the vis_*.py scripts: draw the named charts from a report's export/."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('output_dir', nargs='?', help='Report directory containing export/ (default: the newest output_*)')
+    parser.add_argument('--log-level', default='INFO', help='DEBUG, INFO, WARNING or ERROR (default: INFO)')
+    args = parser.parse_args(argv)
+    setup_logging(args.log_level)
+
+    output_dir = args.output_dir or latest_output_dir()
+    if output_dir is None:
+        logger.error("No output_* directory here; run `python main.py report --export csv.gz` first")
+        return 1
+    try:
+        totals_by_date, all_items, monthly_averages = load_report(os.path.join(output_dir, 'export'))
+    except (OSError, ValueError) as e:
+        logger.error("%s; run `python main.py report --export csv.gz` first", e)
+        return 1
+    paths = render_charts(output_dir, totals_by_date, all_items, monthly_averages, names)
+    logger.info("Wrote %s", ', '.join(paths))
+    return 0
@@ -0,0 +1,99 @@
+"""Skip receipts that were exported more than once under different file names.
+
+A receipt is identified by (invoice number, terminal timestamp, content hash). The
+invoice and terminal lines sit in the first few lines of every export, so the index
+only reads those for a new file; the file is hashed only when another receipt already
+has the same invoice and terminal timestamp (and the earlier one is hashed lazily at
+that point too). Files without an invoice line fall back to the content hash alone.
+
+    index = DedupIndex()
+    original = index.check(file_path)
+    if original:
+        ...  # skip, already counted as `original`
+    index.write(output_dir)  # duplicates.csv
+"""
+import csv
+import hashlib
+import os
+from itertools import islice
+
+from receipt_io import atomic_open
+from receipt_log import logger
+
+HEADER_SCAN_LINES = 8
+DUPLICATES_FILE = 'duplicates.csv'
+
+
+def read_receipt_header(file_path, max_lines=HEADER_SCAN_LINES):
+    """Return (invoice number, terminal timestamp) from the header lines, or (None, None)."""
+    try:
+        with open(file_path, mode='r', newline='') as file:
+            for row in islice(csv.reader(file), max_lines):
+                if len(row) >= 2 and row[0].startswith('Invoice'):
+                    return row[0].replace('Invoice', '', 1).strip(), ' '.join(row[1].split())
+    except (OSError, UnicodeDecodeError, csv.Error):
+        pass
+    return None, None
+
+
+def file_hash(file_path, chunk_size=1 << 16):
+    digest = hashlib.sha256()
+    with open(file_path, mode='rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DedupIndex:
+    def __init__(self):
+        # (invoice, terminal timestamp) -> [[content hash or None until needed, path], ...]
+        self.by_header = {}
+        self.by_hash = {}
+        self.duplicates = []
+
+    def check(self, file_path):
+        """Register file_path; return the path it duplicates, or None if it is new."""
+        invoice, timestamp = read_receipt_header(file_path)
+        try:
+            if invoice is None:
+                return self._check_hash_only(file_path, file_hash(file_path))
+
+            entries = self.by_header.get((invoice, timestamp))
+            if entries is None:
+                self.by_header[(invoice, timestamp)] = [[None, file_path]]
+                return None
+
+            content_hash = file_hash(file_path)
+            for entry in entries:
+                if entry[0] is None:
+                    entry[0] = file_hash(entry[1])
+                if entry[0] == content_hash:
+                    self._record(file_path, entry[1], invoice, timestamp)
+                    return entry[1]
+        except OSError as e:
+            # Unreadable files are left to the parser, which quarantines them.
+            logger.debug('Could not hash %s for de-duplication: %s', file_path, e)
+            return None
+
+        logger.warning('Invoice %s (%s) appears in %s with different contents than %s; counting both',
+                       invoice, timestamp, file_path, entries[0][1])
+        entries.append([content_hash, file_path])
+        return None
+
+    def _check_hash_only(self, file_path, content_hash):
+        original = self.by_hash.get(content_hash)
+        if original is None:
+            self.by_hash[content_hash] = file_path
+            return None
+        self._record(file_path, original, '', '')
+        return original
+
+    def _record(self, file_path, original, invoice, timestamp):
+        self.duplicates.append((file_path, original, invoice, timestamp))
+        logger.info('Skipping %s: duplicate of %s (invoice %s)', file_path, original, invoice or '?')
+
+    def write(self, output_dir):
+        with atomic_open(os.path.join(output_dir, DUPLICATES_FILE)) as file:
+            writer = csv.writer(file)
+            writer.writerow(['File', 'Duplicate Of', 'Invoice', 'Terminal'])
+            writer.writerows(self.duplicates)
@@ -0,0 +1,239 @@
+"""Typed exports of the receipt report tables: Parquet, gzip-compressed CSV and XLSX.
+
+The summary CSVs in output_<date>/ are for people: money is written as "$1234.56"
+strings, which downstream code then has to strip back off. The tables here hold plain
+numbers (money in dollars as floats, counts as ints, dates as YYYY-MM-DD), and display
+formatting is applied only where a format has a place for it: the XLSX currency number
+format.
+
+Rows stream from the in-memory aggregates straight into each writer in batches of
+BATCH_ROWS, so nothing builds a second full copy of a large table:
+
+- Parquet goes through pyarrow's ParquetWriter, one record batch at a time.
+- csv.gz goes through a buffered gzip stream.
+- XLSX goes through XlsxWriter in constant_memory mode, which flushes each row as it is
+  written.
+
+    python main.py report --export parquet,csv.gz,xlsx
+
+load_report(export_dir) reads the tables back into the aggregate structures the charts
+take, so the vis_*.py scripts can re-plot a report without reparsing the receipts.
+"""
+import csv
+import gzip
+import importlib.util
+import io
+import os
+from itertools import islice
+
+from receipt_io import atomic_open
+from receipt_log import logger
+
+BATCH_ROWS = 10000
+EXPORT_FORMATS = ('parquet', 'csv.gz', 'xlsx')
+XLSX_FILE = 'receipts_report.xlsx'
+
+# Column types: 'str', 'int', 'money' (float dollars), 'date' (YYYY-MM-DD string).
+TABLE_COLUMNS = {
+    'totals_by_date': [('date', 'date'), ('total', 'money')],
+    'items': [('item', 'str'), ('total_cost', 'money'), ('frequency', 'int'), ('min_price', 'money'),
+              ('max_price', 'money'), ('average_price', 'money')],
+    'processed': [('date', 'date'), ('item', 'str'), ('total_cost', 'money'), ('frequency', 'int'),
+                  ('min_price', 'money'), ('max_price', 'money')],
+    'monthly_averages': [('month', 'str'), ('average_total', 'money')],
+    'most_bought_items': [('item', 'str'), ('count', 'int'), ('total_cost', 'money')],
+}
+
+
+def totals_rows(totals_by_date):
+    return ((date, total) for date, total in sorted(totals_by_date.items()))
+
+
+def item_rows(all_items):
+    for item, data in sorted(all_items.items(), key=lambda x: x[1]['total'], reverse=True):
+        if 'min' not in data or 'max' not in data:
+            logger.warning("Missing 'min' or 'max' for item %s: %s", item, data)
+            continue
+        average = data.get('average', data['total'] / data['count'] if data['count'] > 0 else 0.0)
+        yield item, data['total'], data['count'], data['min'], data['max'], average
+
+
+def processed_rows(processed_data):
+    for date, item, total_cents, count, min_cents, max_cents in processed_data:
+        yield date, item, total_cents / 100, count, min_cents / 100, max_cents / 100
+
+
+def monthly_rows(monthly_averages):
+    return iter(sorted(monthly_averages.items()))
+
+
+def most_bought_rows(all_items):
+    for item, data in sorted(all_items.items(), key=lambda x: x[1]['count'], reverse=True):
+        yield item, data['count'], data['total']
+
+
+def report_tables(processed_data, grand_total, totals_by_date, all_items, monthly_averages):
+    """{table name: row iterator} with typed values, in the same order as the summary CSVs."""
+    return {
+        'totals_by_date': totals_rows(totals_by_date),
+        'items': item_rows(all_items),
+        'processed': processed_rows(processed_data),
+        'monthly_averages': monthly_rows(monthly_averages),
+        'most_bought_items': most_bought_rows(all_items),
+    }
+
+
+def display_rows(table, rows):
+    """Format typed rows for the human-readable summary CSVs (money as $1234.56)."""
+    money_columns = [column_type == 'money' for _name, column_type in TABLE_COLUMNS[table]]
+    for row in rows:
+        yield [f"${value:.2f}" if is_money else value for value, is_money in zip(row, money_columns)]
+
+
+def batches(rows, size=BATCH_ROWS):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_csv_gz(path, columns, rows):
+    with atomic_open(path, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0) as compressed:
+            # The text layer's own buffer batches the many small csv writes before compressing
+            with io.TextIOWrapper(compressed, encoding='utf-8', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow([name for name, _type in columns])
+                for batch in batches(rows):
+                    writer.writerows(batch)
+
+
+def arrow_schema(columns):
+    import pyarrow as pa
+    types = {'str': pa.string(), 'int': pa.int64(), 'money': pa.float64(), 'date': pa.string()}
+    return pa.schema([(name, types[column_type]) for name, column_type in columns])
+
+
+def write_parquet(path, columns, rows):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError('Parquet export needs pyarrow (pip install pyarrow)')
+    schema = arrow_schema(columns)
+    with atomic_open(path, 'wb') as file:
+        writer = pq.ParquetWriter(file, schema, compression='snappy')
+        try:
+            wrote = False
+            for batch in batches(rows):
+                arrays = [pa.array(list(values), type=field.type) for values, field in zip(zip(*batch), schema)]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                wrote = True
+            if not wrote:
+                writer.write_table(schema.empty_table())
+        finally:
+            writer.close()
+
+
+def write_xlsx(path, tables):
+    try:
+        import xlsxwriter
+    except ImportError:
+        raise RuntimeError('XLSX export needs XlsxWriter (pip install XlsxWriter)')
+    with atomic_open(path, 'wb') as file:
+        workbook = xlsxwriter.Workbook(file, {'constant_memory': True})
+        # Presentation lives here only: the cells hold numbers, the format shows them as currency.
+        money = workbook.add_format({'num_format': '$#,##0.00'})
+        header = workbook.add_format({'bold': True})
+        for name, (columns, rows) in tables.items():
+            sheet = workbook.add_worksheet(name[:31])
+            for col, (column, column_type) in enumerate(columns):
+                sheet.write_string(0, col, column, header)
+                sheet.set_column(col, col, 40 if column == 'item' else 14, money if column_type == 'money' else None)
+            row_number = 1
+            for batch in batches(rows):
+                for row in batch:
+                    for col, (value, (_column, column_type)) in enumerate(zip(row, columns)):
+                        if column_type in ('money', 'int'):
+                            sheet.write_number(row_number, col, value, money if column_type == 'money' else None)
+                        else:
+                            sheet.write_string(row_number, col, value)
+                    row_number += 1
+        workbook.close()
+
+
+def export_report(output_dir, formats, results):
+    """Write the report tables in each requested format under output_dir/export/; returns the paths."""
+    export_dir = os.path.join(output_dir, 'export')
+    os.makedirs(export_dir, exist_ok=True)
+    written = []
+    for export_format in formats:
+        if export_format == 'xlsx':
+            tables = {name: (TABLE_COLUMNS[name], rows) for name, rows in report_tables(*results).items()}
+            path = os.path.join(export_dir, XLSX_FILE)
+            write_xlsx(path, tables)
+            written.append(path)
+            continue
+        for name, rows in report_tables(*results).items():
+            path = os.path.join(export_dir, f'{name}.{export_format}')
+            if export_format == 'parquet':
+                write_parquet(path, TABLE_COLUMNS[name], rows)
+            elif export_format == 'csv.gz':
+                write_csv_gz(path, TABLE_COLUMNS[name], rows)
+            else:
+                raise ValueError(f'Unknown export format {export_format!r}; choose from {", ".join(EXPORT_FORMATS)}')
+            written.append(path)
+    return written
+
+
+def parse_formats(value):
+    formats = [item.strip().lower() for item in (value or '').split(',') if item.strip()]
+    unknown = [item for item in formats if item not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f'Unknown export format(s) {", ".join(unknown)}; choose from {", ".join(EXPORT_FORMATS)}')
+    return formats
+
+
+def read_csv_gz(path, columns):
+    converters = {'str': str, 'date': str, 'int': int, 'money': float}
+    row_types = [converters[column_type] for _name, column_type in columns]
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header != [name for name, _type in columns]:
+            raise ValueError(f'{path}: unexpected columns {header}')
+        for row in reader:
+            yield tuple(convert(value) for convert, value in zip(row_types, row))
+
+
+def read_parquet(path, columns):
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=BATCH_ROWS, columns=[name for name, _type in columns]):
+        yield from zip(*(column.to_pylist() for column in batch.columns))
+
+
+def read_table(export_dir, table):
+    """Typed rows of one exported table, from Parquet when pyarrow is available, else csv.gz."""
+    columns = TABLE_COLUMNS[table]
+    parquet_path = os.path.join(export_dir, f'{table}.parquet')
+    if os.path.exists(parquet_path):
+        if importlib.util.find_spec('pyarrow') is not None:
+            return read_parquet(parquet_path, columns)
+        logger.debug('pyarrow not installed; looking for %s.csv.gz instead', table)
+    csv_path = os.path.join(export_dir, f'{table}.csv.gz')
+    if os.path.exists(csv_path):
+        return read_csv_gz(csv_path, columns)
+    raise FileNotFoundError(f'No {table}.parquet or {table}.csv.gz in {export_dir}')
+
+
+def load_report(export_dir):
+    """(totals_by_date, all_items, monthly_averages) from an export, shaped like RunningTotals.results()."""
+    totals_by_date = dict(read_table(export_dir, 'totals_by_date'))
+    all_items = {}
+    for item, total, count, min_price, max_price, average in read_table(export_dir, 'items'):
+        all_items[item] = {'total': total, 'count': count, 'min': min_price, 'max': max_price, 'average': average}
+    monthly_averages = dict(read_table(export_dir, 'monthly_averages'))
+    return totals_by_date, all_items, monthly_averages
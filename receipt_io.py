@@ -0,0 +1,27 @@
+"""Atomic replacement of report files.
+
+Every report output is written to `<path>.tmp` and renamed over the old file, so a
+reader (or a crash mid-write, or the watch mode rewriting a report while someone has
+it open) never sees a half-written CSV or chart.
+"""
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_open(path, mode='w', newline=''):
+    tmp_path = f'{path}.tmp'
+    if 'b' in mode:
+        file = open(tmp_path, mode)
+    else:
+        file = open(tmp_path, mode, newline=newline)
+    try:
+        with file:
+            yield file
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
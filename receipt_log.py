@@ -0,0 +1,130 @@
+"""Logging, quarantine and parse-timing helpers for the receipt scripts.
+
+Parse problems are recorded on a ParseReport instead of being printed inline:
+
+    report = ParseReport()
+    with report.timing(file_path) as stats:
+        ...
+        report.quarantine(file_path, reader.line_num, 'invalid price', row)
+
+At the end of a run `report.write(output_dir)` writes `quarantine.csv` (file, line,
+reason, raw row) and `parse_summary.csv` (per-file seconds, lines, items, errors),
+and `report.log_summary()` logs a one-paragraph summary.
+"""
+import csv
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from receipt_io import atomic_open
+
+logger = logging.getLogger('receipts')
+
+QUARANTINE_FILE = 'quarantine.csv'
+PARSE_SUMMARY_FILE = 'parse_summary.csv'
+SLOWEST_FILES_LOGGED = 5
+
+
+def setup_logging(level='INFO', log_file=None):
+    """Configure the 'receipts' logger; level is a name like 'DEBUG' or 'WARNING'."""
+    numeric_level = getattr(logging, str(level).upper(), None)
+    if not isinstance(numeric_level, int):
+        raise ValueError(f'Unknown log level: {level}')
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
+    logger.handlers = []
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.setLevel(numeric_level)
+    logger.propagate = False
+    return logger
+
+
+class DebugSampler:
+    """Lets through the first of every `every` calls, so per-file debug dumps stay readable."""
+
+    def __init__(self, every=1):
+        self.every = max(int(every), 1)
+        self.calls = 0
+
+    def __call__(self):
+        # Skip the bookkeeping entirely unless debug output is on.
+        if not logger.isEnabledFor(logging.DEBUG):
+            return False
+        self.calls += 1
+        return (self.calls - 1) % self.every == 0
+
+
+class FileStats:
+    __slots__ = ('file', 'seconds', 'lines', 'items', 'errors')
+
+    def __init__(self, file):
+        self.file = file
+        self.seconds = 0.0
+        self.lines = 0
+        self.items = 0
+        self.errors = 0
+
+
+class ParseReport:
+    def __init__(self):
+        self.quarantined = []
+        self.files = {}
+
+    def file_stats(self, file_path):
+        stats = self.files.get(file_path)
+        if stats is None:
+            stats = self.files[file_path] = FileStats(file_path)
+        return stats
+
+    @contextmanager
+    def timing(self, file_path):
+        stats = self.file_stats(file_path)
+        started = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds += time.perf_counter() - started
+
+    def quarantine(self, file_path, line, reason, row=None):
+        """Record a malformed row (or a whole file when line is None)."""
+        self.file_stats(file_path).errors += 1
+        raw = ','.join(row) if isinstance(row, (list, tuple)) else (row or '')
+        self.quarantined.append((file_path, '' if line is None else line, reason, raw))
+        logger.debug('Quarantined %s:%s: %s', file_path, line if line is not None else '-', reason)
+
+    @property
+    def error_count(self):
+        return len(self.quarantined)
+
+    def write(self, output_dir):
+        with atomic_open(os.path.join(output_dir, QUARANTINE_FILE)) as file:
+            writer = csv.writer(file)
+            writer.writerow(['File', 'Line', 'Reason', 'Row'])
+            writer.writerows(self.quarantined)
+
+        with atomic_open(os.path.join(output_dir, PARSE_SUMMARY_FILE)) as file:
+            writer = csv.writer(file)
+            writer.writerow(['File', 'Seconds', 'Lines', 'Items', 'Errors'])
+            for stats in sorted(self.files.values(), key=lambda s: s.file):
+                writer.writerow([stats.file, f'{stats.seconds:.6f}', stats.lines, stats.items, stats.errors])
+
+    def log_summary(self):
+        files = list(self.files.values())
+        total_seconds = sum(stats.seconds for stats in files)
+        files_with_errors = sum(1 for stats in files if stats.errors)
+        logger.info(
+            'Parsed %d files (%d lines, %d items) in %.3fs; %d quarantined rows/files in %d files',
+            len(files),
+            sum(stats.lines for stats in files),
+            sum(stats.items for stats in files),
+            total_seconds,
+            self.error_count,
+            files_with_errors,
+        )
+        for stats in sorted(files, key=lambda s: s.seconds, reverse=True)[:SLOWEST_FILES_LOGGED]:
+            logger.debug('Slow file %s: %.3fs, %d lines, %d errors', stats.file, stats.seconds, stats.lines, stats.errors)
@@ -0,0 +1,220 @@
+"""Compact in-memory records for parsed receipts and their aggregates.
+
+Money is kept as integer cents from parsing through aggregation and only turned into
+dollars for output, so sums don't drift. Descriptions are interned, so the same
+product name on thousands of lines is one string. Per-receipt item aggregates, which
+used to be one dict of dicts per file kept alive in `processed_data`, go into
+ProcessedData: parallel `array` columns indexed by date and description ids.
+"""
+import sys
+from array import array
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from itertools import count
+
+CENT = Decimal(1)
+
+
+def to_cents(value):
+    """'$1,628.82' / '-$10.03' / '329.57' -> integer cents; raises ValueError.
+
+    Read as a decimal, not a float, so a half cent always rounds away from zero
+    ('1.005' -> 101), the same as average_cents().
+    """
+    text = value.replace('$', '').replace(',', '').strip()
+    try:
+        return int(Decimal(text).scaleb(2).quantize(CENT, ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f'invalid amount: {value!r}') from None
+
+
+def average_cents(total_cents, count):
+    """Average in whole cents, rounding halves away from zero like a receipt would."""
+    if not count:
+        return 0
+    sign = -1 if total_cents < 0 else 1
+    return sign * ((2 * abs(total_cents) + count) // (2 * count))
+
+
+def format_cents(cents):
+    sign = '-' if cents < 0 else ''
+    cents = abs(cents)
+    return f'{sign}{cents // 100}.{cents % 100:02d}'
+
+
+class LineItem:
+    # summary is True for totals rows that some formats list among the items (Sub-Total, Tax,
+    # Total, tender); they count towards the per-description aggregates but aren't products.
+    __slots__ = ('line', 'upc', 'description', 'unit_qty', 'case_qty', 'price_cents', 'summary')
+
+    def __init__(self, line, upc, description, unit_qty, case_qty, price_cents, summary=False):
+        self.line = line
+        self.upc = upc
+        self.description = sys.intern(description)
+        self.unit_qty = unit_qty
+        self.case_qty = case_qty
+        self.price_cents = price_cents
+        self.summary = summary
+
+    @property
+    def price(self):
+        return self.price_cents / 100
+
+    def store_row(self):
+        """(line, upc, description, unit_qty, case_qty, price) for ReceiptStore.add_receipt."""
+        return self.line, self.upc, self.description, self.unit_qty, self.case_qty, self.price
+
+    def __repr__(self):
+        return f'LineItem({self.line}, {self.upc!r}, {self.description!r}, ${format_cents(self.price_cents)})'
+
+
+class ParsedReceipt:
+    __slots__ = ('file_path', 'vendor', 'invoice', 'date', 'total_cents', 'items')
+
+    def __init__(self, file_path, vendor):
+        self.file_path = file_path
+        self.vendor = vendor
+        self.invoice = None
+        self.date = ''
+        self.total_cents = 0
+        self.items = []
+
+    @property
+    def total(self):
+        return self.total_cents / 100
+
+
+class ItemStats:
+    __slots__ = ('total_cents', 'count', 'min_cents', 'max_cents')
+
+    def __init__(self, price_cents):
+        self.total_cents = price_cents
+        self.count = 1
+        self.min_cents = price_cents
+        self.max_cents = price_cents
+
+    def add(self, price_cents):
+        self.total_cents += price_cents
+        self.count += 1
+        if price_cents < self.min_cents:
+            self.min_cents = price_cents
+        if price_cents > self.max_cents:
+            self.max_cents = price_cents
+
+    def merge(self, other):
+        self.total_cents += other.total_cents
+        self.count += other.count
+        if other.min_cents < self.min_cents:
+            self.min_cents = other.min_cents
+        if other.max_cents > self.max_cents:
+            self.max_cents = other.max_cents
+
+    def as_dict(self):
+        """Dollar figures in the {'total', 'count', 'min', 'max'} shape the reports use."""
+        return {
+            'total': self.total_cents / 100,
+            'count': self.count,
+            'min': self.min_cents / 100,
+            'max': self.max_cents / 100,
+            'average': average_cents(self.total_cents, self.count) / 100,
+        }
+
+
+def aggregate_line_items(items):
+    """Per-description ItemStats for one receipt (totals rows included)."""
+    stats = {}
+    for line_item in items:
+        entry = stats.get(line_item.description)
+        if entry is None:
+            stats[line_item.description] = ItemStats(line_item.price_cents)
+        else:
+            entry.add(line_item.price_cents)
+    return stats
+
+
+class ProcessedData:
+    """Per-receipt, per-description aggregates as parallel columns.
+
+    Iterating yields (date, description, total_cents, count, min_cents, max_cents) rows in
+    the order receipts were added.
+    """
+
+    _serials = count()
+
+    def __init__(self):
+        # Distinguishes a rebuilt instance from an old one of the same length
+        self.serial = next(self._serials)
+        self.dates = []
+        self.date_ids = {}
+        self.descriptions = []
+        self.description_ids = {}
+        self.date_index = array('l')
+        self.description_index = array('l')
+        self.total_cents = array('q')
+        self.count = array('l')
+        self.min_cents = array('q')
+        self.max_cents = array('q')
+
+    def _id(self, value, values, ids):
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+        return index
+
+    def add_receipt(self, date_str, item_stats):
+        date_id = self._id(date_str, self.dates, self.date_ids)
+        for description, stats in item_stats.items():
+            self.date_index.append(date_id)
+            self.description_index.append(self._id(description, self.descriptions, self.description_ids))
+            self.total_cents.append(stats.total_cents)
+            self.count.append(stats.count)
+            self.min_cents.append(stats.min_cents)
+            self.max_cents.append(stats.max_cents)
+
+    def __len__(self):
+        return len(self.total_cents)
+
+    def __iter__(self):
+        dates, descriptions = self.dates, self.descriptions
+        for i in range(len(self.total_cents)):
+            yield (dates[self.date_index[i]], descriptions[self.description_index[i]], self.total_cents[i],
+                   self.count[i], self.min_cents[i], self.max_cents[i])
+
+
+class RunningTotals:
+    """Archive-wide aggregates in cents, updated one receipt at a time (batch and watch mode)."""
+
+    def __init__(self):
+        self.grand_total_cents = 0
+        self.totals_by_date_cents = defaultdict(int)
+        self.totals_by_month_cents = defaultdict(int)
+        self.monthly_counts = defaultdict(int)
+        self.item_totals = {}
+        self.processed_data = ProcessedData()
+        self.files = []
+
+    def add(self, file_path, date_str, total_cents, item_stats):
+        self.files.append(file_path)
+        self.grand_total_cents += total_cents
+        self.totals_by_date_cents[date_str] += total_cents
+        month_str = date_str[:7]  # Extract the year-month part of the date
+        self.totals_by_month_cents[month_str] += total_cents
+        self.monthly_counts[month_str] += 1
+
+        # Copies the numbers into its columns, so item_stats can be merged into below
+        self.processed_data.add_receipt(date_str, item_stats)
+        for item, stats in item_stats.items():
+            if item in self.item_totals:
+                self.item_totals[item].merge(stats)
+            else:
+                self.item_totals[item] = stats
+
+    def results(self):
+        """(processed_data, grand_total, totals_by_date, all_items, monthly_averages) in dollars."""
+        grand_total = self.grand_total_cents / 100
+        totals_by_date = {date: cents / 100 for date, cents in self.totals_by_date_cents.items()}
+        monthly_averages = {month: cents / self.monthly_counts[month] / 100
+                            for month, cents in self.totals_by_month_cents.items()}
+        all_items = {item: stats.as_dict() for item, stats in self.item_totals.items()}
+        return self.processed_data, grand_total, totals_by_date, all_items, monthly_averages
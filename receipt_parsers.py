@@ -0,0 +1,195 @@
+"""Receipt export formats, picked per file by a cheap check of its first few lines.
+
+Each parser has a `sniff(head)` that looks only at the first SNIFF_LINES raw lines,
+and a `parse(file, file_path, report)` that returns a ParsedReceipt of normalized
+LineItems. `parse_receipt()` reads the head once, asks the registered parsers in
+order, and runs only the first one that matches. Files that no parser recognizes are
+quarantined instead of being half-parsed.
+
+To support another supplier, write a class with `name`, `sniff` and `parse` and
+decorate it with `@register_parser`; more specific formats should be registered
+before the generic ItemizedCsvParser.
+"""
+import csv
+from datetime import datetime
+from itertools import islice
+
+from receipt_log import ParseReport
+from receipt_models import LineItem, ParsedReceipt, to_cents
+
+SNIFF_LINES = 8
+
+PARSERS = []
+
+
+def register_parser(parser_class):
+    PARSERS.append(parser_class())
+    return parser_class
+
+
+def parse_quantity(value):
+    try:
+        return float(value.replace(',', '').strip())
+    except ValueError:
+        return None
+
+
+def read_head(file_path, count=SNIFF_LINES):
+    with open(file_path, mode='r', newline='') as file:
+        return [line.rstrip('\r\n') for line in islice(file, count)]
+
+
+def find_parser(head):
+    for parser in PARSERS:
+        if parser.sniff(head):
+            return parser
+    return None
+
+
+def parse_receipt(file_path, report=None):
+    """Parse one receipt with the matching parser; returns a ParsedReceipt (empty if unusable)."""
+    if report is None:
+        report = ParseReport()
+    with report.timing(file_path) as stats:
+        try:
+            parser = find_parser(read_head(file_path))
+            if parser is None:
+                report.quarantine(file_path, None, 'unrecognized receipt format')
+                return ParsedReceipt(file_path, None)
+            with open(file_path, mode='r', newline='') as file:
+                reader = csv.reader(file)
+                receipt = parser.parse(reader, file_path, report)
+                stats.lines = reader.line_num
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            report.quarantine(file_path, None, f'unreadable file: {e}')
+            return ParsedReceipt(file_path, None)
+        stats.items = len(receipt.items)
+        if not receipt.date:
+            report.quarantine(file_path, None, 'no invoice date found')
+    return receipt
+
+
+@register_parser
+class RestaurantDepotParser:
+    """Restaurant Depot: 4 address lines, "Invoice N","Terminal T - MM/DD/YYYY H:MM pm", then
+    UPC,Description,UnitQty,CaseQty,Price rows ending in 0,Sub-Total / 0,Tax / 0,Total rows."""
+
+    name = 'restaurant_depot'
+    COLUMNS = 'UPC,Description,UnitQty,CaseQty,Price'
+
+    def sniff(self, head):
+        return any(line.startswith(self.COLUMNS) for line in head)
+
+    def parse(self, reader, file_path, report):
+        receipt = ParsedReceipt(file_path, self.name)
+        for row in reader:
+            if len(row) < 2:  # Ensure row has at least 2 columns
+                continue
+            if "Invoice" in row[0]:
+                receipt.invoice = row[0].replace('Invoice', '', 1).strip()
+                try:
+                    receipt.date = datetime.strptime(row[1].split('-')[1].strip(), "%m/%d/%Y %I:%M %p").strftime("%Y-%m-%d")
+                except (IndexError, ValueError) as e:
+                    report.quarantine(file_path, reader.line_num, f'unparseable invoice date: {e}', row)
+            if row[0].isdigit() and len(row) >= 5:
+                price_string = row[-1].replace('$', '').replace(',', '').strip()
+                if price_string:
+                    try:
+                        price_cents = to_cents(price_string)
+                    except ValueError:
+                        report.quarantine(file_path, reader.line_num, f'invalid price: {price_string}', row)
+                    else:
+                        receipt.items.append(LineItem(reader.line_num, row[0], row[1].strip(), parse_quantity(row[2]),
+                                                      parse_quantity(row[3]), price_cents, row[0] == '0'))
+
+            if "Total" in row[1]:  # Sub-Total, then Total; the last one wins
+                total_string = row[-1].replace('$', '').replace(',', '').strip()
+                if total_string:
+                    try:
+                        receipt.total_cents = to_cents(total_string)
+                    except ValueError:
+                        report.quarantine(file_path, reader.line_num, f'invalid total: {total_string}', row)
+        return receipt
+
+
+@register_parser
+class ItemizedCsvParser:
+    """Plain itemized exports: a header row naming at least a description and a price/amount
+    column, then one row per item. Optional date, invoice, UPC/item number and quantity columns
+    are picked up by name; the receipt total is the sum of the item amounts."""
+
+    name = 'itemized_csv'
+    DESCRIPTION = ('description', 'item description', 'product description', 'product', 'item name')
+    PRICE = ('extended price', 'ext price', 'extended amount', 'amount', 'line total', 'price')
+    UPC = ('upc', 'item number', 'item #', 'item no', 'product number', 'sku')
+    QUANTITY = ('quantity', 'qty', 'qty shipped', 'unit qty')
+    CASE_QUANTITY = ('case qty', 'cases', 'case quantity')
+    DATE = ('invoice date', 'date', 'order date', 'delivery date')
+    INVOICE = ('invoice', 'invoice number', 'invoice #', 'invoice no', 'order number')
+    DATE_FORMATS = ('%m/%d/%Y', '%Y-%m-%d', '%m/%d/%y', '%m-%d-%Y', '%d-%b-%Y')
+
+    def columns(self, header):
+        names = [name.strip().lower() for name in header]
+
+        def find(candidates):
+            for candidate in candidates:
+                if candidate in names:
+                    return names.index(candidate)
+            return None
+
+        return {
+            'description': find(self.DESCRIPTION),
+            'price': find(self.PRICE),
+            'upc': find(self.UPC),
+            'unit_qty': find(self.QUANTITY),
+            'case_qty': find(self.CASE_QUANTITY),
+            'date': find(self.DATE),
+            'invoice': find(self.INVOICE),
+        }
+
+    def sniff(self, head):
+        if not head:
+            return False
+        columns = self.columns(next(csv.reader([head[0]])))
+        return columns['description'] is not None and columns['price'] is not None
+
+    def parse_date(self, value):
+        for date_format in self.DATE_FORMATS:
+            try:
+                return datetime.strptime(value.strip(), date_format).strftime("%Y-%m-%d")
+            except ValueError:
+                pass
+        raise ValueError(f'unrecognized date {value!r}')
+
+    def parse(self, reader, file_path, report):
+        receipt = ParsedReceipt(file_path, self.name)
+        columns = self.columns(next(reader, []))
+
+        def cell(row, name):
+            index = columns[name]
+            return row[index] if index is not None and index < len(row) else ''
+
+        for row in reader:
+            if not any(value.strip() for value in row):
+                continue
+            if not receipt.date and cell(row, 'date'):
+                try:
+                    receipt.date = self.parse_date(cell(row, 'date'))
+                except ValueError as e:
+                    report.quarantine(file_path, reader.line_num, f'unparseable invoice date: {e}', row)
+            if receipt.invoice is None and cell(row, 'invoice'):
+                receipt.invoice = cell(row, 'invoice').strip()
+            price_string = cell(row, 'price')
+            description = cell(row, 'description').strip()
+            if not price_string.strip() or not description:
+                continue
+            try:
+                price_cents = to_cents(price_string)
+            except ValueError:
+                report.quarantine(file_path, reader.line_num, f'invalid price: {price_string.strip()}', row)
+                continue
+            receipt.items.append(LineItem(reader.line_num, cell(row, 'upc').strip(), description,
+                                          parse_quantity(cell(row, 'unit_qty')), parse_quantity(cell(row, 'case_qty')),
+                                          price_cents))
+            receipt.total_cents += price_cents
+        return receipt
@@ -0,0 +1,153 @@
+"""SQLite store of receipt line items for fast lookups without reparsing the archive.
+
+main.py fills it while it parses `receipts/` (only files whose size or mtime changed
+are rewritten), and `python main.py query` searches it:
+
+    python main.py query "ahi tuna" --since 2024-01-01 --until 2024-03-31
+    python main.py query --upc 20445420000
+
+Descriptions are indexed with FTS5 (each search word is matched as a prefix, all words
+must match); UPC and date have ordinary B-tree indexes. If this SQLite build has no
+FTS5, descriptions are matched with LIKE instead.
+"""
+import os
+import sqlite3
+
+DEFAULT_DB = 'receipts.db'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS receipts (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL UNIQUE,
+    invoice TEXT,
+    date TEXT,
+    total REAL,
+    size INTEGER,
+    mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS lines (
+    id INTEGER PRIMARY KEY,
+    receipt_id INTEGER NOT NULL REFERENCES receipts(id) ON DELETE CASCADE,
+    line INTEGER,
+    date TEXT,
+    upc TEXT,
+    description TEXT,
+    unit_qty REAL,
+    case_qty REAL,
+    price REAL
+);
+CREATE INDEX IF NOT EXISTS lines_upc ON lines(upc);
+CREATE INDEX IF NOT EXISTS lines_date ON lines(date);
+CREATE INDEX IF NOT EXISTS lines_receipt ON lines(receipt_id);
+'''
+
+# External-content FTS table kept in sync with `lines` by triggers.
+FTS_SCHEMA = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts USING fts5(description, content='lines', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS lines_ai AFTER INSERT ON lines BEGIN
+    INSERT INTO lines_fts(rowid, description) VALUES (new.id, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS lines_ad AFTER DELETE ON lines BEGIN
+    INSERT INTO lines_fts(lines_fts, rowid, description) VALUES ('delete', old.id, old.description);
+END;
+'''
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = [word.replace('"', '') for word in text.split()]
+    return ' '.join(f'"{word}"*' for word in words if word)
+
+
+class ReceiptStore:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def needs_update(self, file_path):
+        """True if file_path is not stored yet or changed on disk since it was."""
+        stat = os.stat(file_path)
+        row = self.conn.execute('SELECT size, mtime_ns FROM receipts WHERE file = ?', (file_path,)).fetchone()
+        return row is None or row[0] != stat.st_size or row[1] != stat.st_mtime_ns
+
+    def add_receipt(self, file_path, invoice, date_str, total, lines):
+        """Replace the stored copy of one receipt; lines are (line, upc, description, unit_qty, case_qty, price)."""
+        stat = os.stat(file_path)
+        with self.conn:
+            self.conn.execute('DELETE FROM receipts WHERE file = ?', (file_path,))
+            cursor = self.conn.execute(
+                'INSERT INTO receipts (file, invoice, date, total, size, mtime_ns) VALUES (?, ?, ?, ?, ?, ?)',
+                (file_path, invoice, date_str or None, total, stat.st_size, stat.st_mtime_ns),
+            )
+            receipt_id = cursor.lastrowid
+            self.conn.executemany(
+                'INSERT INTO lines (receipt_id, line, date, upc, description, unit_qty, case_qty, price) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(receipt_id, line, date_str or None, upc, description, unit_qty, case_qty, price)
+                 for line, upc, description, unit_qty, case_qty, price in lines],
+            )
+
+    def prune(self, keep_files):
+        """Drop receipts that are no longer part of the archive (deleted or now duplicates)."""
+        keep_files = set(keep_files)
+        stale = [row[0] for row in self.conn.execute('SELECT file FROM receipts') if row[0] not in keep_files]
+        with self.conn:
+            self.conn.executemany('DELETE FROM receipts WHERE file = ?', [(file,) for file in stale])
+        return len(stale)
+
+    def all_lines(self):
+        """Every stored line as (receipt_id, line, date, upc, description, unit_qty, case_qty, price, invoice)."""
+        return self.conn.execute(
+            'SELECT lines.receipt_id, lines.line, lines.date, lines.upc, lines.description, lines.unit_qty, '
+            'lines.case_qty, lines.price, receipts.invoice FROM lines JOIN receipts ON receipts.id = lines.receipt_id'
+        ).fetchall()
+
+    def query(self, text=None, upc=None, since=None, until=None, limit=None):
+        """Return matching lines as dicts, newest first; since/until are inclusive YYYY-MM-DD."""
+        sql = ('SELECT lines.date, receipts.invoice, receipts.file, lines.line, lines.upc, lines.description, '
+               'lines.unit_qty, lines.case_qty, lines.price FROM lines JOIN receipts ON receipts.id = lines.receipt_id')
+        where, params = [], []
+        if text and text.strip():
+            if self.fts:
+                where.append('lines.id IN (SELECT rowid FROM lines_fts WHERE lines_fts MATCH ?)')
+                params.append(fts_query(text))
+            else:
+                for word in text.split():
+                    where.append('lines.description LIKE ?')
+                    params.append(f'%{word}%')
+        if upc:
+            where.append('lines.upc = ?')
+            params.append(upc)
+        if since:
+            where.append('lines.date >= ?')
+            params.append(since)
+        if until:
+            where.append('lines.date <= ?')
+            params.append(until)
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY lines.date DESC, receipts.invoice, lines.line'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        columns = ['date', 'invoice', 'file', 'line', 'upc', 'description', 'unit_qty', 'case_qty', 'price']
+        return [dict(zip(columns, row)) for row in self.conn.execute(sql, params)]
@@ -0,0 +1,122 @@
+"""Directory watchers for `python main.py watch`.
+
+On Linux, InotifyWatcher uses inotify through ctypes, so no extra package is needed. It
+reports a file once the exporter closes it, or once it is moved into the directory.
+Elsewhere, or if inotify is unavailable, PollingWatcher compares (size, mtime)
+snapshots every few seconds. It only reports a file once its size and mtime have stayed
+the same for one poll, so half-written exports are not picked up.
+
+Both have the same interface: `wait(timeout)` returns the set of changed file names
+(new, modified or deleted) in the directory, or an empty set on timeout.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from receipt_log import logger
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class InotifyWatcher:
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE | IN_DELETE_SELF
+
+    def __init__(self, directory):
+        self.directory = directory
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'{os.strerror(errno)}: {directory}')
+        # Set when the kernel dropped events; the caller has to rescan the directory.
+        self.overflowed = False
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+            elif mask & IN_DELETE_SELF:
+                raise OSError(f'Watched directory {self.directory} was deleted')
+            elif name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    def __init__(self, directory, interval=2.0):
+        self.directory = directory
+        self.interval = interval
+        self.overflowed = False
+        self.snapshot = self.scan()
+        self.pending = {}
+
+    def scan(self):
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            time.sleep(max(min(self.interval, deadline - time.monotonic()), 0))
+            current = self.scan()
+            changed = {name for name in set(current) | set(self.snapshot) if current.get(name) != self.snapshot.get(name)}
+            # Report a change only once the file has looked the same for a whole poll
+            ready = {name for name, signature in self.pending.items() if current.get(name) == signature}
+            self.pending = {name: current.get(name) for name in changed}
+            for name in changed:
+                if name in current:
+                    self.snapshot[name] = current[name]
+                else:
+                    self.snapshot.pop(name, None)
+            if ready:
+                return ready
+            if time.monotonic() >= deadline:
+                return set()
+
+    def close(self):
+        pass
+
+
+def make_watcher(directory, poll_interval=2.0, force_polling=False):
+    """An InotifyWatcher where the platform supports it, otherwise a PollingWatcher."""
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            logger.warning('inotify unavailable (%s); polling %s every %.1fs', e, directory, poll_interval)
+    return PollingWatcher(directory, poll_interval)
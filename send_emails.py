@@ -1,9 +1,17 @@
+import argparse
 import csv
+import json
+import os
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import tempfile
 import time
 
+from email_templates import HTML_TEMPLATE, TEXT_TEMPLATE, Campaign
+from send_metrics import METRICS_FILE, SendMetrics
+from smtp_sink import start_sink
+
 # Gmail SMTP configuration
 SMTP_SERVER = "smtp.gmail.com"
 SMTP_PORT = 587
@@ -12,137 +20,23 @@ APP_PASSWORD = "your-16-digit-app-password"  # Your 16-digit app password
 
 # Add delay between emails to avoid Gmail limits
 DELAY_BETWEEN_EMAILS = 1  # seconds
+PAUSE_EVERY = 80  # Gmail daily limit is ~500, so pause every 80 emails
+PAUSE_SECONDS = 60
+
+# Transient failures (4xx replies, dropped connections) are retried with doubling waits
+MAX_RETRIES = 2
+RETRY_DELAY = 5  # seconds
+
+# Default mailing list; the campaign's text and HTML come from the template files (see email_templates.py)
+MAILING_LIST = 'mailing_list.csv'
 
 # Email template
-def create_email_template(recipient_email):
-    subject = "Important: IAED Online Account Password Reset and Next Steps"
-    
-    html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {
-                font-family: Arial, sans-serif;
-                line-height: 1.6;
-                color: #333333;
-            }
-            .container {
-                max-width: 600px;
-                margin: 0 auto;
-                padding: 20px;
-            }
-            .header {
-                background-color: #003366;
-                color: white;
-                padding: 20px;
-                text-align: center;
-                border-radius: 5px 5px 0 0;
-            }
-            .content {
-                background-color: #ffffff;
-                padding: 20px;
-                border: 1px solid #dddddd;
-            }
-            .section {
-                margin-bottom: 20px;
-                padding: 15px;
-                background-color: #f9f9f9;
-                border-left: 4px solid #003366;
-            }
-            .important-notes {
-                background-color: #fff3cd;
-                border-left: 4px solid #ffc107;
-                padding: 15px;
-                margin: 20px 0;
-            }
-            .help-section {
-                background-color: #e8f4f8;
-                border-left: 4px solid #17a2b8;
-                padding: 15px;
-                margin: 20px 0;
-            }
-            .footer {
-                text-align: center;
-                padding: 20px;
-                color: #666666;
-                font-size: 14px;
-            }
-            h2 {
-                color: #003366;
-                margin-top: 0;
-            }
-            ul {
-                padding-left: 20px;
-            }
-            a {
-                color: #0066cc;
-                text-decoration: none;
-            }
-            a:hover {
-                text-decoration: underline;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>IAED Member Update</h1>
-            </div>
-            
-            <div class="content">
-                <p>Dear IAED Member,</p>
-                
-                <p>We hope this email finds you well. We're writing to inform you about important updates regarding your IAED online account.</p>
-                
-                <div class="section">
-                    <h2>Password Reset Notice</h2>
-                    <p>Your account on the new IAED website (<a href="https://www.iaedonline.com/">iaedonline.com</a>) will be receiving a password reset notification.</p>
-                </div>
-
-                <div class="section">
-                    <h2>Required Steps After Reset</h2>
-                    <ol>
-                        <li>
-                            <strong>Complete Your Profile:</strong>
-                            <ul>
-                                <li>Visit: <a href="https://www.iaedonline.com/membership-account/your-profile/">Your Profile Page</a></li>
-                                <li>Update all your information to ensure your listing is current</li>
-                            </ul>
-                        </li>
-                        <li>
-                            <strong>Submit Your Certification Documents:</strong>
-                            <ul>
-                                <li>Submit your Continuing Education documents to maintain IAED Certification</li>
-                                <li>This will ensure you're listed on our <a href="https://www.iaedonline.com/all-members/">Members and Find An Equine Dentist page</a></li>
-                                <li>Review <a href="https://www.iaedonline.com/certification/">certification guidelines</a></li>
-                            </ul>
-                        </li>
-                    </ol>
-                </div>
-
-                <div class="important-notes">
-                    <h2>Important Notes</h2>
-                    <ul>
-                        <li>If your membership shows as expired, please purchase an annual or monthly subscription at: <a href="https://www.iaedonline.com/membership-account/membership-levels/">Membership Levels</a></li>
-                        <li>If you believe you have an active subscription but it's not showing, please email: <a href="mailto:ucid@andrewsama.com">ucid@andrewsama.com</a></li>
-                    </ul>
-                </div>
-
-                <div class="help-section">
-                    <h2>Need Help?</h2>
-                    <p>For any assistance with profile setup or membership issues, please contact: <a href="mailto:ucid@andrewsama.com">ucid@andrewsama.com</a></p>
-                </div>
-
-                <div class="footer">
-                    <p>Thank you for your continued membership with IAED.</p>
-                    <p><strong>Best regards,<br>IAED Team</strong></p>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+def create_email_template(recipient_email, campaign=None, fields=None):
+    # Compiled once per campaign; only the per-recipient values are rendered here
+    campaign = campaign or Campaign()
+    context = dict(fields or {})
+    context['email'] = recipient_email
+    subject, text, html = campaign.render(context)
 
     # Create message
     msg = MIMEMultipart('alternative')
@@ -151,49 +45,69 @@ def create_email_template(recipient_email):
     msg['Subject'] = subject
 
     # Add both plain text and HTML versions
-    text = """
-    Dear IAED Member,
-
-    We hope this email finds you well. We're writing to inform you about important updates regarding your IAED online account.
-
-    Your account on the new IAED website (https://www.iaedonline.com/) will be receiving a password reset notification. Once you've reset your password, please complete these two important steps:
-
-    1. Complete Your Profile:
-       - Visit: https://www.iaedonline.com/membership-account/your-profile/
-       - Update all your information to ensure your listing is current
-
-    2. Submit Your Certification Documents:
-       - Submit your Continuing Education documents to maintain IAED Certification
-       - This will ensure you're listed on our Members and Find An Equine Dentist page: https://www.iaedonline.com/all-members/
-       - Review certification guidelines at: https://www.iaedonline.com/certification/
-
-    Important Notes:
-    - If your membership shows as expired, please purchase an annual or monthly subscription at: https://www.iaedonline.com/membership-account/membership-levels/
-    - If you believe you have an active subscription but it's not showing, please email: ucid@andrewsama.com
-
-    Need Help?
-    For any assistance with profile setup or membership issues, please contact: ucid@andrewsama.com
-
-    Thank you for your continued membership with IAED.
-
-    Best regards,
-    IAED Team
-    """
-
     msg.attach(MIMEText(text, 'plain'))
     msg.attach(MIMEText(html, 'html'))
     
     return msg
 
-def send_emails():
+def send_message(server, msg, metrics, connect, sleep):
+    """Send msg, retrying transient failures; returns the server (a new one after a reconnect)."""
+    smtp_seconds = 0.0
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            server.send_message(msg)
+        except (smtplib.SMTPException, OSError) as e:
+            elapsed = time.perf_counter() - started
+            smtp_seconds += elapsed
+            metrics.seconds['send'] += elapsed
+            disconnected = isinstance(e, (smtplib.SMTPServerDisconnected, ConnectionError))
+            # 4xx replies and dropped connections are worth another try; anything else is final
+            transient = disconnected or (isinstance(e, smtplib.SMTPResponseException) and 400 <= e.smtp_code < 500)
+            if not transient or attempt >= MAX_RETRIES:
+                metrics.message(False, smtp_seconds)
+                raise
+            attempt += 1
+            metrics.retries += 1
+            sleep(RETRY_DELAY * 2 ** (attempt - 1), 'retry')
+            if disconnected:
+                try:
+                    server = connect()
+                except (smtplib.SMTPException, OSError):
+                    metrics.message(False, smtp_seconds)
+                    raise
+            continue
+        elapsed = time.perf_counter() - started
+        metrics.seconds['send'] += elapsed
+        metrics.message(True, smtp_seconds + elapsed)
+        return server
+
+def send_emails(mailing_list=MAILING_LIST, html_template=HTML_TEMPLATE, text_template=TEXT_TEMPLATE,
+                host=SMTP_SERVER, port=SMTP_PORT, login=True, delay=DELAY_BETWEEN_EMAILS,
+                pause_every=PAUSE_EVERY, pause_seconds=PAUSE_SECONDS, metrics=None, simulate_sleep=False, verbose=True):
+    """Send the campaign to every row of mailing_list; returns the run's SendMetrics."""
+    metrics = metrics or SendMetrics()
+    # Template errors should stop the run before anything is sent
+    campaign = Campaign(html_template, text_template)
+
+    def sleep(seconds, reason):
+        metrics.sleep(seconds, reason, simulate_sleep)
+
+    def connect():
+        with metrics.timing('connect'):
+            server = smtplib.SMTP(host, port)
+            if login:
+                server.starttls()
+                server.login(SENDER_EMAIL, APP_PASSWORD)
+        return server
+
     try:
         # Connect to Gmail SMTP server
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SENDER_EMAIL, APP_PASSWORD)
+        server = connect()
         
         # Read email list
-        with open('mailing_list.csv', 'r') as file:
+        with open(mailing_list, 'r') as file:
             csv_reader = csv.DictReader(file)
             total_emails = 0
             successful_sends = 0
@@ -201,31 +115,113 @@ def send_emails():
             for row in csv_reader:
                 recipient_email = row['email']
                 try:
-                    msg = create_email_template(recipient_email)
-                    server.send_message(msg)
-                    successful_sends += 1
-                    print(f"Successfully sent email to: {recipient_email}")
-                    
-                    # Add delay between sends
-                    time.sleep(DELAY_BETWEEN_EMAILS)
-                    
+                    with metrics.timing('render'):
+                        msg = create_email_template(recipient_email, campaign, row)
                 except Exception as e:
-                    print(f"Failed to send email to {recipient_email}: {str(e)}")
+                    metrics.message(False, 0.0)
+                    print(f"Failed to render email to {recipient_email}: {str(e)}")
+                else:
+                    try:
+                        server = send_message(server, msg, metrics, connect, sleep)
+                        successful_sends += 1
+                        if verbose:
+                            print(f"Successfully sent email to: {recipient_email}")
+
+                        # Add delay between sends
+                        sleep(delay, 'delay')
+
+                    except Exception as e:
+                        print(f"Failed to send email to {recipient_email}: {str(e)}")
                 total_emails += 1
 
                 # Gmail sending limits check
-                if total_emails % 80 == 0:  # Gmail daily limit is ~500, so pause every 80 emails
-                    print("Pausing for 1 minute to avoid Gmail limits...")
-                    time.sleep(60)
+                if pause_every and total_emails % pause_every == 0:  # Gmail daily limit is ~500, so pause every 80 emails
+                    if verbose:
+                        print(f"Pausing for {pause_seconds}s to avoid Gmail limits...")
+                    sleep(pause_seconds, 'pause')
 
         # Close the server connection
         server.quit()
         
-        print(f"\nEmail sending complete!")
-        print(f"Successfully sent: {successful_sends}/{total_emails} emails")
+        if verbose:
+            print("\nEmail sending complete!")
+            print(f"Successfully sent: {successful_sends}/{total_emails} emails")
         
     except Exception as e:
         print(f"Error connecting to SMTP server: {str(e)}")
+    metrics.finish()
+    return metrics
+
+def write_synthetic_list(path, size):
+    # Same columns as members_list.csv uses in the templates; example.invalid never resolves
+    first_names = ['Dale', 'Maria', 'James', 'Linda', 'Robert', 'Ana']
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['email', 'firstname'])
+        for i in range(size):
+            writer.writerow([f'member{i}@example.invalid', first_names[i % len(first_names)]])
+
+def benchmark(args):
+    """Run the full send pipeline against a local SMTP sink once per list size."""
+    sink = start_sink(args.sink_latency, args.sink_error_rate)
+    runs = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in args.sizes:
+                mailing_list = os.path.join(tmp, f'mailing_list_{size}.csv')
+                write_synthetic_list(mailing_list, size)
+                sink.reset_stats()
+                metrics = send_emails(mailing_list, args.html, args.text, host='127.0.0.1', port=sink.server_address[1],
+                                      login=False, delay=args.delay, pause_every=args.pause_every,
+                                      pause_seconds=args.pause_seconds, simulate_sleep=not args.real_sleep, verbose=False)
+                print(f"{size:>7} recipients: {metrics.summary()}")
+                runs.append(dict(metrics.report(), size=size, sink=dict(sink.stats)))
+    finally:
+        sink.shutdown()
+        sink.server_close()
+
+    settings = {
+        'delay': args.delay, 'pause_every': args.pause_every, 'pause_seconds': args.pause_seconds,
+        'simulated_sleep': not args.real_sleep, 'sink_latency': args.sink_latency, 'sink_error_rate': args.sink_error_rate,
+        'max_retries': MAX_RETRIES, 'retry_delay': RETRY_DELAY,
+    }
+    with open(args.metrics, 'w', encoding='utf-8') as file:
+        json.dump({'dry_run': True, 'settings': settings, 'runs': runs}, file, indent=2)
+    print(f"Wrote metrics to {args.metrics}")
+
+def parse_sizes(value):
+    try:
+        sizes = [int(size) for size in value.split(',') if size.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected comma-separated list sizes, got {value!r}')
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError('list sizes must be positive')
+    return sizes
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Send a templated email to every address in a mailing list.')
+    parser.add_argument('--list', default=MAILING_LIST, help=f'CSV with an email column; other columns are template variables (default: {MAILING_LIST})')
+    parser.add_argument('--html', default=HTML_TEMPLATE, help=f'HTML template, relative to the current directory (default: {HTML_TEMPLATE} next to this script)')
+    parser.add_argument('--text', default=TEXT_TEMPLATE, help=f'Plain-text template, relative to the current directory (default: {TEXT_TEMPLATE} next to this script)')
+    parser.add_argument('--metrics', default=METRICS_FILE, help=f'Write send metrics (latency histogram, throughput, retries, sleep vs send time) here (default: {METRICS_FILE})')
+    parser.add_argument('--delay', type=float, default=DELAY_BETWEEN_EMAILS, help=f'Seconds to wait after each message (default: {DELAY_BETWEEN_EMAILS})')
+    parser.add_argument('--pause-every', type=int, default=PAUSE_EVERY, help=f'Pause after every N recipients, 0 to never pause (default: {PAUSE_EVERY})')
+    parser.add_argument('--pause-seconds', type=float, default=PAUSE_SECONDS, help=f'Length of that pause (default: {PAUSE_SECONDS})')
+    dry_run = parser.add_argument_group('dry run', 'Benchmark the whole pipeline against a local SMTP sink; nothing is sent')
+    dry_run.add_argument('--dry-run', action='store_true', help='Send synthetic lists to a local SMTP sink instead of Gmail')
+    dry_run.add_argument('--sizes', type=parse_sizes, default=[100, 1000], help='Comma-separated list sizes to run (default: 100,1000)')
+    dry_run.add_argument('--sink-latency', type=float, default=0.0, help='Seconds the sink takes to accept each message (default: 0)')
+    dry_run.add_argument('--sink-error-rate', type=float, default=0.0, help='Fraction of messages the sink answers with 451 (default: 0)')
+    dry_run.add_argument('--real-sleep', action='store_true', help='Actually wait out delays and pauses instead of simulating them')
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    send_emails() 
\ No newline at end of file
+    args = parse_args()
+    if args.dry_run:
+        benchmark(args)
+    else:
+        metrics = send_emails(args.list, args.html, args.text, delay=args.delay,
+                              pause_every=args.pause_every, pause_seconds=args.pause_seconds)
+        metrics.write(args.metrics)
+        print(metrics.summary())
+        print(f"Wrote metrics to {args.metrics}")
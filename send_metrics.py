@@ -0,0 +1,133 @@
+"""Send-throughput metrics for send_emails.py.
+
+SendMetrics records, for one run:
+
+- each message's SMTP latency (all attempts, without the retry waits), as a histogram
+  and as percentiles;
+- messages sent and failed per THROUGHPUT_INTERVAL seconds, so throughput over the run
+  can be plotted;
+- retries;
+- time spent connecting, rendering, in SMTP and sleeping (between messages, in the
+  periodic pauses, before retries).
+
+`write(path)` saves it all as JSON. In a dry run, sleeps can be simulated: they are
+recorded and advance the run's clock, but don't actually wait. A dry run of thousands
+of messages then reports how long the real send would take at the same rate settings.
+"""
+import bisect
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+THROUGHPUT_INTERVAL = 10  # seconds per timeline bucket
+METRICS_FILE = 'send_metrics.json'
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class SendMetrics:
+    def __init__(self, interval=THROUGHPUT_INTERVAL):
+        self.interval = interval
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.finished = None
+        self.simulated_sleep = 0.0
+        self.latencies = []
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.seconds = defaultdict(float)
+        self.sleep_seconds = defaultdict(float)
+        self.timeline = defaultdict(lambda: [0, 0])
+
+    def now(self):
+        """Seconds since the start, including simulated sleeps."""
+        return time.perf_counter() - self.started + self.simulated_sleep
+
+    @contextmanager
+    def timing(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[phase] += time.perf_counter() - started
+
+    def sleep(self, seconds, reason, simulate=False):
+        if seconds <= 0:
+            return
+        if simulate:
+            self.simulated_sleep += seconds
+        else:
+            time.sleep(seconds)
+        self.seconds['sleep'] += seconds
+        self.sleep_seconds[reason] += seconds
+
+    def message(self, ok, smtp_seconds):
+        """Record one recipient's outcome and the time its SMTP attempts took."""
+        bucket = self.timeline[int(self.now() // self.interval)]
+        if ok:
+            self.sent += 1
+            bucket[0] += 1
+        else:
+            self.failed += 1
+            bucket[1] += 1
+        if smtp_seconds:
+            self.latencies.append(smtp_seconds)
+            self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, smtp_seconds * 1000)] += 1
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = self.now()
+
+    def report(self):
+        self.finish()
+        latencies = sorted(self.latencies)
+        elapsed = self.finished
+        send_seconds = self.seconds['send']
+        return {
+            'started_at': self.started_at.isoformat(),
+            'messages': self.sent + self.failed,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries': self.retries,
+            'elapsed_seconds': round(elapsed, 3),
+            'simulated_sleep_seconds': round(self.simulated_sleep, 3),
+            'seconds': {phase: round(self.seconds[phase], 3) for phase in ('connect', 'render', 'send', 'sleep')},
+            'sleep_seconds': {reason: round(seconds, 3) for reason, seconds in sorted(self.sleep_seconds.items())},
+            'messages_per_minute': round(self.sent / elapsed * 60, 2) if elapsed else 0.0,
+            # What the SMTP connection alone could sustain, without the rate-limit sleeps
+            'smtp_messages_per_second': round(self.sent / send_seconds, 2) if send_seconds else 0.0,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                'p50': round(percentile(latencies, 0.50) * 1000, 3),
+                'p90': round(percentile(latencies, 0.90) * 1000, 3),
+                'p99': round(percentile(latencies, 0.99) * 1000, 3),
+                'max': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+            'latency_histogram': [{'le_ms': bound, 'count': count}
+                                  for bound, count in zip(list(LATENCY_BUCKETS_MS) + [None], self.histogram)],
+            'timeline': [{'second': index * self.interval, 'sent': sent, 'failed': failed}
+                         for index, (sent, failed) in sorted(self.timeline.items())],
+        }
+
+    def summary(self):
+        report = self.report()
+        seconds = report['seconds']
+        return (f"{report['sent']}/{report['messages']} sent, {report['retries']} retries in {report['elapsed_seconds']:.1f}s "
+                f"({report['messages_per_minute']:.1f}/min); SMTP p50 {report['latency_ms']['p50']:.1f}ms "
+                f"p99 {report['latency_ms']['p99']:.1f}ms; send {seconds['send']:.1f}s, sleep {seconds['sleep']:.1f}s, "
+                f"render {seconds['render']:.1f}s")
+
+    def write(self, path=METRICS_FILE, **extra):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(dict(self.report(), **extra), file, indent=2)
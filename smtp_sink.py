@@ -0,0 +1,94 @@
+"""A local SMTP server that accepts and discards mail, for `send_emails.py --dry-run`.
+
+It speaks just enough SMTP for smtplib (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT),
+without STARTTLS or AUTH. It can wait before accepting each message, to stand in for a
+slow relay. It can also answer a fraction of MAIL commands with `451` so the sender's
+retries get exercised.
+
+    sink = start_sink(latency=0.02, error_rate=0.01)
+    ... smtplib.SMTP('127.0.0.1', sink.server_address[1]) ...
+    sink.shutdown()
+"""
+import random
+import socketserver
+import threading
+import time
+
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        sink = self.server
+        self.reply('220 localhost SMTP sink')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command == b'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif command == b'HELO':
+                self.reply('250 localhost')
+            elif command == b'MAIL':
+                if sink.error_rate and sink.random() < sink.error_rate:
+                    sink.count('rejected')
+                    self.reply('451 Temporary local problem, try again')
+                else:
+                    self.reply('250 OK')
+            elif command == b'RCPT':
+                self.reply('250 OK')
+            elif command == b'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                for data_line in self.rfile:
+                    if data_line in (b'.\r\n', b'.\n'):
+                        break
+                    size += len(data_line)
+                if sink.latency:
+                    time.sleep(sink.latency)
+                sink.count('messages', size)
+                self.reply('250 OK: queued')
+            elif command in (b'RSET', b'NOOP'):
+                self.reply('250 OK')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, latency=0.0, error_rate=0.0, seed=0):
+        super().__init__(address, SinkHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'messages': 0, 'bytes': 0, 'rejected': 0}
+
+    def random(self):
+        with self.lock:
+            return self.rng.random()
+
+    def count(self, name, size=0):
+        with self.lock:
+            self.stats[name] += 1
+            if size:
+                self.stats['bytes'] += size
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {'messages': 0, 'bytes': 0, 'rejected': 0}
+
+
+def start_sink(latency=0.0, error_rate=0.0, host='127.0.0.1', port=0, seed=0):
+    """An SmtpSink serving from a daemon thread; port 0 picks a free port."""
+    sink = SmtpSink((host, port), latency, error_rate, seed)
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    return sink
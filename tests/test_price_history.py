@@ -0,0 +1,64 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from price_history import build_price_history  # noqa: E402
+
+
+def line(receipt_id, date, upc, description, price, unit_qty=1.0, case_qty=0.0, line_number=6):
+    return (receipt_id, line_number, date, upc, description, unit_qty, case_qty, price, f'INV{receipt_id}')
+
+
+class PriceHistoryTest(unittest.TestCase):
+    def test_rolling_mean_pct_change_and_outlier(self):
+        prices = [10.0, 12.0, 11.0, 10.0, 40.0]
+        rows = [line(i + 1, f'2024-01-0{i + 1}', '111', 'FLOUR 50LB', price) for i, price in enumerate(prices)]
+        history = build_price_history(list(reversed(rows)), window=3)
+
+        self.assertEqual(list(history['date']), ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05'])
+        self.assertEqual(list(history['unit_price']), prices)
+        for actual, expected in zip(history['rolling_mean'], [10.0, 11.0, 11.0, 11.0, 61 / 3]):
+            self.assertAlmostEqual(actual, expected)
+        self.assertTrue(math.isnan(history['pct_change'][0]))
+        for actual, expected in zip(history['pct_change'][1:], [20.0, -100 / 12, -100 / 11, 300.0]):
+            self.assertAlmostEqual(actual, expected)
+        # Median 11, MAD 1: only the $40 purchase is far enough out.
+        self.assertEqual(list(history['outlier']), [False, False, False, False, True])
+
+    def test_unit_price_and_discount_netting(self):
+        rows = [
+            line(1, '2024-02-01', '222', 'PD BERRY BLACK', 30.0, unit_qty=2.0, line_number=6),
+            line(1, '2024-02-01', '222', 'PD BERRY BLACK', -10.0, unit_qty=0.0, line_number=7),
+            line(2, '2024-02-08', '222', 'PD BERRY BLACK', 24.0, unit_qty=0.0, case_qty=2.0),
+            line(3, '2024-02-15', '222', 'PD BERRY BLACK', -5.0, unit_qty=-1.0),
+        ]
+        history = build_price_history(rows)
+        self.assertEqual(list(history['net_price']), [20.0, 24.0])
+        self.assertEqual(list(history['unit_price']), [10.0, 12.0])
+
+    def test_items_without_upc_are_tracked_by_description(self):
+        rows = [
+            line(1, '2024-03-01', '', 'Tomatoes', 5.0),
+            line(1, '2024-03-01', '', 'Olive Oil', 30.0, line_number=7),
+            line(2, '2024-03-08', '', 'TOMATOES', 6.0),
+            line(2, '2024-03-08', '', 'Olive Oil', 33.0, line_number=7),
+            line(3, '2024-03-15', '', '', 99.0),
+        ]
+        history = build_price_history(rows)
+        self.assertEqual(list(history['upc']), ['', '', '', ''])
+        self.assertEqual(list(history['description']), ['Olive Oil', 'Olive Oil', 'Tomatoes', 'TOMATOES'])
+        self.assertEqual(list(history['group_start']), [True, False, True, False])
+        self.assertTrue(math.isnan(history['pct_change'][2]))
+        self.assertAlmostEqual(history['pct_change'][1], 10.0)
+        self.assertAlmostEqual(history['pct_change'][3], 20.0)
+
+    def test_no_purchases(self):
+        self.assertIsNone(build_price_history([]))
+        self.assertIsNone(build_price_history([line(1, None, '111', 'FLOUR 50LB', 10.0)]))
+
+
+if __name__ == '__main__':
+    unittest.main()
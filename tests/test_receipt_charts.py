@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from receipt_charts import VISUALIZATION_DIR, lttb, render_charts, resample, time_series  # noqa: E402
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def sample_report():
+    totals_by_date = {'2024-01-02': 120.5, '2024-01-09': 98.25, '2024-02-06': 143.0}
+    all_items = {
+        'FLOUR 50LB': {'total': 60.0, 'count': 3, 'min': 20.0, 'max': 20.0, 'average': 20.0},
+        'PD BERRY BLACK': {'total': 25.5, 'count': 2, 'min': 12.0, 'max': 13.5, 'average': 12.75},
+        'Total': {'total': 361.75, 'count': 3, 'min': 98.25, 'max': 143.0, 'average': 120.58},
+    }
+    monthly_averages = {'2024-01': 109.375, '2024-02': 143.0}
+    return totals_by_date, all_items, monthly_averages
+
+
+class RenderChartsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_renders_every_chart_as_png(self):
+        paths = render_charts(self.tmp.name, *sample_report())
+        self.assertEqual(len(paths), 8)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp.name, VISUALIZATION_DIR))),
+                         sorted(os.path.basename(path) for path in paths))
+        for path in paths:
+            with open(path, 'rb') as file:
+                self.assertEqual(file.read(len(PNG_SIGNATURE)), PNG_SIGNATURE, path)
+
+    def test_renders_only_named_charts(self):
+        paths = render_charts(self.tmp.name, *sample_report(), names={'sales_over_time', 'top_items'})
+        self.assertEqual(sorted(os.path.basename(path) for path in paths), ['sales_over_time.png', 'top_items.png'])
+
+    def test_empty_report(self):
+        self.assertEqual(len(render_charts(self.tmp.name, {}, {}, {})), 8)
+
+
+class LttbTest(unittest.TestCase):
+    def test_keeps_endpoints_and_requested_count(self):
+        rng = np.random.default_rng(0)
+        for n in (4, 5, 10, 101, 1000, 5000):
+            x = np.cumsum(rng.uniform(0.5, 2.0, n))
+            y = rng.normal(size=n)
+            for threshold in (3, 4, 7, n // 2, n - 1):
+                if not 3 <= threshold < n:
+                    continue
+                with self.subTest(n=n, threshold=threshold):
+                    keep = lttb(x, y, threshold)
+                    self.assertEqual(len(keep), threshold)
+                    self.assertEqual((keep[0], keep[-1]), (0, n - 1))
+                    self.assertTrue(np.all(np.diff(keep) > 0))
+
+    def test_keeps_a_spike(self):
+        x = np.arange(1000, dtype=np.float64)
+        y = np.zeros(1000)
+        y[437] = 50.0
+        self.assertIn(437, lttb(x, y, 20))
+
+    def test_short_series_and_tiny_thresholds_are_kept_whole(self):
+        x = np.arange(10, dtype=np.float64)
+        for threshold in (0, 2, 10, 50):
+            with self.subTest(threshold=threshold):
+                self.assertEqual(list(lttb(x, x, threshold)), list(range(10)))
+        self.assertEqual(len(lttb(np.array([]), np.array([]), 100)), 0)
+
+
+class ResampleTest(unittest.TestCase):
+    def test_picks_the_finest_period_that_fits(self):
+        dates, values = time_series({f'2024-01-{day:02d}': 1.0 for day in range(1, 32)})
+        self.assertEqual(resample(dates, values, 31)[2], 'day')
+
+        bins, totals, period = resample(dates, values, 10)
+        self.assertEqual(period, 'week')
+        self.assertEqual(str(bins[0]), '2024-01-01')
+        self.assertEqual(totals.sum(), 31.0)
+
+        bins, totals, period = resample(dates, values, 2)
+        self.assertEqual((period, list(totals)), ('month', [31.0]))
+
+    def test_skips_values_that_are_not_dates(self):
+        dates, values = time_series({'2024-01-02': 1.0, 'Unknown': 5.0, '2024-01-01': 2.0})
+        self.assertEqual([str(date) for date in dates], ['2024-01-01', '2024-01-02'])
+        self.assertEqual(list(values), [2.0, 1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import receipt_dedup  # noqa: E402
+from main import process_receipts  # noqa: E402
+from receipt_dedup import DUPLICATES_FILE, DedupIndex  # noqa: E402
+
+SAMPLE = os.path.join(ROOT, 'receipts', 'Receipt_10055.csv')
+
+
+class DedupIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def copy(self, name, source=SAMPLE):
+        path = os.path.join(self.tmp.name, name)
+        shutil.copyfile(source, path)
+        return path
+
+    def test_reexported_invoice_is_skipped(self):
+        original = self.copy('Receipt_10055.csv')
+        again = self.copy('Receipt_10055 (1).csv')
+        index = DedupIndex()
+        self.assertIsNone(index.check(original))
+        self.assertEqual(index.check(again), original)
+
+        index.write(self.tmp.name)
+        with open(os.path.join(self.tmp.name, DUPLICATES_FILE), newline='') as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows, [['File', 'Duplicate Of', 'Invoice', 'Terminal'],
+                                [again, original, '10055', 'Terminal 13 - 03/26/2024 2:06 pm']])
+
+    def test_new_invoices_are_not_hashed(self):
+        index = DedupIndex()
+        with mock.patch.object(receipt_dedup, 'file_hash', wraps=receipt_dedup.file_hash) as file_hash:
+            for name in sorted(os.listdir(os.path.join(ROOT, 'receipts')))[:5]:
+                index.check(self.copy(name, os.path.join(ROOT, 'receipts', name)))
+        self.assertEqual(file_hash.call_count, 0)
+
+    def test_same_invoice_with_different_contents_counts_both(self):
+        original = self.copy('Receipt_10055.csv')
+        edited = os.path.join(self.tmp.name, 'Receipt_10055-edited.csv')
+        with open(SAMPLE) as source, open(edited, 'w') as file:
+            file.write(source.read().replace('$11.38', '$12.38'))
+        index = DedupIndex()
+        self.assertIsNone(index.check(original))
+        self.assertIsNone(index.check(edited))
+        self.assertEqual(index.duplicates, [])
+        # A third copy of either is still caught
+        self.assertEqual(index.check(self.copy('again.csv')), original)
+
+    def test_files_without_an_invoice_line_fall_back_to_the_hash(self):
+        text = 'Description,Amount\nFlour,12.50\n'
+        paths = []
+        for name in ('a.csv', 'b.csv'):
+            paths.append(os.path.join(self.tmp.name, name))
+            with open(paths[-1], 'w') as file:
+                file.write(text)
+        index = DedupIndex()
+        self.assertIsNone(index.check(paths[0]))
+        self.assertEqual(index.check(paths[1]), paths[0])
+
+    def test_process_receipts_counts_a_reexport_once(self):
+        self.copy('Receipt_10055.csv')
+        once = process_receipts(self.tmp.name)[1]
+        self.copy('Receipt_10055 copy.csv')
+        self.assertEqual(process_receipts(self.tmp.name)[1], once)
+        self.assertEqual(once, 1628.82)
+
+
+if __name__ == '__main__':
+    unittest.main()
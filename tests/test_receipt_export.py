@@ -0,0 +1,60 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from main import read_receipt, receipt_files  # noqa: E402
+from receipt_export import export_report, load_report, processed_rows, read_table  # noqa: E402
+from receipt_models import RunningTotals  # noqa: E402
+
+HAVE_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+class ExportRoundTripTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        totals = RunningTotals()
+        for file_path in receipt_files(os.path.join(ROOT, 'receipts')):
+            receipt, item_stats = read_receipt(file_path)
+            totals.add(file_path, receipt.date, receipt.total_cents, item_stats)
+        cls.results = totals.results()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.export_dir = os.path.join(self.tmp.name, 'export')
+
+    def assert_round_trip(self, export_format):
+        written = export_report(self.tmp.name, [export_format], self.results)
+        self.assertEqual(len(written), 5)
+        self.assertTrue(all(path.endswith(f'.{export_format}') for path in written))
+
+        processed_data, _grand_total, totals_by_date, all_items, monthly_averages = self.results
+        self.assertGreater(len(all_items), 10)
+        self.assertEqual(load_report(self.export_dir), (totals_by_date, all_items, monthly_averages))
+        self.assertEqual(list(read_table(self.export_dir, 'processed')), list(processed_rows(processed_data)))
+
+    def test_csv_gz_round_trip(self):
+        self.assert_round_trip('csv.gz')
+
+    @unittest.skipUnless(HAVE_PYARROW, 'pyarrow not installed')
+    def test_parquet_round_trip(self):
+        self.assert_round_trip('parquet')
+
+    def test_empty_report_round_trip(self):
+        empty = RunningTotals().results()
+        formats = ['csv.gz', 'parquet'] if HAVE_PYARROW else ['csv.gz']
+        export_report(self.tmp.name, formats, empty)
+        self.assertEqual(load_report(self.export_dir), ({}, {}, {}))
+
+    def test_missing_export(self):
+        with self.assertRaises(FileNotFoundError):
+            load_report(self.export_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import csv
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from receipt_log import PARSE_SUMMARY_FILE, QUARANTINE_FILE, ParseReport  # noqa: E402
+from receipt_parsers import parse_receipt  # noqa: E402
+
+DEPOT_RECEIPT = '''"Restaurant Depot 707 ,  "
+,"EIGHTYTWENTY LLC"
+,"2511S.,GEORGIA"
+,"AMARILLO, TX 791019999           "
+"Invoice 10055","Terminal 13 - 13/45/2024 2:06 pm"
+UPC,Description,UnitQty,CaseQty,Price
+89558000221,"PD DATE MEDJOOL 2        ",1,0,$11.38
+71575610001,"PD BERRY RASPBERRY       ",0,1,$3x.33
+0,Total,0,0,$11.38
+'''
+
+ITEMIZED_RECEIPT = '''Invoice Date,Invoice,Description,Qty,Amount
+02/30/2024,A-1,Flour,1,12.50
+03/01/2024,A-1,Sugar,2,N/A
+03/01/2024,A-1,Salt,1,1.25
+'''
+
+
+def read_csv(path):
+    with open(path, newline='') as file:
+        return list(csv.reader(file))
+
+
+class QuarantineReportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.report = ParseReport()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', newline='') as file:
+            file.write(text)
+        return path
+
+    def quarantined(self):
+        self.report.write(self.tmp.name)
+        return read_csv(os.path.join(self.tmp.name, QUARANTINE_FILE))
+
+    def test_bad_price_and_date_lines_are_quarantined_with_their_rows(self):
+        path = self.write('Receipt_10055.csv', DEPOT_RECEIPT)
+        receipt = parse_receipt(path, self.report)
+        self.assertEqual([item.description.strip() for item in receipt.items if not item.summary], ['PD DATE MEDJOOL 2'])
+
+        rows = self.quarantined()
+        self.assertEqual(rows[0], ['File', 'Line', 'Reason', 'Row'])
+        self.assertEqual(rows[1][:2], [path, '5'])
+        self.assertTrue(rows[1][2].startswith('unparseable invoice date'))
+        self.assertEqual(rows[1][3], 'Invoice 10055,Terminal 13 - 13/45/2024 2:06 pm')
+        self.assertEqual(rows[2][:3], [path, '8', 'invalid price: 3x.33'])
+        self.assertEqual(rows[2][3], '71575610001,PD BERRY RASPBERRY       ,0,1,$3x.33')
+        # The receipt as a whole has no usable date either
+        self.assertEqual(rows[3], [path, '', 'no invoice date found', ''])
+        self.assertEqual(len(rows), 4)
+
+    def test_itemized_rows_are_quarantined_and_the_rest_parsed(self):
+        path = self.write('itemized.csv', ITEMIZED_RECEIPT)
+        receipt = parse_receipt(path, self.report)
+        self.assertEqual([item.description for item in receipt.items], ['Flour', 'Salt'])
+        self.assertEqual(receipt.date, '2024-03-01')
+        self.assertEqual(
+            [row[1:3] for row in self.quarantined()[1:]],
+            [['2', "unparseable invoice date: unrecognized date '02/30/2024'"], ['3', 'invalid price: N/A']],
+        )
+
+    def test_unrecognized_file_is_quarantined_whole(self):
+        path = self.write('notes.csv', 'hello,world\n')
+        self.assertIsNone(parse_receipt(path, self.report).vendor)
+        self.assertEqual(self.quarantined()[1], [path, '', 'unrecognized receipt format', ''])
+
+    def test_parse_summary_counts_errors_per_file(self):
+        good = self.write('itemized.csv', ITEMIZED_RECEIPT)
+        bad = self.write('Receipt_10055.csv', DEPOT_RECEIPT)
+        parse_receipt(good, self.report)
+        parse_receipt(bad, self.report)
+        self.report.write(self.tmp.name)
+        summary = {row[0]: row for row in read_csv(os.path.join(self.tmp.name, PARSE_SUMMARY_FILE))[1:]}
+        self.assertEqual(summary[good][2:], ['4', '2', '2'])
+        self.assertEqual(summary[bad][2:], ['9', '2', '3'])  # the Total row counts as an item
+        self.assertEqual(self.report.error_count, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
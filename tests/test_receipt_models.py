@@ -0,0 +1,111 @@
+import csv
+import os
+import sys
+import unittest
+from collections import defaultdict
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from main import read_receipt, receipt_files  # noqa: E402
+from receipt_models import RunningTotals, average_cents, format_cents, to_cents  # noqa: E402
+
+RECEIPTS_DIR = os.path.join(ROOT, 'receipts')
+
+
+def float_totals(file_path):
+    """The float arithmetic main.py used before money was kept in cents."""
+    items, total, date_str = {}, 0.0, ''
+    with open(file_path, newline='') as file:
+        for row in csv.reader(file):
+            if len(row) < 2:
+                continue
+            if 'Invoice' in row[0]:
+                date_str = datetime.strptime(row[1].split('-')[1].strip(), '%m/%d/%Y %I:%M %p').strftime('%Y-%m-%d')
+            if row[0].isdigit() and len(row) >= 5:
+                price_string = row[-1].replace('$', '').replace(',', '').strip()
+                if price_string:
+                    price = float(price_string)
+                    item = items.setdefault(row[1].strip(), {'total': 0.0, 'count': 0, 'min': price, 'max': price})
+                    item['total'] += price
+                    item['count'] += 1
+                    item['min'] = min(item['min'], price)
+                    item['max'] = max(item['max'], price)
+            if 'Total' in row[1]:
+                total_string = row[-1].replace('$', '').replace(',', '').strip()
+                if total_string:
+                    total = float(total_string)
+    return total, date_str, items
+
+
+class CentsTest(unittest.TestCase):
+    def test_to_cents(self):
+        for text, cents in [('$1,628.82', 162882), ('-$10.03', -1003), ('329.57', 32957), ('$0.00', 0), ('7', 700),
+                            ('0.07', 7), ('19.99', 1999)]:
+            with self.subTest(text=text):
+                self.assertEqual(to_cents(text), cents)
+
+    def test_to_cents_rounds_half_cents_away_from_zero(self):
+        for text, cents in [('1.005', 101), ('-1.005', -101), ('0.125', 13), ('0.135', 14), ('2.675', 268),
+                            ('-$0.005', -1), ('0.0049', 0)]:
+            with self.subTest(text=text):
+                self.assertEqual(to_cents(text), cents)
+
+    def test_to_cents_rejects_non_numbers(self):
+        for text in ('', '$', 'abc', '1.2.3', 'inf'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                to_cents(text)
+
+    def test_average_cents_rounds_half_cents_away_from_zero(self):
+        for total, count, average in [(3, 2, 2), (-3, 2, -2), (5, 2, 3), (-5, 2, -3), (1, 3, 0), (2, 3, 1),
+                                      (1001, 2, 501), (1000, 3, 333), (0, 0, 0), (500, 0, 0)]:
+            with self.subTest(total=total, count=count):
+                self.assertEqual(average_cents(total, count), average)
+
+    def test_format_cents(self):
+        self.assertEqual([format_cents(c) for c in (162882, -1003, 5, -5, 0)],
+                         ['1628.82', '-10.03', '0.05', '-0.05', '0.00'])
+
+
+class RunningTotalsTest(unittest.TestCase):
+    def test_totals_match_the_float_path(self):
+        totals = RunningTotals()
+        grand_total = 0.0
+        by_date = defaultdict(float)
+        by_month = defaultdict(float)
+        month_counts = defaultdict(int)
+        items = {}
+        for file_path in receipt_files(RECEIPTS_DIR):
+            receipt, item_stats = read_receipt(file_path)
+            totals.add(file_path, receipt.date, receipt.total_cents, item_stats)
+
+            total, date_str, file_items = float_totals(file_path)
+            grand_total += total
+            by_date[date_str] += total
+            by_month[date_str[:7]] += total
+            month_counts[date_str[:7]] += 1
+            for name, data in file_items.items():
+                item = items.setdefault(name, {'total': 0.0, 'count': 0, 'min': data['min'], 'max': data['max']})
+                item['total'] += data['total']
+                item['count'] += data['count']
+                item['min'] = min(item['min'], data['min'])
+                item['max'] = max(item['max'], data['max'])
+
+        _processed, cents_grand_total, cents_by_date, cents_items, cents_monthly = totals.results()
+        self.assertGreater(len(totals.files), 100)
+        self.assertEqual(cents_grand_total, round(grand_total, 2))
+        self.assertEqual(cents_by_date, {date: round(total, 2) for date, total in by_date.items()})
+        self.assertEqual(cents_monthly.keys(), by_month.keys())
+        for month, total in by_month.items():
+            self.assertAlmostEqual(cents_monthly[month], total / month_counts[month], places=6)
+        self.assertEqual(cents_items.keys(), items.keys())
+        for name, item in items.items():
+            with self.subTest(item=name):
+                stats = cents_items[name]
+                self.assertEqual((stats['total'], stats['count'], stats['min'], stats['max']),
+                                 (round(item['total'], 2), item['count'], item['min'], item['max']))
+
+
+if __name__ == '__main__':
+    unittest.main()
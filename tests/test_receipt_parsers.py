@@ -0,0 +1,69 @@
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from receipt_log import ParseReport  # noqa: E402
+from receipt_parsers import (SNIFF_LINES, ItemizedCsvParser, RestaurantDepotParser, find_parser,  # noqa: E402
+                             parse_receipt, read_head)
+
+RECEIPTS_DIR = os.path.join(ROOT, 'receipts')
+
+SAMPLES = {
+    'sysco.csv': ('itemized_csv', 'Item Number,Product Description,Qty Shipped,Extended Price,Invoice Date,Invoice #\n'
+                                  '1234567,"OIL, CANOLA 35LB",2,71.90,03/04/2024,88812\n'
+                                  '7654321,LEMON JUICE,1,12.15,03/04/2024,88812\n'),
+    'grocer.csv': ('itemized_csv', 'Date,Description,Amount\n2024-03-05,Eggs,4.99\n2024-03-05,Milk,3.49\n'),
+    'statement.csv': (None, 'Date,Payee,Memo,Debit\n2024-03-05,Grocer,,8.48\n'),
+    'empty.csv': (None, ''),
+    'late_header.csv': (None, '\n' * SNIFF_LINES + 'UPC,Description,UnitQty,CaseQty,Price\n1,X,1,0,$1.00\n'),
+}
+
+
+class SniffTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.paths = {}
+        for name, (_vendor, text) in SAMPLES.items():
+            path = self.paths[name] = os.path.join(self.tmp.name, name)
+            with open(path, 'w', newline='') as file:
+                file.write(text)
+
+    def test_every_archived_receipt_goes_to_the_depot_parser(self):
+        names = sorted(name for name in os.listdir(RECEIPTS_DIR) if name.endswith('.csv'))
+        self.assertTrue(names)
+        for name in names:
+            with self.subTest(file=name):
+                parser = find_parser(read_head(os.path.join(RECEIPTS_DIR, name)))
+                self.assertIsInstance(parser, RestaurantDepotParser)
+
+    def test_samples_go_to_the_matching_parser(self):
+        for name, (vendor, _text) in SAMPLES.items():
+            with self.subTest(file=name):
+                parser = find_parser(read_head(self.paths[name]))
+                self.assertEqual(parser.name if parser else None, vendor)
+                self.assertEqual(parse_receipt(self.paths[name], ParseReport()).vendor, vendor)
+
+    def test_sniffing_reads_only_the_head(self):
+        self.assertEqual(len(read_head(os.path.join(RECEIPTS_DIR, 'Receipt_10055.csv'))), SNIFF_LINES)
+        self.assertEqual(read_head(self.paths['empty.csv']), [])
+
+    def test_itemized_columns_are_found_by_name(self):
+        receipt = parse_receipt(self.paths['sysco.csv'], ParseReport())
+        self.assertIsInstance(find_parser(read_head(self.paths['sysco.csv'])), ItemizedCsvParser)
+        self.assertEqual((receipt.invoice, receipt.date, receipt.total_cents), ('88812', '2024-03-04', 8405))
+        self.assertEqual([(item.upc, item.description, item.unit_qty, item.price_cents) for item in receipt.items],
+                         [('1234567', 'OIL, CANOLA 35LB', 2.0, 7190), ('7654321', 'LEMON JUICE', 1.0, 1215)])
+
+    def test_depot_receipt_fields(self):
+        receipt = parse_receipt(os.path.join(RECEIPTS_DIR, 'Receipt_10055.csv'), ParseReport())
+        self.assertEqual((receipt.vendor, receipt.invoice, receipt.date, receipt.total_cents),
+                         ('restaurant_depot', '10055', '2024-03-26', 162882))
+
+
+if __name__ == '__main__':
+    unittest.main()
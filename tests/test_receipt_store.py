@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from receipt_store import ReceiptStore, fts_query  # noqa: E402
+
+RECEIPTS = {
+    'a.csv': ('1001', '2024-01-05', [(7, '111', 'AHI TUNA STEAK', 1, 0, 20.0), (8, '222', 'LIME PERSIAN', 0, 1, 9.5)]),
+    'b.csv': ('1002', '2024-02-10', [(7, '111', 'AHI TUNA STEAK', 2, 0, 40.0), (8, '333', 'TUNA SALAD KIT', 1, 0, 6.25)]),
+    'c.csv': ('1003', '2024-03-31', [(7, '444', 'TUNAFISH CAN', 3, 0, 4.5), (8, '111', 'AHI TUNA STEAK', 1, 0, 21.0)]),
+}
+
+
+class ReceiptStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = ReceiptStore(os.path.join(self.tmp.name, 'receipts.db'))
+        self.addCleanup(self.store.close)
+        self.paths = {}
+        for name, (invoice, date_str, lines) in RECEIPTS.items():
+            path = self.paths[name] = os.path.join(self.tmp.name, name)
+            with open(path, 'w') as file:
+                file.write(name)
+            self.store.add_receipt(path, invoice, date_str, sum(line[-1] for line in lines), lines)
+
+    def found(self, **filters):
+        return [(row['invoice'], row['description']) for row in self.store.query(**filters)]
+
+    def test_fts_matches_every_word_as_a_prefix(self):
+        self.assertTrue(self.store.fts)
+        self.assertEqual(fts_query('ahi "tun'), '"ahi"* "tun"*')
+        self.assertEqual(self.found(text='ahi tun'),
+                         [('1003', 'AHI TUNA STEAK'), ('1002', 'AHI TUNA STEAK'), ('1001', 'AHI TUNA STEAK')])
+        self.assertEqual(self.found(text='tuna'),
+                         [('1003', 'TUNAFISH CAN'), ('1003', 'AHI TUNA STEAK'), ('1002', 'AHI TUNA STEAK'),
+                          ('1002', 'TUNA SALAD KIT'), ('1001', 'AHI TUNA STEAK')])
+        self.assertEqual(self.found(text='salad tuna'), [('1002', 'TUNA SALAD KIT')])
+        self.assertEqual(self.found(text='una'), [])
+
+    def test_upc_and_inclusive_date_range(self):
+        self.assertEqual(self.found(upc='111'),
+                         [('1003', 'AHI TUNA STEAK'), ('1002', 'AHI TUNA STEAK'), ('1001', 'AHI TUNA STEAK')])
+        self.assertEqual(self.found(upc='11'), [])
+        self.assertEqual(self.found(upc='111', since='2024-01-05', until='2024-02-10'),
+                         [('1002', 'AHI TUNA STEAK'), ('1001', 'AHI TUNA STEAK')])
+        self.assertEqual(self.found(text='tuna', since='2024-03-31'),
+                         [('1003', 'TUNAFISH CAN'), ('1003', 'AHI TUNA STEAK')])
+        self.assertEqual(self.found(until='2024-01-31'), [('1001', 'AHI TUNA STEAK'), ('1001', 'LIME PERSIAN')])
+        self.assertEqual(len(self.store.query(text='tuna', limit=2)), 2)
+
+    def test_like_fallback_without_fts(self):
+        self.store.fts = False
+        self.assertEqual(self.found(text='salad tuna'), [('1002', 'TUNA SALAD KIT')])
+
+    def test_prune_drops_receipts_lines_and_search_entries(self):
+        self.assertEqual(self.store.prune([self.paths['a.csv'], self.paths['c.csv']]), 1)
+        self.assertEqual(self.found(text='salad'), [])
+        self.assertEqual([row['invoice'] for row in self.store.query(upc='111')], ['1003', '1001'])
+        self.assertEqual(len(self.store.all_lines()), 4)
+        self.assertEqual(self.store.prune(self.paths.values()), 0)
+
+    def test_replacing_a_receipt_updates_search(self):
+        path = self.paths['b.csv']
+        self.assertFalse(self.store.needs_update(path))
+        with open(path, 'a') as file:
+            file.write('edited')
+        self.assertTrue(self.store.needs_update(path))
+        self.store.add_receipt(path, '1002', '2024-02-10', 3.0, [(7, '555', 'KEY LIME', 1, 0, 3.0)])
+        self.assertFalse(self.store.needs_update(path))
+        self.assertEqual(self.found(text='salad'), [])
+        self.assertEqual(self.found(text='lime'), [('1002', 'KEY LIME'), ('1001', 'LIME PERSIAN')])
+
+
+if __name__ == '__main__':
+    unittest.main()
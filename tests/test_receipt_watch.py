@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from receipt_watch import PollingWatcher  # noqa: E402
+
+
+class PollingWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = self.tmp.name
+        self.watcher = PollingWatcher(self.directory, interval=0)
+
+    def write(self, name, data, mode='w', mtime_ns=None):
+        path = os.path.join(self.directory, name)
+        with open(path, mode) as file:
+            file.write(data)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def poll(self):
+        # With interval=0 and timeout=0, wait() scans exactly once.
+        return self.watcher.wait(0)
+
+    def test_new_file_is_reported_after_one_stable_poll(self):
+        self.write('a.csv', 'Invoice 1\n')
+        self.assertEqual(self.poll(), set())
+        self.assertEqual(self.poll(), {'a.csv'})
+        self.assertEqual(self.poll(), set())
+
+    def test_file_still_being_written_is_not_reported(self):
+        self.write('a.csv', 'Invoice 1\n', mtime_ns=1_000_000_000)
+        self.assertEqual(self.poll(), set())
+        for second in range(2, 5):
+            self.write('a.csv', 'UPC,Description,UnitQty,CaseQty,Price\n', mode='a', mtime_ns=second * 1_000_000_000)
+            self.assertEqual(self.poll(), set())
+        self.assertEqual(self.poll(), {'a.csv'})
+
+    def test_rewrite_with_same_size_is_reported(self):
+        self.write('a.csv', 'one\n', mtime_ns=1_000_000_000)
+        self.poll()
+        self.assertEqual(self.poll(), {'a.csv'})
+        self.write('a.csv', 'two\n', mtime_ns=2_000_000_000)
+        self.assertEqual(self.poll(), set())
+        self.assertEqual(self.poll(), {'a.csv'})
+
+    def test_deleted_file_is_reported(self):
+        path = self.write('a.csv', 'one\n')
+        self.poll()
+        self.poll()
+        os.remove(path)
+        self.assertEqual(self.poll(), set())
+        self.assertEqual(self.poll(), {'a.csv'})
+
+    def test_existing_files_are_not_reported(self):
+        self.write('old.csv', 'one\n')
+        watcher = PollingWatcher(self.directory, interval=0)
+        self.assertEqual(watcher.wait(0), set())
+        self.assertEqual(watcher.wait(0), set())
+
+    def test_timeout_shorter_than_interval(self):
+        watcher = PollingWatcher(self.directory, interval=60)
+        started = time.monotonic()
+        self.assertEqual(watcher.wait(0.05), set())
+        self.assertLess(time.monotonic() - started, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,33 +1,9 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+"""Sales over time and the top 10 items by total sales, from a report's export.
 
-# Load the data from CSV files
-totals_data = pd.read_csv('totals_summary.csv')
-items_data = pd.read_csv('items_summary.csv')
+    python main.py report --export csv.gz
+    python vis_plots.py [output_<date>]
+"""
+from receipt_charts import run_from_export
 
-# Convert date from string to datetime format for better handling in plots
-totals_data['Date'] = pd.to_datetime(totals_data['Date'], errors='coerce')
-
-# Time Series Plot for total sales over time
-plt.figure(figsize=(10, 5))
-plt.plot(totals_data['Date'], totals_data['Total'].str.replace('$', '').astype(float), marker='o')
-plt.title('Total Sales Over Time')
-plt.xlabel('Date')
-plt.ylabel('Total Sales ($)')
-plt.grid(True)
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
-
-# Bar Chart for top 10 items by total sales
-top_items = items_data.nlargest(10, 'Total Cost')
-plt.figure(figsize=(10, 5))
-plt.bar(top_items['Item'], top_items['Total Cost'].str.replace('$', '').astype(float))
-plt.title('Top 10 Items by Total Sales')
-plt.xlabel('Item')
-plt.ylabel('Total Sales ($)')
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
-
-# Additional plots can be created similarly
+if __name__ == '__main__':
+    raise SystemExit(run_from_export(['sales_over_time', 'top_items'], 'Draw sales charts from a report export.'))